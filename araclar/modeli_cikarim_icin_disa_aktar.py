@@ -1,21 +1,65 @@
 # Model Dışa Aktarma Scripti
-# Bu script, eğitilmiş modeli çıkarım için dışa aktarır
+# Bu script, eğitilmiş modeli çıkarım için dışa aktarır. Ağırlıklar safetensors biçiminde kaydedilir;
+# böylece değerlendirme ve transkripsiyon scriptleri modeli bellek eşlemesiyle hızlı yükleyebilir
+# Kullanım: python modeli_cikarim_icin_disa_aktar.py --kontrol-noktasi CHECKPOINT --temel-model openai/whisper-medium.en
 
-from transformers import WhisperForConditionalGeneration, WhisperProcessor
+import argparse
 import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'degerlendirme_scriptleri'))
+
+from zamanlayici import startup
 
 # Model yolları
 checkpoint_path = 'PATH_TO_YOUR_CHECKPOINT'  # Eğitilmiş model kontrol noktası yolu
 base_model_id = 'INPUT_MODEL_ID_FOR_BASE_MODEL (e.g., openai/whisper-medium.en)'  # Temel model kimliği
 
-# Model ve işlemciyi yükle
-model = WhisperForConditionalGeneration.from_pretrained(checkpoint_path)
-processor = WhisperProcessor.from_pretrained(base_model_id)
 
-# Dışa aktarılacak model yolu
-exported_model_path = checkpoint_path + '-exported-model'
+def export_model(checkpoint_path, base_model_id, exported_model_path=None, low_cpu_mem_usage=False):
+    """
+    Kontrol noktasındaki modeli temel modelin işlemcisiyle birlikte dışa aktarır.
+
+    Parametreler:
+    checkpoint_path: Eğitilmiş model kontrol noktası yolu
+    base_model_id: İşlemcinin (tokenizer ve özellik çıkarıcı) alınacağı temel model
+    exported_model_path: Çıktı klasörü (varsayılan: kontrol noktası yolu + '-exported-model')
+    low_cpu_mem_usage: True ise ağırlıklar düşük bellekle yüklenir
+
+    Döndürür: Dışa aktarılan modelin klasörü
+    """
+    from transformers import WhisperForConditionalGeneration, WhisperProcessor
+
+    # Model ve işlemciyi yükle
+    options = {'low_cpu_mem_usage': True} if low_cpu_mem_usage else {}
+    model = WhisperForConditionalGeneration.from_pretrained(checkpoint_path, **options)
+    processor = WhisperProcessor.from_pretrained(base_model_id)
+    startup.mark('model_yuklendi')
+
+    # Dışa aktarılacak model yolu
+    if exported_model_path is None:
+        exported_model_path = checkpoint_path + '-exported-model'
+
+    # Modeli ve işlemciyi kaydet (safetensors, bellek eşlemesiyle yüklenebilir)
+    os.makedirs(exported_model_path, exist_ok=True)
+    model.save_pretrained(exported_model_path, safe_serialization=True)
+    processor.save_pretrained(exported_model_path)
+    startup.mark('kaydedildi')
+    return exported_model_path
+
+
+def main(argv=None):
+    """Komut satırı giriş noktası (bkz. degerlendirme_scriptleri/komut_satiri.py)"""
+    parser = argparse.ArgumentParser(description="Eğitilmiş modeli çıkarım için dışa aktarır")
+    parser.add_argument('--kontrol-noktasi', default=checkpoint_path, help="Eğitilmiş model kontrol noktası yolu")
+    parser.add_argument('--temel-model', default=base_model_id, help="İşlemcinin alınacağı temel model kimliği")
+    parser.add_argument('--cikti', default=None, help="Çıktı klasörü (varsayılan: <kontrol noktası>-exported-model)")
+    parser.add_argument('--dusuk-bellek', action='store_true', help="Ağırlıkları düşük bellekle (low_cpu_mem_usage) yükle")
+    args = parser.parse_args(argv)
+
+    path = export_model(args.kontrol_noktasi, args.temel_model, args.cikti, args.dusuk_bellek)
+    print(f"Model dışa aktarıldı: {path}")
+
 
-# Modeli ve işlemciyi kaydet
-os.makedirs(exported_model_path, exist_ok=True)
-model.save_pretrained(exported_model_path)
-processor.save_pretrained(exported_model_path) 
\ No newline at end of file
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,255 @@
+# Nicemlenmiş Model Dışa Aktarma Scripti
+# Bu script, tek bir kontrol noktasından birden fazla nicemlenmiş (quantized) CTranslate2 modeli
+# ve isteğe bağlı olarak PyTorch dinamik int8 modeli üretir. Her varyant için diskteki boyutu,
+# yükleme süresini ve yerel örnekler üzerinde kısa bir WER/gecikme testini manifest dosyasına yazar. CPU'nun
+# desteklemediği hesaplama tipleri (örn. bfloat16) yedek tiple test edilir; hatalı varyantlar manifeste kaydedilir
+# Kullanım: python nicemlenmis_modelleri_disa_aktar.py --model ./KONTROL_NOKTASI --cikti-dizini ./nicemlenmis-modeller
+
+import argparse
+import json
+import os
+import sys
+import time
+
+DEGERLENDIRME_DIZINI = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "degerlendirme_scriptleri")
+sys.path.insert(0, DEGERLENDIRME_DIZINI)
+
+from cikarim_arka_uclari import CTranslate2Backend, TransformersBackend
+from degerlendirme_motoru import run_batched_transcription, ThroughputMeter
+from wer_hesaplama import score_corpus
+from yerel_ornekler import load_local_samples
+
+VARSAYILAN_ORNEK_DIZINI = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "kaldirilan_ornekler")
+CT2_KOPYALANACAK_DOSYALAR = ["preprocessor_config.json", "tokenizer.json"]
+
+
+def directory_size(path):
+    """Klasördeki tüm dosyaların toplam boyutunu bayt cinsinden döndürür"""
+    return sum(
+        os.path.getsize(os.path.join(directory, file_name))
+        for directory, _, files in os.walk(path)
+        for file_name in files
+    )
+
+
+def export_ctranslate2(model_path, output_dir, quantization):
+    """Modeli verilen nicemleme tipiyle CTranslate2 formatına dönüştürür"""
+    from ctranslate2.converters import TransformersConverter
+
+    if os.path.isdir(model_path):
+        copy_files = [name for name in CT2_KOPYALANACAK_DOSYALAR if os.path.exists(os.path.join(model_path, name))]
+    else:
+        copy_files = CT2_KOPYALANACAK_DOSYALAR
+    converter = TransformersConverter(model_path, copy_files=copy_files, low_cpu_mem_usage=True)
+    converter.convert(output_dir, quantization=quantization, force=True)
+
+
+def export_pytorch_dynamic_int8(model_path, output_dir):
+    """Lineer katmanları dinamik int8'e nicemlenmiş PyTorch modelini kaydeder"""
+    import torch
+    from transformers import WhisperForConditionalGeneration, WhisperProcessor
+
+    model = WhisperForConditionalGeneration.from_pretrained(model_path)
+    quantized = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    os.makedirs(output_dir, exist_ok=True)
+    model.config.save_pretrained(output_dir)
+    model.generation_config.save_pretrained(output_dir)
+    WhisperProcessor.from_pretrained(model_path).save_pretrained(output_dir)
+    torch.save(quantized.state_dict(), os.path.join(output_dir, "pytorch_model_dinamik_int8.pt"))
+
+
+def load_pytorch_dynamic_int8(output_dir):
+    """Dinamik int8 modelini yapılandırmadan kurup nicemlenmiş ağırlıkları yükler"""
+    import torch
+    from transformers import WhisperConfig, WhisperForConditionalGeneration, WhisperProcessor
+
+    config = WhisperConfig.from_pretrained(output_dir)
+    model = WhisperForConditionalGeneration(config)
+    model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    model.load_state_dict(torch.load(os.path.join(output_dir, "pytorch_model_dinamik_int8.pt")))
+    model.generation_config = model.generation_config.from_pretrained(output_dir)
+    model.eval()
+    return TransformersBackend(output_dir, model=model, processor=WhisperProcessor.from_pretrained(output_dir))
+
+
+def smoke_test(backend, samples, batch_size):
+    """Yerel örnekler üzerinde kısa bir WER ve hız testi yapar"""
+    meter = ThroughputMeter()
+    results = list(run_batched_transcription(backend, samples, batch_size=batch_size, meter=meter))
+    score = score_corpus([ground_truth for _, ground_truth, _ in results],
+                         [prediction.strip() for _, _, prediction in results], with_alignment=False)
+    return {
+        "ornek_sayisi": meter.clip_count,
+        "wer": round(score.wer * 100, 2),
+        "cer": round(score.cer * 100, 2),
+        "klip_per_saniye": round(meter.clips_per_second, 3),
+        "ortalama_gecikme_sn": round(meter.elapsed_seconds / meter.clip_count, 4) if meter.clip_count else None,
+        "rtf": round(meter.real_time_factor, 4),
+    }
+
+
+# Cihaz nicemleme tipini verimli çalıştıramıyorsa (örn. bf16 desteklemeyen CPU) test için kullanılacak tip
+YEDEK_HESAPLAMA_TIPLERI = {
+    "bfloat16": "float32",
+    "float16": "float32",
+    "int8_bfloat16": "int8_float32",
+    "int8_float16": "int8_float32",
+}
+
+
+def compute_type_for(quantization, device="cpu"):
+    """
+    Nicemleme tipinin cihazda çalıştırılabilecek hesaplama tipini döndürür.
+
+    Cihaz tipi desteklemiyorsa YEDEK_HESAPLAMA_TIPLERI'ndeki karşılığı
+    (o da desteklenmiyorsa None) döndürülür; ağırlıklar yine diskteki
+    nicemlenmiş biçimde kalır, yalnızca hesaplama bu tiple yapılır.
+    """
+    import ctranslate2
+
+    supported = ctranslate2.get_supported_compute_types(device)
+    if quantization in supported:
+        return quantization
+    fallback = YEDEK_HESAPLAMA_TIPLERI.get(quantization)
+    return fallback if fallback in supported else None
+
+
+def write_manifest(path, model_path, sample_dir, entries):
+    """Manifesti geçici dosya üzerinden yazar (yarıda kalan yazım önceki manifesti bozmaz)"""
+    manifest = {"kaynak_model": model_path, "ornek_dizini": sample_dir, "varyantlar": entries}
+    with open(path + ".tmp", "w", encoding="utf-8") as file:
+        json.dump(manifest, file, ensure_ascii=False, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def _ctranslate2_variant(model_path, output_dir, quantization, samples, batch_size, cpu_threads, num_workers):
+    variant_dir = os.path.join(output_dir, f"ctranslate2-{quantization}")
+    entry = {"ad": f"ctranslate2-{quantization}", "tur": "ctranslate2", "nicemleme": quantization,
+             "klasor": variant_dir}
+    compute_type = compute_type_for(quantization)
+    if compute_type is None:
+        entry["durum"] = "desteklenmiyor"
+        entry["uyari"] = f"CPU {quantization} ve yedek hesaplama tipini desteklemiyor."
+        return entry
+
+    print(f"CTranslate2 {quantization} varyantı oluşturuluyor: {variant_dir}")
+    start = time.perf_counter()
+    export_ctranslate2(model_path, variant_dir, quantization)
+    entry["donusturme_suresi_sn"] = round(time.perf_counter() - start, 2)
+    entry["boyut_bayt"] = directory_size(variant_dir)
+    entry["hesaplama_tipi"] = compute_type
+    if compute_type != quantization:
+        entry["uyari"] = f"CPU {quantization} hesaplamayı desteklemiyor; test {compute_type} ile yapıldı."
+        print(f"Uyarı: {entry['uyari']}")
+
+    start = time.perf_counter()
+    backend = CTranslate2Backend(
+        variant_dir, compute_type=compute_type, cpu_threads=cpu_threads, num_workers=num_workers
+    )
+    entry["yukleme_suresi_sn"] = round(time.perf_counter() - start, 2)
+    if samples:
+        entry["duman_testi"] = smoke_test(backend, samples, batch_size)
+    entry["durum"] = "tamam"
+    return entry
+
+
+def _pytorch_dynamic_int8_variant(model_path, output_dir, samples, batch_size):
+    variant_dir = os.path.join(output_dir, "pytorch-dinamik-int8")
+    entry = {"ad": "pytorch-dinamik-int8", "tur": "pytorch", "nicemleme": "dinamik-int8", "klasor": variant_dir}
+    print(f"PyTorch dinamik int8 varyantı oluşturuluyor: {variant_dir}")
+    start = time.perf_counter()
+    export_pytorch_dynamic_int8(model_path, variant_dir)
+    entry["donusturme_suresi_sn"] = round(time.perf_counter() - start, 2)
+    entry["boyut_bayt"] = directory_size(variant_dir)
+
+    start = time.perf_counter()
+    backend = load_pytorch_dynamic_int8(variant_dir)
+    entry["yukleme_suresi_sn"] = round(time.perf_counter() - start, 2)
+    if samples:
+        entry["duman_testi"] = smoke_test(backend, samples, batch_size)
+    entry["durum"] = "tamam"
+    return entry
+
+
+def export_variants(model_path, output_dir, quantizations, pytorch_dynamic_int8, samples, batch_size,
+                    cpu_threads, num_workers, manifest_path=None, sample_dir=None):
+    """
+    Tüm varyantları üretip test eder ve manifest kayıtlarını döndürür.
+
+    Bir varyantta oluşan hata kaydına ("durum": "hata") yazılır ve sonraki
+    varyantlara geçilir; `manifest_path` verilirse manifest her varyanttan
+    sonra güncellenir, böylece yarıda kalan çalıştırmada tamamlanan
+    varyantlar kaybolmaz.
+
+    Parametreler:
+    model_path: Dışa aktarılacak Hugging Face kontrol noktası
+    output_dir: Varyantların yazılacağı ana klasör
+    quantizations: CTranslate2 nicemleme tiplerinin listesi
+    pytorch_dynamic_int8: True ise PyTorch dinamik int8 varyantı da üretilir
+    samples: Kısa test için yerel örnekler (boşsa test atlanır)
+    batch_size: Test sırasında batch boyutu
+    cpu_threads, num_workers: CTranslate2 testinde kullanılacak iş parçacığı ayarları
+    manifest_path: Her varyanttan sonra güncellenecek manifest dosyası
+    sample_dir: Manifeste yazılacak örnek klasörü
+    """
+    variants = [
+        (f"ctranslate2-{quantization}", lambda quantization=quantization: _ctranslate2_variant(
+            model_path, output_dir, quantization, samples, batch_size, cpu_threads, num_workers
+        ))
+        for quantization in quantizations
+    ]
+    if pytorch_dynamic_int8:
+        variants.append(("pytorch-dinamik-int8", lambda: _pytorch_dynamic_int8_variant(
+            model_path, output_dir, samples, batch_size
+        )))
+
+    entries = []
+    for name, build in variants:
+        try:
+            entry = build()
+        except Exception as e:
+            print(f"{name} varyantı oluşturulurken hata oluştu: {e}")
+            entry = {"ad": name, "durum": "hata", "hata": f"{type(e).__name__}: {e}"}
+        entries.append(entry)
+        if manifest_path:
+            write_manifest(manifest_path, model_path, sample_dir, entries)
+    return entries
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tek bir kontrol noktasından nicemlenmiş model varyantları üretir")
+    parser.add_argument("--model", required=True, help="Dışa aktarılacak Hugging Face kontrol noktası (klasör veya kimlik)")
+    parser.add_argument("--cikti-dizini", required=True, help="Varyantların ve manifestin yazılacağı klasör")
+    parser.add_argument("--nicemlemeler", nargs="+", default=["int8", "int8_float32", "bfloat16"],
+                        help="Üretilecek CTranslate2 nicemleme tipleri")
+    parser.add_argument("--pytorch-dinamik-int8", action="store_true", help="PyTorch dinamik int8 varyantını da üret")
+    parser.add_argument("--ornek-dizini", default=VARSAYILAN_ORNEK_DIZINI, help="Kısa test için yerel örnek klasörü")
+    parser.add_argument("--ornek-sayisi", type=int, default=16, help="Kısa testte kullanılacak örnek sayısı (0: test yok)")
+    parser.add_argument("--batch-boyutu", type=int, default=8, help="Kısa testte batch boyutu")
+    parser.add_argument("--cpu-is-parcacigi", type=int, default=0, help="CTranslate2 CPU iş parçacığı sayısı")
+    parser.add_argument("--isci-sayisi", type=int, default=1, help="CTranslate2 paralel transkripsiyon sayısı")
+    args = parser.parse_args()
+
+    samples = load_local_samples(args.ornek_dizini, limit=args.ornek_sayisi) if args.ornek_sayisi > 0 else []
+    os.makedirs(args.cikti_dizini, exist_ok=True)
+
+    manifest_path = os.path.join(args.cikti_dizini, "manifest.json")
+    entries = export_variants(
+        args.model, args.cikti_dizini, args.nicemlemeler, args.pytorch_dinamik_int8, samples,
+        args.batch_boyutu, args.cpu_is_parcacigi, args.isci_sayisi,
+        manifest_path=manifest_path, sample_dir=args.ornek_dizini
+    )
+
+    for entry in entries:
+        if entry["durum"] != "tamam":
+            print(f"{entry['ad']}: {entry['durum']} ({entry.get('hata') or entry.get('uyari')})")
+            continue
+        smoke = entry.get("duman_testi", {})
+        print(
+            f"{entry['ad']}: {entry['boyut_bayt'] / 1024 ** 2:.1f} MB, yükleme {entry['yukleme_suresi_sn']} sn"
+            + (f", WER {smoke['wer']}%, RTF {smoke['rtf']}" if smoke else "")
+            + (f" (hesaplama tipi {entry['hesaplama_tipi']})" if entry.get("hesaplama_tipi", entry["nicemleme"])
+               != entry["nicemleme"] else "")
+        )
+    print(f"Manifest şu dosyaya kaydedildi: {manifest_path}")
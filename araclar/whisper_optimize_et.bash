@@ -1,10 +1,15 @@
 # Model Optimizasyon Scripti
 # Bu script, Whisper modelini optimize edilmiş bir formata dönüştürür
-# Kullanım: ./whisper_to_optimized_bin.tr.bash
+# Kullanım: ./whisper_optimize_et.bash [MODEL_KLASORU] [CIKTI_KLASORU] [NICEMLEME]
+# Birden fazla nicemlenmiş varyant ve karşılaştırma manifesti için: nicemlenmis_modelleri_disa_aktar.py
 
 # --model: Dönüştürülecek model klasörünün yolu
 # --output_dir: Dönüştürülmüş modelin kaydedileceği klasör
 # --copy_files: Kopyalanacak ek dosyalar
-# --quantization: Sayısal hassasiyet seviyesi (float32)
+# --quantization: Sayısal hassasiyet seviyesi (varsayılan float32; int8, int8_float32, bfloat16 ...)
 
-ct2-transformers-converter --model ./PATH_TO_MODEL_TO_CONVERT --output_dir ./CONVERTED_MODEL_OUTPUT_NAME --copy_files preprocessor_config.json --quantization float32 
\ No newline at end of file
+MODEL=${1:-./PATH_TO_MODEL_TO_CONVERT}
+OUTPUT_DIR=${2:-./CONVERTED_MODEL_OUTPUT_NAME}
+QUANTIZATION=${3:-float32}
+
+ct2-transformers-converter --model "$MODEL" --output_dir "$OUTPUT_DIR" --copy_files preprocessor_config.json --quantization "$QUANTIZATION" 
\ No newline at end of file
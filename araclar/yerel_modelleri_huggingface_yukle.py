@@ -1,47 +1,377 @@
 # Hugging Face'e Model Yükleme Scripti
-# Bu script, yerel modelleri Hugging Face model merkezine yükler
+# Bu script, yerel modelleri Hugging Face model merkezine yükler. Dosyaların SHA-256 özetleri uzak depodaki
+# yükleme manifestiyle karşılaştırılır ve yalnızca değişen dosyalar paralel, parça parça yüklenir; yarıda
+# kalan yüklemeler bir sonraki çalıştırmada tamamlanan parçalardan devam eder. Taşıyıcı değiştirilebilir:
+# Hugging Face yerine yerel bir klasöre yayınlamak (örn. deneme için) `--tasiyici yerel` ile mümkündür
+# Kullanım: python yerel_modelleri_huggingface_yukle.py [--varyant KLASOR DEPO ...] [--tasiyici yerel --hedef ./yayin]
 
-from huggingface_hub import HfApi, upload_folder
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-# Yüklenecek modeller ve hedef depolar
-repos = {
-    "mehmedadymn/Air-traffic-control-fine-tuned-faster-whisper": "whisper-medium.en-fine-tuned-for-ATC-faster-whisper",
-    "mehmedadymn/Air-traffic-control-fine-tuned-faster-whisper": "whisper-medium.en-fine-tuned-for-ATC"
-}
+# Varsayılan olarak yüklenen model varyantları: (yerel model klasörü, hedef depo).
+# Transformers klasörü (whisper-medium.en-fine-tuned-for-ATC) için yayınlanmış bir depo yoktur;
+# yüklenecekse hedef depo `--varyant whisper-medium.en-fine-tuned-for-ATC KULLANICI/DEPO` ile açıkça verilir
+VARYANTLAR = [
+    ("whisper-medium.en-fine-tuned-for-ATC-faster-whisper", "mehmedadymn/Air-traffic-control-fine-tuned-faster-whisper"),
+]
 
-# Hugging Face API'sini başlat
-api = HfApi()
+MANIFEST_DOSYASI = "yukleme_manifesti.json"
+MANIFEST_SURUMU = 1
+PARCA_BOYUTU = 64 * 1024 * 1024  # Yerel taşıyıcıda bir parçanın boyutu (bayt)
+OKUMA_BLOGU = 8 * 1024 * 1024  # Özet hesaplanırken bir seferde okunan bayt
+DURUM_DIZINI = ".yukleme_durumu"
 
-def upload_model(repo_name, model_folder):
+
+def file_digest(path):
+    """Dosyanın SHA-256 özetini bellekte tamamını tutmadan hesaplar"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(OKUMA_BLOGU), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class DigestCache:
+    """
+    Dosya özetlerini boyut ve değişiklik zamanıyla birlikte saklar.
+
+    Boyutu ve değişiklik zamanı değişmemiş dosyalar yeniden okunmaz; böylece
+    gigabaytlık ağırlıklar her çalıştırmada baştan özetlenmez.
+    """
+    def __init__(self, path=None):
+        self.path = path
+        self.entries = {}
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as file:
+                self.entries = json.load(file)
+
+    def digest(self, file_path):
+        stat = os.stat(file_path)
+        key = os.path.abspath(file_path)
+        cached = self.entries.get(key)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+        value = file_digest(file_path)
+        with self._lock:
+            self.entries[key] = [stat.st_size, stat.st_mtime_ns, value]
+        return value
+
+    def save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temporary_path = self.path + ".tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump(self.entries, file)
+        os.replace(temporary_path, self.path)
+
+
+def local_manifest(folder, cache, workers=4):
+    """
+    Klasördeki dosyaların manifestini çıkarır.
+
+    Gizli dosyalar/klasörler ve manifest dosyasının kendisi atlanır; özetler
+    iş parçacıklarında hesaplanır (hashlib okuma sırasında GIL'i bırakır).
+
+    Döndürür: depo içi yol → {"sha256", "boyut"} sözlüğü
+    """
+    paths = []
+    for root, directories, files in os.walk(folder):
+        directories[:] = sorted(name for name in directories if not name.startswith("."))
+        for name in sorted(files):
+            if not name.startswith(".") and name != MANIFEST_DOSYASI:
+                paths.append(os.path.join(root, name))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        digests = list(pool.map(cache.digest, paths))
+    return {
+        os.path.relpath(path, folder).replace(os.sep, "/"): {"sha256": digest, "boyut": os.path.getsize(path)}
+        for path, digest in zip(paths, digests)
+    }
+
+
+def compare_manifests(local_files, remote_files):
+    """Döndürür: (yüklenecek yollar, uzak depodan kaldırılacak yollar)"""
+    changed = [
+        path for path, entry in local_files.items()
+        if remote_files.get(path, {}).get("sha256") != entry["sha256"]
+    ]
+    deleted = sorted(set(remote_files) - set(local_files))
+    return changed, deleted
+
+
+class Transport:
+    """
+    Yükleme taşıyıcılarının ortak arayüzü.
+
+    `upload_file` varsayılan olarak dosyayı `part_size` baytlık parçalar
+    halinde gönderir ve uzak tarafta zaten bulunan parçaları atlar; alt
+    sınıflar parça saklama, dosyayı tamamlama, manifest okuma ve değişiklikleri
+    işleme (commit) yöntemlerini sağlar. Manifest en son yazılır; yarıda
+    kalan bir yükleme uzak depodaki manifesti değiştirmez.
+    """
+    part_size = PARCA_BOYUTU
+
+    def prepare(self, repo):
+        """Hedef depoyu (yoksa) oluşturur"""
+
+    def read_manifest(self, repo):
+        """Uzak depodaki manifesti döndürür; yoksa None"""
+        raise NotImplementedError
+
+    def is_complete(self, repo, path_in_repo, entry):
+        return False
+
+    def uploaded_parts(self, repo, path_in_repo, entry):
+        return set()
+
+    def upload_part(self, repo, path_in_repo, entry, index, data):
+        raise NotImplementedError
+
+    def complete_file(self, repo, path_in_repo, entry, part_count):
+        raise NotImplementedError
+
+    def commit(self, repo, manifest, uploaded, deleted):
+        """Yüklenen dosyaları yayınlar, kaldırılanları siler ve manifesti yazar"""
+        raise NotImplementedError
+
+    def upload_file(self, repo, path_in_repo, local_path, entry):
+        """
+        Dosyayı parça parça yükler.
+
+        Döndürür: Bu çalıştırmada gönderilen bayt sayısı (önceden yüklenmiş parçalar hariç)
+        """
+        if self.is_complete(repo, path_in_repo, entry):
+            return 0
+        done = self.uploaded_parts(repo, path_in_repo, entry)
+        part_count = max(1, -(-entry["boyut"] // self.part_size))
+        sent = 0
+        with open(local_path, "rb") as file:
+            for index in range(part_count):
+                if index in done:
+                    continue
+                file.seek(index * self.part_size)
+                data = file.read(self.part_size)
+                self.upload_part(repo, path_in_repo, entry, index, data)
+                sent += len(data)
+        self.complete_file(repo, path_in_repo, entry, part_count)
+        return sent
+
+
+class LocalDirectoryTransport(Transport):
+    """
+    Depoları yerel bir klasöre yayınlayan taşıyıcı (deneme ve ayna için).
+
+    Parçalar `<depo>/.parcalar/<yükleme kimliği>/` altında tutulur; kimlik
+    dosyanın yolundan ve özetinden türetildiğinden yarıda kalan yükleme aynı
+    kimlikle kaldığı yerden sürer. Birleştirilen dosyanın özeti doğrulanır.
     """
-    Modeli Hugging Face'e yükleme fonksiyonu
-    
+    def __init__(self, root, part_size=PARCA_BOYUTU):
+        self.root = root
+        self.part_size = part_size
+
+    def _repo_dir(self, repo):
+        return os.path.join(self.root, repo)
+
+    def _staging_dir(self, repo, path_in_repo, entry):
+        upload_id = hashlib.sha256(f"{path_in_repo}\n{entry['sha256']}".encode("utf-8")).hexdigest()[:24]
+        return os.path.join(self._repo_dir(repo), ".parcalar", upload_id)
+
+    def prepare(self, repo):
+        os.makedirs(self._repo_dir(repo), exist_ok=True)
+
+    def read_manifest(self, repo):
+        path = os.path.join(self._repo_dir(repo), MANIFEST_DOSYASI)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as file:
+            return json.load(file)
+
+    def is_complete(self, repo, path_in_repo, entry):
+        return os.path.exists(os.path.join(self._staging_dir(repo, path_in_repo, entry), "tamam"))
+
+    def uploaded_parts(self, repo, path_in_repo, entry):
+        staging_dir = self._staging_dir(repo, path_in_repo, entry)
+        if not os.path.isdir(staging_dir):
+            return set()
+        return {int(name) for name in os.listdir(staging_dir) if name.isdigit()}
+
+    def upload_part(self, repo, path_in_repo, entry, index, data):
+        staging_dir = self._staging_dir(repo, path_in_repo, entry)
+        os.makedirs(staging_dir, exist_ok=True)
+        part_path = os.path.join(staging_dir, f"{index:06d}")
+        with open(part_path + ".tmp", "wb") as file:
+            file.write(data)
+        os.replace(part_path + ".tmp", part_path)
+
+    def complete_file(self, repo, path_in_repo, entry, part_count):
+        staging_dir = self._staging_dir(repo, path_in_repo, entry)
+        target_path = os.path.join(self._repo_dir(repo), path_in_repo)
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        digest = hashlib.sha256()
+        temporary_path = os.path.join(staging_dir, "birlesik.tmp")
+        with open(temporary_path, "wb") as output:
+            for index in range(part_count):
+                with open(os.path.join(staging_dir, f"{index:06d}"), "rb") as part:
+                    data = part.read()
+                digest.update(data)
+                output.write(data)
+        if digest.hexdigest() != entry["sha256"]:
+            # Dosya özetlendikten sonra değişmiş; parçalar bir sonraki çalıştırmada yeniden gönderilir
+            shutil.rmtree(staging_dir)
+            raise ValueError(f"{path_in_repo} yükleme sırasında değişti; özet doğrulanamadı.")
+        os.replace(temporary_path, target_path)
+        open(os.path.join(staging_dir, "tamam"), "w").close()
+
+    def commit(self, repo, manifest, uploaded, deleted):
+        repo_dir = self._repo_dir(repo)
+        for path_in_repo in deleted:
+            path = os.path.join(repo_dir, path_in_repo)
+            if os.path.exists(path):
+                os.remove(path)
+        manifest_path = os.path.join(repo_dir, MANIFEST_DOSYASI)
+        with open(manifest_path + ".tmp", "w", encoding="utf-8") as file:
+            json.dump(manifest, file, ensure_ascii=False, indent=2)
+        os.replace(manifest_path + ".tmp", manifest_path)
+        shutil.rmtree(os.path.join(repo_dir, ".parcalar"), ignore_errors=True)
+
+
+class HuggingFaceTransport(Transport):
+    """
+    Hugging Face model merkezine yayınlayan taşıyıcı.
+
+    Dosyalar `preupload_lfs_files` ile önceden yüklenir: merkez büyük
+    dosyaları kendi içinde parçalı (multipart) gönderir ve içerik adresli
+    sakladığından önceki çalıştırmada yüklenmiş dosyalar yeniden gönderilmez.
+    Değişiklikler ve manifest tüm dosyalar bittikten sonra tek commit'te
+    yayınlanır.
+    """
+    def __init__(self, api=None, repo_type="model"):
+        from huggingface_hub import HfApi
+        self.api = api or HfApi()
+        self.repo_type = repo_type
+        self._operations = {}
+        self._lock = threading.Lock()
+
+    def prepare(self, repo):
+        self.api.create_repo(repo_id=repo, repo_type=self.repo_type, exist_ok=True)
+
+    def read_manifest(self, repo):
+        from huggingface_hub import hf_hub_download
+        from huggingface_hub.utils import EntryNotFoundError
+        try:
+            path = hf_hub_download(repo, MANIFEST_DOSYASI, repo_type=self.repo_type, force_download=True)
+        except EntryNotFoundError:
+            return None
+        with open(path, encoding="utf-8") as file:
+            return json.load(file)
+
+    def upload_file(self, repo, path_in_repo, local_path, entry):
+        from huggingface_hub import CommitOperationAdd
+        operation = CommitOperationAdd(path_in_repo=path_in_repo, path_or_fileobj=local_path)
+        self.api.preupload_lfs_files(repo, [operation], repo_type=self.repo_type, num_threads=1)
+        with self._lock:
+            self._operations.setdefault(repo, []).append(operation)
+        return entry["boyut"]
+
+    def commit(self, repo, manifest, uploaded, deleted):
+        from huggingface_hub import CommitOperationAdd, CommitOperationDelete
+        operations = self._operations.pop(repo, [])
+        operations += [CommitOperationDelete(path_in_repo=path) for path in deleted]
+        manifest_bytes = json.dumps(manifest, ensure_ascii=False, indent=2).encode("utf-8")
+        operations.append(CommitOperationAdd(path_in_repo=MANIFEST_DOSYASI, path_or_fileobj=manifest_bytes))
+        self.api.create_commit(
+            repo, operations, repo_type=self.repo_type,
+            commit_message=f"{len(uploaded)} dosya güncellendi, {len(deleted)} dosya kaldırıldı",
+        )
+
+
+def publish_variant(transport, model_folder, repo_name, cache, workers=4):
+    """
+    Model klasörünü hedef depoya yalnızca değişen dosyaları göndererek yayınlar.
+
     Parametreler:
-    repo_name: Hedef depo adı
+    transport: Transport örneği
     model_folder: Yerel model klasörü
+    repo_name: Hedef depo adı
+    cache: DigestCache örneği
+    workers: Paralel özetlenen/yüklenen dosya sayısı
+
+    Döndürür: {"yuklenen", "atlanan", "kaldirilan", "gonderilen_bayt"} özeti
     """
-    # Depo oluştur
-    try:
-        api.create_repo(repo_id=repo_name)
-        print(f"{repo_name} deposu başarıyla oluşturuldu.")
-    except Exception as e:
-        print(f"{repo_name} deposu zaten var veya başka bir hata oluştu: {e}")
-
-    # Modeli yükle
-    try:
-        upload_folder(
-            folder_path=model_folder,
-            repo_id=repo_name,
-            repo_type="model",
-        )
-        print(f"{model_folder} klasörü {repo_name} deposuna başarıyla yüklendi.")
-    except Exception as e:
-        print(f"{model_folder} klasörünü {repo_name} deposuna yüklerken hata oluştu: {e}")
+    if not os.path.isdir(model_folder):
+        raise FileNotFoundError(f"{model_folder} klasörü bulunamadı.")
+    local_files = local_manifest(model_folder, cache, workers)
+    transport.prepare(repo_name)
+    remote = transport.read_manifest(repo_name) or {}
+    changed, deleted = compare_manifests(local_files, remote.get("dosyalar", {}))
+    summary = {"yuklenen": len(changed), "atlanan": len(local_files) - len(changed),
+               "kaldirilan": len(deleted), "gonderilen_bayt": 0}
+    if not changed and not deleted:
+        return summary
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(transport.upload_file, repo_name, path, os.path.join(model_folder, path), local_files[path]): path
+            for path in changed
+        }
+        for future in as_completed(futures):
+            summary["gonderilen_bayt"] += future.result()
+            print(f"  {futures[future]} yüklendi ({local_files[futures[future]]['boyut'] / 1e6:.1f} MB)")
+
+    manifest = {"surum": MANIFEST_SURUMU, "dosyalar": local_files}
+    transport.commit(repo_name, manifest, changed, deleted)
+    return summary
+
 
-# Her model için yükleme işlemini gerçekleştir
-for repo_name, model_folder in repos.items():
-    print(f"{model_folder} klasöründen {repo_name} deposuna model yükleniyor...")
-    upload_model(repo_name, model_folder)
-    print(f"{model_folder} yüklemesi tamamlandı.\n")
+def create_transport(kind, target=None, part_size=PARCA_BOYUTU):
+    """Taşıyıcıyı adından oluşturur ("hf" veya "yerel")"""
+    if kind == "yerel":
+        if not target:
+            raise ValueError("Yerel taşıyıcı için --hedef klasörü verilmelidir.")
+        return LocalDirectoryTransport(target, part_size)
+    return HuggingFaceTransport()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Yerel model klasörlerini değişen dosyaları yükleyerek yayınlar")
+    parser.add_argument("--varyant", nargs=2, action="append", metavar=("KLASOR", "DEPO"), default=None,
+                        help="Yüklenecek model klasörü ve hedef depo (birden fazla verilebilir)")
+    parser.add_argument("--tasiyici", choices=["hf", "yerel"], default="hf", help="Yükleme hedefi")
+    parser.add_argument("--hedef", default=None, help="Yerel taşıyıcının yayın klasörü")
+    parser.add_argument("--is-parcacigi", type=int, default=4, help="Paralel yüklenen dosya sayısı")
+    parser.add_argument("--parca-boyutu-mb", type=int, default=PARCA_BOYUTU // (1024 * 1024),
+                        help="Yerel taşıyıcıda parça boyutu (MB)")
+    parser.add_argument("--durum-dizini", default=DURUM_DIZINI, help="Özet önbelleğinin tutulduğu klasör")
+    args = parser.parse_args()
+
+    transport = create_transport(args.tasiyici, args.hedef, args.parca_boyutu_mb * 1024 * 1024)
+    cache = DigestCache(os.path.join(args.durum_dizini, "ozetler.json"))
+    failures = 0
+    for model_folder, repo_name in args.varyant or VARYANTLAR:
+        print(f"{model_folder} klasöründen {repo_name} deposuna model yükleniyor...")
+        start = time.perf_counter()
+        try:
+            summary = publish_variant(transport, model_folder, repo_name, cache, args.is_parcacigi)
+        except Exception as e:
+            failures += 1
+            print(f"{model_folder} klasörünü {repo_name} deposuna yüklerken hata oluştu: {e}\n")
+            continue
+        finally:
+            cache.save()
+        print(
+            f"{model_folder} yüklemesi tamamlandı ({time.perf_counter() - start:.1f} sn): "
+            f"{summary['yuklenen']} dosya yüklendi ({summary['gonderilen_bayt'] / 1e6:.1f} MB gönderildi), "
+            f"{summary['atlanan']} değişmemiş dosya atlandı, {summary['kaldirilan']} dosya kaldırıldı.\n"
+        )
 
-print("Her iki model de başarıyla yüklendi.") 
\ No newline at end of file
+    if failures:
+        print(f"{failures} model yüklenemedi; yeniden çalıştırıldığında tamamlanan dosyalar atlanır.")
+    else:
+        print("Tüm modeller başarıyla yüklendi.")
@@ -0,0 +1,194 @@
+# Çıkarım Kıyaslama (Benchmark) Paketi
+# Bu script, `kaldirilan_ornekler` sesleri ve rastgele başlatılmış küçük bir Whisper yapılandırmasıyla
+# internet ve GPU gerektirmeden model yükleme süresini, özellik çıkarma hızını, klip başına generate
+# gecikmesini, batch hızını, en yüksek bellek kullanımını (RSS) ve normalizasyon/WER puanlama hızını
+# ölçer. Sonuçlar JSON dosyasına yazılır ve kaydedilmiş bir temel (baseline) sonuçla karşılaştırılır
+# Kullanım: python kiyaslama.py [--cikti sonuclar.json] [--temel temel_sonuclar.json] [--temeli-kaydet]
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+import torch
+import transformers
+from transformers import WhisperConfig, WhisperFeatureExtractor, WhisperForConditionalGeneration
+
+KOK_DIZIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(KOK_DIZIN, "degerlendirme_scriptleri"))
+
+from metin_normalizasyonu import normalize_predictions
+from wer_hesaplama import score_corpus
+from yerel_ornekler import load_local_samples
+
+VARSAYILAN_ORNEK_DIZINI = os.path.join(KOK_DIZIN, "kaldirilan_ornekler")
+VARSAYILAN_TEMEL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "temel_sonuclar.json")
+
+# Küçük, rastgele başlatılmış Whisper yapılandırması (gerçek sözlük ve 80 mel kanalı korunur)
+KUCUK_MODEL_AYARLARI = dict(
+    vocab_size=51864, num_mel_bins=80, d_model=64, encoder_layers=2, decoder_layers=2,
+    encoder_attention_heads=4, decoder_attention_heads=4, encoder_ffn_dim=256, decoder_ffn_dim=256,
+    max_source_positions=1500, max_target_positions=448,
+    decoder_start_token_id=50257, eos_token_id=50256, pad_token_id=50256, bos_token_id=50256,
+)
+
+
+def measure(function, repeat, warmup=1):
+    """
+    Fonksiyonu ısınma turlarından sonra `repeat` kez çalıştırır ve süreleri (sn) döndürür.
+
+    Hız ölçümlerinde gürültüyü azaltmak için tekrarların en kısası kullanılır.
+    """
+    for _ in range(warmup):
+        function()
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+    return np.array(durations)
+
+
+def metric(value, unit, better):
+    """Ölçüm kaydı; `better` "yuksek" veya "dusuk" olarak iyileşme yönünü belirtir"""
+    return {"deger": round(float(value), 4), "birim": unit, "iyi_yon": better}
+
+
+def environment():
+    """Sonuçların karşılaştırılabilirliği için ortam bilgisi"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=KOK_DIZIN,
+                                capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+    return {
+        "python": platform.python_version(), "platform": platform.platform(), "islemci": platform.processor(),
+        "cekirdek_sayisi": os.cpu_count(), "torch": torch.__version__, "transformers": transformers.__version__,
+        "numpy": np.__version__, "is_parcacigi": torch.get_num_threads(), "git": commit,
+    }
+
+
+def run_benchmarks(samples, repeat, batch_size, new_tokens):
+    """Tüm ölçümleri yapar ve {ad: ölçüm} sözlüğü döndürür"""
+    results = {}
+    sampling_rate = samples[0]["audio"]["sampling_rate"]
+    audio_arrays = [sample["audio"]["array"] for sample in samples]
+    texts = [sample["text"] for sample in samples]
+    audio_seconds = sum(len(audio) for audio in audio_arrays) / sampling_rate
+
+    # Model yükleme
+    torch.manual_seed(0)
+    with tempfile.TemporaryDirectory() as directory:
+        WhisperForConditionalGeneration(WhisperConfig(**KUCUK_MODEL_AYARLARI)).save_pretrained(directory)
+        load_times = measure(lambda: WhisperForConditionalGeneration.from_pretrained(directory), repeat)
+        model = WhisperForConditionalGeneration.from_pretrained(directory).eval()
+    results["model_yukleme_suresi"] = metric(np.min(load_times), "sn", "dusuk")
+
+    # Özellik çıkarma
+    feature_extractor = WhisperFeatureExtractor(sampling_rate=sampling_rate)
+    batches = [audio_arrays[start:start + batch_size] for start in range(0, len(audio_arrays), batch_size)]
+    extraction_times = measure(lambda: [feature_extractor(batch, sampling_rate=sampling_rate) for batch in batches],
+                               repeat)
+    results["ozellik_cikarma_hizi"] = metric(len(audio_arrays) / np.min(extraction_times), "klip/sn", "yuksek")
+
+    # Generate: sabit sayıda token üretilir, böylece rastgele model sonuçları karşılaştırılabilir
+    features = [torch.from_numpy(feature_extractor(batch, sampling_rate=sampling_rate, return_tensors="np")
+                                 .input_features) for batch in batches]
+    generate_options = {"max_new_tokens": new_tokens, "min_new_tokens": new_tokens, "do_sample": False}
+
+    def generate(input_features):
+        with torch.no_grad():
+            model.generate(input_features=input_features, **generate_options)
+
+    single = features[0][:1]
+    latencies = measure(lambda: generate(single), repeat * 5)
+    results["klip_gecikmesi_p50"] = metric(np.percentile(latencies, 50) * 1000, "ms", "dusuk")
+    results["klip_gecikmesi_p90"] = metric(np.percentile(latencies, 90) * 1000, "ms", "dusuk")
+
+    batch_times = measure(lambda: [generate(batch) for batch in features], repeat)
+    results["batch_hizi"] = metric(len(audio_arrays) / np.min(batch_times), "klip/sn", "yuksek")
+    results["gercek_zaman_faktoru"] = metric(np.min(batch_times) / audio_seconds, "oran", "dusuk")
+
+    # Metin işleme
+    corpus = texts * 50
+    normalization_times = measure(lambda: normalize_predictions(corpus), repeat)
+    results["normalizasyon_hizi"] = metric(len(corpus) / np.min(normalization_times), "metin/sn", "yuksek")
+
+    rng = np.random.default_rng(0)
+    hypotheses = [" ".join(word for word in text.split() if rng.random() > 0.1) for text in corpus]
+    scoring_times = measure(lambda: score_corpus(corpus, hypotheses), repeat)
+    results["wer_puanlama_hizi"] = metric(len(corpus) / np.min(scoring_times), "cift/sn", "yuksek")
+
+    # Linux'ta ru_maxrss kilobayt cinsindendir
+    results["en_yuksek_rss"] = metric(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, "MB", "dusuk")
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Sonuçları temel sonuçlarla karşılaştırır.
+
+    Döndürür: (ad, temel, yeni, değişim oranı, gerileme mi) satırlarının listesi
+    """
+    rows = []
+    for name, current in results.items():
+        previous = baseline.get("olcumler", {}).get(name)
+        if previous is None or not previous["deger"]:
+            continue
+        change = current["deger"] / previous["deger"] - 1
+        worse = -change if current["iyi_yon"] == "yuksek" else change
+        rows.append((name, previous["deger"], current["deger"], change, worse > tolerance))
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Çevrimdışı çıkarım kıyaslama paketi")
+    parser.add_argument("--ornek-dizini", default=VARSAYILAN_ORNEK_DIZINI, help="Yerel örnek klasörü")
+    parser.add_argument("--cikti", default="kiyaslama_sonuclari.json", help="Sonuçların yazılacağı JSON dosyası")
+    parser.add_argument("--temel", default=VARSAYILAN_TEMEL, help="Karşılaştırılacak temel sonuç dosyası")
+    parser.add_argument("--temeli-kaydet", action="store_true", help="Bu çalıştırmayı yeni temel olarak kaydet")
+    parser.add_argument("--tolerans", type=float, default=0.10, help="Gerileme sayılacak en küçük kötüleşme oranı")
+    parser.add_argument("--tekrar", type=int, default=3, help="Her ölçümün tekrar sayısı")
+    parser.add_argument("--batch-boyutu", type=int, default=8, help="Batch ölçümlerinde batch boyutu")
+    parser.add_argument("--yeni-token", type=int, default=32, help="Her generate çağrısında üretilecek token sayısı")
+    parser.add_argument("--is-parcacigi", type=int, default=1,
+                        help="PyTorch iş parçacığı sayısı (tekrarlanabilirlik için varsayılan 1)")
+    args = parser.parse_args()
+
+    torch.set_num_threads(args.is_parcacigi)
+    samples = load_local_samples(args.ornek_dizini)
+    report = {
+        "ortam": environment(),
+        "ayarlar": {"ornek_sayisi": len(samples), "tekrar": args.tekrar, "batch_boyutu": args.batch_boyutu,
+                    "yeni_token": args.yeni_token, "model": KUCUK_MODEL_AYARLARI},
+        "olcumler": run_benchmarks(samples, args.tekrar, args.batch_boyutu, args.yeni_token),
+    }
+    with open(args.cikti, "w", encoding="utf-8") as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+
+    for name, value in report["olcumler"].items():
+        print(f"{name}: {value['deger']} {value['birim']}")
+    print(f"Sonuçlar şu dosyaya kaydedildi: {args.cikti}")
+
+    regressions = []
+    if os.path.exists(args.temel) and not args.temeli_kaydet:
+        with open(args.temel, encoding="utf-8") as file:
+            baseline = json.load(file)
+        print(f"\nTemel sonuçlarla karşılaştırma ({args.temel}, git {baseline.get('ortam', {}).get('git')}):")
+        for name, previous, current, change, regressed in compare(report["olcumler"], baseline, args.tolerans):
+            print(f"  {name}: {previous} -> {current} ({change * 100:+.1f}%)" + ("  GERİLEME" if regressed else ""))
+            if regressed:
+                regressions.append(name)
+    if args.temeli_kaydet:
+        with open(args.temel, "w", encoding="utf-8") as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+        print(f"Temel sonuçlar güncellendi: {args.temel}")
+
+    if regressions:
+        print(f"{len(regressions)} ölçümde gerileme bulundu: {', '.join(regressions)}")
+        sys.exit(1)
@@ -0,0 +1,215 @@
+# Canlı Transkripsiyon Sunucusu
+# Bu script, ince ayarlı modeli bellekte tutan asyncio tabanlı yerel bir sunucu başlatır. Birden fazla
+# telsiz kanalından gelen PCM parçalarını kabul eder, kanallardaki bekleyen bölütleri ayarlanabilir bir
+# gecikme penceresi içinde tek bir batch'te toplar ve kısmi/son transkriptleri akış olarak geri gönderir
+# Kullanım: python canli_transkripsiyon_sunucusu.py --unix-soket /tmp/atc.sock
+#
+# Protokol (UNIX soketi veya TCP üzerinde satır başına bir JSON nesnesi):
+#   İstemci -> sunucu: {"tur": "ses", "kanal": "KANAL", "ornekleme_hizi": 16000, "pcm": "<base64 int16 LE>"}
+#                      {"tur": "bitir", "kanal": "KANAL"}   (yayının bittiğini bildirir)
+#   Sunucu -> istemci: {"tur": "kismi" | "son", "kanal": "KANAL", "bolut": N, "baslangic_sn": ...,
+#                       "bitis_sn": ..., "metin": "...", "gecikme_ms": ...}
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from cikarim_arka_uclari import create_backend, add_backend_arguments
+from konusma_algilama import EnergyVAD, resample
+
+VARSAYILAN_MODEL = "mehmedadymn/Air-traffic-control-fine-tuned-faster-whisper"
+HEDEF_ORNEKLEME_HIZI = 16000
+
+
+class ChannelState:
+    """Bir bağlantıdaki tek bir telsiz kanalının VAD durumu ve bölüt sayaçları"""
+    def __init__(self, sampling_rate, vad_options):
+        self.sampling_rate = sampling_rate
+        self.vad = EnergyVAD(sampling_rate, **vad_options)
+        self.received_samples = 0
+        self.segment_id = 0
+        self.samples_at_last_partial = 0
+
+
+class TranscriptionServer:
+    """
+    Kanallar arası mikro-batch yapan canlı transkripsiyon sunucusu.
+
+    Biten bölütler (VAD veya `bitir` mesajı) "son", süren bölütler belirli
+    aralıklarla "kismi" istek olarak tek bir kuyruğa eklenir. Toplayıcı ilk
+    isteği aldıktan sonra `latency_window` süresince veya batch dolana kadar
+    bekler; aynı kanalın eskiyen kısmi istekleri atlanır. Model tek bir iş
+    parçacığında çalıştırılır, olay döngüsü bu sırada yeni ses kabul etmeye devam eder.
+    """
+    def __init__(self, backend, batch_size=8, latency_window=0.05, partial_seconds=1.0, vad_options=None):
+        self.backend = backend
+        self.batch_size = batch_size
+        self.latency_window = latency_window
+        self.partial_seconds = partial_seconds
+        self.vad_options = vad_options or {}
+        self._queue = None
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self.batch_sizes = []
+
+    async def _send(self, connection, message):
+        writer, lock = connection
+        async with lock:
+            writer.write((json.dumps(message, ensure_ascii=False) + "\n").encode("utf-8"))
+            await writer.drain()
+
+    def _submit(self, connection, channel, state, kind, start, audio):
+        self._queue.put_nowait({
+            "baglanti": connection, "kanal": channel, "durum": state, "tur": kind, "bolut": state.segment_id,
+            "baslangic_sn": start / state.sampling_rate, "bitis_sn": (start + len(audio)) / state.sampling_rate,
+            "ses": audio, "zaman": time.perf_counter(),
+        })
+        if kind == "son":
+            state.segment_id += 1
+            state.samples_at_last_partial = state.received_samples
+
+    def _handle_audio(self, connection, channel, state, pcm):
+        audio = pcm.astype(np.float32) / 32768.0
+        state.received_samples += len(audio)
+        for start, segment in state.vad.process(audio):
+            self._submit(connection, channel, state, "son", start, segment)
+
+        pending = state.vad.pending_segment()
+        if pending is not None and \
+                state.received_samples - state.samples_at_last_partial >= self.partial_seconds * state.sampling_rate:
+            state.samples_at_last_partial = state.received_samples
+            self._submit(connection, channel, state, "kismi", *pending)
+
+    async def handle_client(self, reader, writer):
+        """Bir istemci bağlantısındaki mesajları işler"""
+        connection = (writer, asyncio.Lock())
+        channels = {}
+        try:
+            while line := await reader.readline():
+                try:
+                    message = json.loads(line)
+                except json.JSONDecodeError:
+                    await self._send(connection, {"tur": "hata", "metin": "Geçersiz JSON satırı"})
+                    continue
+                channel = str(message.get("kanal", "varsayilan"))
+                if message.get("tur") == "ses":
+                    sampling_rate = int(message.get("ornekleme_hizi", HEDEF_ORNEKLEME_HIZI))
+                    state = channels.get(channel)
+                    if state is None or state.sampling_rate != sampling_rate:
+                        state = channels[channel] = ChannelState(sampling_rate, self.vad_options)
+                    pcm = np.frombuffer(base64.b64decode(message["pcm"]), dtype="<i2")
+                    self._handle_audio(connection, channel, state, pcm)
+                elif message.get("tur") == "bitir" and channel in channels:
+                    state = channels[channel]
+                    for start, segment in state.vad.flush():
+                        self._submit(connection, channel, state, "son", start, segment)
+        finally:
+            writer.close()
+
+    def _select(self, batch):
+        """Aynı bölüt için daha yeni bir istek varsa eski kısmi istekleri çıkarır"""
+        latest = {}
+        for request in batch:
+            key = (id(request["durum"]), request["bolut"])
+            if request["tur"] == "son" or latest.get(key, {}).get("tur") != "son":
+                latest[key] = request
+        return list(latest.values())
+
+    async def batch_loop(self):
+        """Kuyruktaki istekleri gecikme penceresi içinde toplayıp tek seferde çözümler"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.latency_window
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            batch = self._select(batch)
+            audio = [resample(request["ses"], request["durum"].sampling_rate, HEDEF_ORNEKLEME_HIZI)
+                     for request in batch]
+            try:
+                predictions = await loop.run_in_executor(
+                    self._executor, self.backend.transcribe_batch, audio, HEDEF_ORNEKLEME_HIZI
+                )
+            except Exception as error:
+                predictions = None
+                print(f"Çözümleme hatası: {error}")
+            self.batch_sizes.append(len(batch))
+
+            now = time.perf_counter()
+            for position, request in enumerate(batch):
+                message = {
+                    "tur": request["tur"] if predictions is not None else "hata",
+                    "kanal": request["kanal"], "bolut": request["bolut"],
+                    "baslangic_sn": round(request["baslangic_sn"], 3), "bitis_sn": round(request["bitis_sn"], 3),
+                    "metin": predictions[position].strip() if predictions is not None else "",
+                    "gecikme_ms": round((now - request["zaman"]) * 1000, 1),
+                }
+                try:
+                    await self._send(request["baglanti"], message)
+                except ConnectionError:
+                    pass
+
+    async def serve(self, unix_socket=None, host="127.0.0.1", port=8765, ready=None):
+        """
+        Sunucuyu başlatır ve kapatılana kadar çalıştırır.
+
+        Parametreler:
+        unix_socket: Verilirse bu yoldaki UNIX soketinde dinlenir, aksi halde `host:port` (TCP)
+        ready: Dinlemeye başlanınca tamamlanan isteğe bağlı asyncio.Event
+        """
+        self._queue = asyncio.Queue()
+        if unix_socket:
+            if os.path.exists(unix_socket):
+                os.remove(unix_socket)
+            server = await asyncio.start_unix_server(self.handle_client, path=unix_socket)
+            address = unix_socket
+        else:
+            server = await asyncio.start_server(self.handle_client, host=host, port=port)
+            address = f"{host}:{port}"
+        batcher = asyncio.create_task(self.batch_loop())
+        print(f"Canlı transkripsiyon sunucusu dinleniyor: {address}")
+        if ready is not None:
+            ready.set()
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher.cancel()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Yerel canlı transkripsiyon sunucusu")
+    parser.add_argument("--model", default=VARSAYILAN_MODEL, help="Model kimliği veya klasörü")
+    parser.add_argument("--unix-soket", default=None, help="UNIX soketi yolu (verilmezse TCP kullanılır)")
+    parser.add_argument("--host", default="127.0.0.1", help="TCP adresi")
+    parser.add_argument("--port", type=int, default=8765, help="TCP portu")
+    parser.add_argument("--batch-boyutu", type=int, default=8, help="Bir batch'teki en fazla bölüt sayısı")
+    parser.add_argument("--gecikme-penceresi-ms", type=float, default=50.0,
+                        help="İlk istekten sonra batch'i doldurmak için beklenecek süre (ms)")
+    parser.add_argument("--kismi-aralik-sn", type=float, default=1.0,
+                        help="Süren yayınlar için kısmi transkript aralığı (sn, 0: kapalı)")
+    add_backend_arguments(parser)
+    args = parser.parse_args()
+
+    backend = create_backend(
+        args.arka_uc, args.model, compute_type=args.hesaplama_tipi, cpu_threads=args.cpu_is_parcacigi,
+        num_workers=args.isci_sayisi, device=args.cihaz, feature_store_dir=args.ozellik_deposu,
+        assistant_model_name=args.yardimci_model, phraseology_mode=args.ifade_kipi,
+        phraseology_source=args.ifade_kaynagi, phraseology_bias=args.ifade_puani,
+        tokens_per_second=args.saniye_basina_token, low_cpu_mem_usage=args.dusuk_bellek
+    )
+    server = TranscriptionServer(
+        backend, batch_size=args.batch_boyutu, latency_window=args.gecikme_penceresi_ms / 1000,
+        partial_seconds=args.kismi_aralik_sn if args.kismi_aralik_sn > 0 else float("inf"),
+    )
+    asyncio.run(server.serve(unix_socket=args.unix_soket, host=args.host, port=args.port))
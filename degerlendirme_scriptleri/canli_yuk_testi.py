@@ -0,0 +1,127 @@
+# Canlı Transkripsiyon Yük Testi
+# Bu script, `kaldirilan_ornekler/sample_*` seslerini birden fazla eş zamanlı kanaldan gerçek zaman
+# hızında canlı transkripsiyon sunucusuna gönderir; son transkriptlerin gecikmesini (yayının bitişinden
+# sunucunun yanıtına kadar) p50/p99 olarak ve gecikme hedefini tutturan kanal sayısını çekirdek başına raporlar
+# Kullanım: python canli_yuk_testi.py --unix-soket /tmp/atc.sock --kanal-sayilari 1 2 4 8 --sure 30
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import time
+import numpy as np
+from yerel_ornekler import load_local_samples
+
+VARSAYILAN_ORNEK_DIZINI = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "kaldirilan_ornekler")
+
+
+async def open_connection(unix_socket, host, port):
+    if unix_socket:
+        return await asyncio.open_unix_connection(unix_socket)
+    return await asyncio.open_connection(host, port)
+
+
+async def replay_channel(channel, samples, address, duration, chunk_seconds, gap_seconds, latencies):
+    """
+    Bir kanalı gerçek zaman hızında oynatır ve son transkriptlerin gecikmelerini toplar.
+
+    Kanalın akış zamanı ile duvar saati eşleştirildiği için, bir yayının gecikmesi
+    yanıtın alındığı an ile o yayının son örneğinin gönderildiği an arasındaki farktır.
+    """
+    reader, writer = await open_connection(*address)
+    started = time.perf_counter()
+    sent_seconds = 0.0
+    finals = 0
+
+    async def receive():
+        nonlocal finals
+        while line := await reader.readline():
+            message = json.loads(line)
+            if message.get("tur") == "son":
+                finals += 1
+                latencies.append(time.perf_counter() - (started + message["bitis_sn"]))
+
+    receiver = asyncio.create_task(receive())
+    position = channel
+    while sent_seconds < duration:
+        sample = samples[position % len(samples)]
+        position += 1
+        sampling_rate = sample["audio"]["sampling_rate"]
+        audio = np.concatenate([sample["audio"]["array"], np.zeros(int(gap_seconds * sampling_rate), dtype=np.float32)])
+        pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype("<i2")
+        chunk = max(1, int(chunk_seconds * sampling_rate))
+        for start in range(0, len(pcm), chunk):
+            piece = pcm[start:start + chunk]
+            writer.write((json.dumps({
+                "tur": "ses", "kanal": f"kanal-{channel}", "ornekleme_hizi": sampling_rate,
+                "pcm": base64.b64encode(piece.tobytes()).decode("ascii"),
+            }) + "\n").encode("utf-8"))
+            await writer.drain()
+            sent_seconds += len(piece) / sampling_rate
+            # Gerçek zaman hızını koru
+            delay = started + sent_seconds - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        writer.write((json.dumps({"tur": "bitir", "kanal": f"kanal-{channel}"}) + "\n").encode("utf-8"))
+        await writer.drain()
+
+    # Son yanıtların gelmesi için kısa bir süre bekle
+    await asyncio.sleep(2.0)
+    receiver.cancel()
+    writer.close()
+    return finals
+
+
+async def run_load(channel_count, samples, address, duration, chunk_seconds, gap_seconds):
+    """Verilen sayıda kanalı eş zamanlı oynatır ve gecikme istatistiklerini döndürür"""
+    latencies = []
+    finals = await asyncio.gather(*[
+        replay_channel(channel, samples, address, duration, chunk_seconds, gap_seconds, latencies)
+        for channel in range(channel_count)
+    ])
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "kanal_sayisi": channel_count,
+        "son_transkript": int(sum(finals)),
+        "p50_ms": round(float(np.percentile(latencies_ms, 50)), 1) if len(latencies_ms) else None,
+        "p99_ms": round(float(np.percentile(latencies_ms, 99)), 1) if len(latencies_ms) else None,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Canlı transkripsiyon sunucusu yük testi")
+    parser.add_argument("--unix-soket", default=None, help="Sunucunun UNIX soketi (verilmezse TCP)")
+    parser.add_argument("--host", default="127.0.0.1", help="TCP adresi")
+    parser.add_argument("--port", type=int, default=8765, help="TCP portu")
+    parser.add_argument("--ornek-dizini", default=VARSAYILAN_ORNEK_DIZINI, help="Oynatılacak yerel örnekler")
+    parser.add_argument("--kanal-sayilari", type=int, nargs="+", default=[1, 2, 4, 8],
+                        help="Denenecek eş zamanlı kanal sayıları")
+    parser.add_argument("--sure", type=float, default=30.0, help="Her denemede kanal başına oynatılacak süre (sn)")
+    parser.add_argument("--parca-suresi", type=float, default=0.1, help="Bir mesajdaki PCM süresi (sn)")
+    parser.add_argument("--bosluk-suresi", type=float, default=1.0, help="Yayınlar arasındaki sessizlik (sn)")
+    parser.add_argument("--hedef-p99-ms", type=float, default=1500.0,
+                        help="Kanal sayısının sürdürülebilir sayılması için p99 gecikme üst sınırı (ms)")
+    parser.add_argument("--cikti", default=None, help="Sonuçların yazılacağı JSON dosyası")
+    args = parser.parse_args()
+
+    samples = load_local_samples(args.ornek_dizini)
+    address = (args.unix_soket, args.host, args.port)
+    results = []
+    for channel_count in args.kanal_sayilari:
+        result = asyncio.run(run_load(channel_count, samples, address, args.sure,
+                                      args.parca_suresi, args.bosluk_suresi))
+        result["surdurulebilir"] = result["p99_ms"] is not None and result["p99_ms"] <= args.hedef_p99_ms
+        results.append(result)
+        print(f"{channel_count} kanal: {result['son_transkript']} son transkript, "
+              f"p50 {result['p50_ms']} ms, p99 {result['p99_ms']} ms"
+              + ("" if result["surdurulebilir"] else " (hedef aşıldı)"))
+
+    sustained = max((result["kanal_sayisi"] for result in results if result["surdurulebilir"]), default=0)
+    cores = os.cpu_count() or 1
+    print(f"Sürdürülebilen en fazla kanal: {sustained} ({sustained / cores:.2f} kanal/çekirdek, {cores} çekirdek)")
+    if args.cikti:
+        with open(args.cikti, "w", encoding="utf-8") as file:
+            json.dump({"sonuclar": results, "surdurulebilen_kanal": sustained,
+                       "kanal_per_cekirdek": sustained / cores, "cekirdek_sayisi": cores},
+                      file, ensure_ascii=False, indent=2)
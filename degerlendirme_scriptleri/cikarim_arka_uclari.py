@@ -0,0 +1,243 @@
+# Çıkarım Arka Uçları
+# Bu modül, değerlendirme motorunun kullandığı transkripsiyon arka uçlarını içerir:
+# Hugging Face transformers modeli veya CTranslate2'ye dönüştürülmüş (faster-whisper) model
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from degerlendirme_motoru import load_model_and_processor, load_assistant_model, transcribe_batch, transcribe_features
+from ozellik_deposu import FeatureStore
+from zamanlayici import profiler, startup
+from ifade_agaci import KIPLER, load_or_build_trie, max_new_tokens_for, PhraseologyLogitsProcessor
+from tahmin_onbellegi import model_fingerprint, generation_config_key
+
+BACKENDS = ("transformers", "ctranslate2")
+
+
+class TransformersBackend:
+    """WhisperForConditionalGeneration ile toplu `generate` çağrısı yapan arka uç"""
+    name = "transformers"
+
+    def __init__(self, model_name, model=None, processor=None, feature_store_dir=None, assistant_model_name=None,
+                 phraseology_mode=None, phraseology_source=None, phraseology_bias=5.0, tokens_per_second=None,
+                 low_cpu_mem_usage=False, feature_store_read_only=False):
+        """
+        Parametreler:
+        model_name: Model kimliği veya klasörü
+        model, processor: Önceden yüklenmiş (örn. nicemlenmiş) model ve işlemci; verilmezse yüklenir
+        feature_store_dir: Verilirse log-mel özellikleri bu özellik deposundan okunur/yazılır
+        assistant_model_name: Verilirse bu taslak modelle yardımlı (speculative) çözümleme yapılır
+        phraseology_mode: "kisitla" veya "yonlendir" ise çözümleme ATC ifade ağacıyla kısıtlanır/yönlendirilir
+        phraseology_source: İfade ağacının kurulacağı transkriptler (bkz. ifade_agaci.load_training_texts)
+        phraseology_bias: Yönlendirme kipinde ağaçtaki tokenlara eklenen puan
+        tokens_per_second: Verilirse üretilecek token sayısı batch'teki en uzun klibin süresiyle sınırlanır
+        low_cpu_mem_usage: True ise model (ve taslak model) ağırlıkları düşük bellekle yüklenir
+        feature_store_read_only: True ise özellik deposu salt okunur açılır (çok süreçli değerlendirmede işçiler)
+        """
+        self.model_name = model_name
+        if model is None:
+            self.model, self.processor = load_model_and_processor(model_name, low_cpu_mem_usage)
+        else:
+            self.model, self.processor = model, processor
+        self.feature_store = None
+        if feature_store_dir:
+            self.feature_store = FeatureStore(
+                feature_store_dir, self.processor.feature_extractor, read_only=feature_store_read_only
+            )
+        # Açgözlü doğrulama aynı tokenları ürettiğinden önbellek anahtarı taslak modele bağlı değildir
+        self.assistant_model = None
+        if assistant_model_name:
+            self.assistant_model = load_assistant_model(assistant_model_name, self.model, low_cpu_mem_usage)
+        self.phraseology_mode = phraseology_mode
+        self.phraseology_bias = phraseology_bias
+        self.trie = None
+        if phraseology_mode:
+            self.trie = load_or_build_trie(self.processor.tokenizer, phraseology_source)
+        self.tokens_per_second = tokens_per_second
+
+    @property
+    def label(self):
+        """Sonuç dosyası adlarına eklenen etiket (varsayılan arka uç için boş)"""
+        return ""
+
+    def cache_key(self):
+        """Tahmin önbelleği için model sürümü ve üretim ayarlarından oluşan anahtar"""
+        key = model_fingerprint(self.model_name, self.model) + "|" + generation_config_key(self.model)
+        if self.feature_store is not None:
+            # Depodaki float16 özellikler tahminleri az da olsa değiştirebilir
+            key += "|ozellik-deposu:" + self.feature_store.config_key
+        if self.trie is not None:
+            key += f"|ifade:{self.phraseology_mode}:{self.trie.key}:{self.phraseology_bias}"
+        if self.tokens_per_second:
+            key += f"|token-siniri:{self.tokens_per_second}"
+        return key
+
+    def _generate_kwargs(self, audio_arrays, sampling_rate):
+        options = {}
+        if self.trie is not None:
+            options["logits_processor"] = [PhraseologyLogitsProcessor(
+                self.trie, self.model.generation_config.eos_token_id, self.phraseology_mode, self.phraseology_bias
+            )]
+        if self.tokens_per_second:
+            # Kontrolsüz tekrarları (halüsinasyon) kes; istem tokenları için pay bırak
+            options["max_new_tokens"] = max_new_tokens_for(
+                [len(audio) / sampling_rate for audio in audio_arrays], self.tokens_per_second,
+                limit=self.model.config.max_target_positions - 8
+            )
+        return options
+
+    def transcribe_batch(self, audio_arrays, sampling_rate):
+        generate_kwargs = self._generate_kwargs(audio_arrays, sampling_rate)
+        if self.feature_store is None:
+            return transcribe_batch(self.model, self.processor, audio_arrays, sampling_rate,
+                                    assistant_model=self.assistant_model, generate_kwargs=generate_kwargs)
+        with profiler.stage("ozellik_deposu", items=len(audio_arrays)):
+            features = self.feature_store.features_for_audio(audio_arrays, sampling_rate)
+        return transcribe_features(self.model, self.processor, np.stack(features), assistant_model=self.assistant_model,
+                                   generate_kwargs=generate_kwargs)
+
+
+class CTranslate2Backend:
+    """
+    CTranslate2 formatındaki modeli faster-whisper ile çalıştıran arka uç.
+
+    `araclar/whisper_optimize_et.bash` ile dönüştürülen ve yayınlanan model bu
+    arka uçla değerlendirilir. Transformers arka ucuyla karşılaştırılabilir
+    olması için açgözlü (greedy) çözümleme ve sabit sıcaklık kullanılır.
+    Bir batch'teki klipler `num_workers` iş parçacığına dağıtılır; CTranslate2
+    bu çağrıları paralel çalıştırır.
+    """
+    name = "ctranslate2"
+
+    def __init__(self, model_path, compute_type="int8", cpu_threads=0, num_workers=1, device="cpu", beam_size=1,
+                 tokens_per_second=None):
+        """
+        Parametreler:
+        model_path: CTranslate2 model klasörü veya Hugging Face model kimliği
+        compute_type: Hesaplama tipi (int8, int8_float32, float32, bfloat16 vb.)
+        cpu_threads: İşçi başına CPU iş parçacığı sayısı (0: CTranslate2 varsayılanı)
+        num_workers: Aynı anda çalışabilecek transkripsiyon sayısı
+        device: "cpu", "cuda" veya "auto"
+        beam_size: Işın araması genişliği (1: açgözlü çözümleme)
+        tokens_per_second: Verilirse her klipte üretilecek token sayısı klibin süresiyle sınırlanır
+        """
+        from faster_whisper import WhisperModel
+        from faster_whisper.utils import download_model
+
+        self.model_path = model_path
+        # Hub kimliği indirilen revizyonun klasörüne çözümlenir; önbellek anahtarı bu revizyona bağlanır
+        self.snapshot_path = model_path if os.path.isdir(model_path) else download_model(model_path)
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+        self.num_workers = max(1, num_workers)
+        self.beam_size = beam_size
+        self.tokens_per_second = tokens_per_second
+        self.model = WhisperModel(
+            self.snapshot_path, device=device, compute_type=compute_type,
+            cpu_threads=cpu_threads, num_workers=self.num_workers
+        )
+        self._executor = ThreadPoolExecutor(max_workers=self.num_workers)
+
+    @property
+    def label(self):
+        return f"-ctranslate2-{self.compute_type}"
+
+    def cache_key(self):
+        if os.path.isdir(self.model_path):
+            fingerprint = model_fingerprint(self.model_path, None)
+        else:
+            # Hub önbelleğindeki klasör adı (snapshots/<commit>) revizyonun commit özetidir
+            fingerprint = f"{self.model_path}@{os.path.basename(os.path.normpath(self.snapshot_path))}"
+        options = {"arka_uc": self.name, "compute_type": self.compute_type, "beam_size": self.beam_size}
+        if self.tokens_per_second:
+            options["token_siniri"] = self.tokens_per_second
+        return fingerprint + "|" + json.dumps(options, sort_keys=True)
+
+    def _transcribe_one(self, audio):
+        options = {}
+        if self.tokens_per_second:
+            options["max_new_tokens"] = max_new_tokens_for([len(audio) / 16000], self.tokens_per_second, limit=440)
+        segments, _ = self.model.transcribe(
+            audio, language="en", beam_size=self.beam_size, temperature=0.0,
+            without_timestamps=True, condition_on_previous_text=False, **options
+        )
+        return "".join(segment.text for segment in segments)
+
+    def transcribe_batch(self, audio_arrays, sampling_rate):
+        if sampling_rate != 16000:
+            raise ValueError(f"CTranslate2 arka ucu 16000 Hz ses bekler, {sampling_rate} Hz verildi.")
+        return list(self._executor.map(self._transcribe_one, audio_arrays))
+
+
+def create_backend(backend, model_name, compute_type="int8", cpu_threads=0, num_workers=1, device="cpu",
+                   feature_store_dir=None, assistant_model_name=None, phraseology_mode=None, phraseology_source=None,
+                   phraseology_bias=5.0, tokens_per_second=None, low_cpu_mem_usage=False,
+                   feature_store_read_only=False):
+    """
+    İsmi verilen arka ucu oluşturur.
+
+    Parametreler:
+    backend: "transformers" veya "ctranslate2"
+    model_name: Model kimliği veya klasörü
+    compute_type, cpu_threads, num_workers, device: Yalnızca CTranslate2 arka ucunda kullanılır
+    feature_store_dir: Log-mel özellik deposu (yalnızca transformers arka ucunda kullanılır)
+    feature_store_read_only: Özellik deposunu salt okunur açar
+    assistant_model_name: Yardımlı çözümleme için taslak model (yalnızca transformers arka ucunda kullanılır)
+    phraseology_mode, phraseology_source, phraseology_bias: İfade ağacıyla kısıtlı çözümleme ayarları
+                                                            (yalnızca transformers arka ucunda kullanılır)
+    tokens_per_second: Üretilecek token sayısını ses süresiyle sınırlar
+    low_cpu_mem_usage: Ağırlıkları düşük bellekle yükler (yalnızca transformers arka ucunda kullanılır)
+    """
+    if backend == "transformers":
+        created = TransformersBackend(
+            model_name, feature_store_dir=feature_store_dir, assistant_model_name=assistant_model_name,
+            phraseology_mode=phraseology_mode, phraseology_source=phraseology_source,
+            phraseology_bias=phraseology_bias, tokens_per_second=tokens_per_second,
+            low_cpu_mem_usage=low_cpu_mem_usage, feature_store_read_only=feature_store_read_only
+        )
+        startup.mark("model_yuklendi")
+        return created
+    if backend == "ctranslate2":
+        if feature_store_dir:
+            print("Uyarı: faster-whisper özellikleri kendisi hesapladığından özellik deposu kullanılmayacak.")
+        if assistant_model_name:
+            print("Uyarı: CTranslate2 arka ucu yardımlı çözümlemeyi desteklemediğinden taslak model kullanılmayacak.")
+        if phraseology_mode:
+            print("Uyarı: CTranslate2 arka ucu logits işlemcisi desteklemediğinden ifade ağacı kullanılmayacak.")
+        created = CTranslate2Backend(
+            model_name, compute_type=compute_type, cpu_threads=cpu_threads, num_workers=num_workers, device=device,
+            tokens_per_second=tokens_per_second
+        )
+        startup.mark("model_yuklendi")
+        return created
+    raise ValueError(f"Bilinmeyen arka uç: {backend}. Seçenekler: {', '.join(BACKENDS)}")
+
+
+def add_backend_arguments(parser):
+    """Değerlendirme scriptlerinin ortak arka uç argümanlarını ekler"""
+    parser.add_argument("--arka-uc", choices=BACKENDS, default="transformers", help="Çıkarım arka ucu")
+    parser.add_argument("--hesaplama-tipi", default="int8",
+                        help="CTranslate2 hesaplama tipi (int8, int8_float32, float32, bfloat16 ...)")
+    parser.add_argument("--cpu-is-parcacigi", type=int, default=0,
+                        help="CTranslate2 işçi başına CPU iş parçacığı sayısı (0: varsayılan)")
+    parser.add_argument("--isci-sayisi", type=int, default=1, help="CTranslate2 paralel transkripsiyon sayısı")
+    parser.add_argument("--cihaz", default="cpu", help="CTranslate2 cihazı (cpu, cuda, auto)")
+    parser.add_argument("--ozellik-deposu", default=None,
+                        help="Log-mel özelliklerinin saklanacağı/okunacağı klasör (yalnızca transformers)")
+    parser.add_argument("--yardimci-model", default=None,
+                        help="Yardımlı (speculative) çözümleme için aynı sözlüğü kullanan küçük taslak model "
+                             "(örn. openai/whisper-tiny.en; yalnızca transformers)")
+    parser.add_argument("--ifade-kipi", choices=KIPLER, default=None,
+                        help="Çözümlemeyi eğitim transkriptlerinden kurulan ATC ifade ağacıyla kısıtla veya "
+                             "bu sözlüğe yönlendir (yalnızca transformers)")
+    parser.add_argument("--ifade-kaynagi", default=None,
+                        help="İfade ağacının transkript kaynağı: yerel örnek klasörü veya metin dosyası "
+                             "(varsayılan: hub'daki eğitim bölümü)")
+    parser.add_argument("--ifade-puani", type=float, default=5.0, help="Yönlendirme kipinde eklenen logit puanı")
+    parser.add_argument("--dusuk-bellek", action="store_true",
+                        help="Ağırlıkları ağırlıksız (meta) modele safetensors bellek eşlemesinden doğrudan yükle "
+                             "(low_cpu_mem_usage; yalnızca transformers)")
+    parser.add_argument("--saniye-basina-token", type=float, default=None,
+                        help="Üretilecek en fazla token sayısını ses süresine göre sınırla (örn. 8; varsayılan: kapalı)")
+
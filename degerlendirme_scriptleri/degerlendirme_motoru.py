@@ -0,0 +1,243 @@
+# Toplu Değerlendirme Motoru
+# Bu modül, iki değerlendirme scriptinin ortak kullandığı, geçici dosya yazmadan
+# toplu (batch) transkripsiyon yapan çekirdek döngüyü içerir. torch ve transformers yalnızca model
+# yüklenirken içe aktarılır; böylece CTranslate2 arka ucu ve `--help` bu maliyeti ödemez
+
+import time
+import numpy as np
+from tahmin_onbellegi import audio_hash
+from zamanlayici import profiler, startup
+
+
+def load_whisper_model(model_name, low_cpu_mem_usage=False):
+    """
+    WhisperForConditionalGeneration modelini yükler.
+
+    transformers safetensors ağırlıklarını tercih eder ve dosyayı bellek
+    eşlemesiyle okur; `low_cpu_mem_usage` ile model önce ağırlıksız (meta)
+    oluşturulur ve tensörler doğrudan eşlemeden doldurulur, böylece
+    yükleme sırasında ağırlıkların ikinci bir kopyası RAM'de tutulmaz.
+    """
+    from transformers import WhisperForConditionalGeneration
+    options = {"low_cpu_mem_usage": True} if low_cpu_mem_usage else {}
+    return WhisperForConditionalGeneration.from_pretrained(model_name, **options)
+
+
+def load_model_and_processor(model_name, low_cpu_mem_usage=False):
+    """
+    Modeli ve işlemciyi yükleyip uygun cihaza taşır.
+
+    Parametreler:
+    model_name: Hugging Face model kimliği veya yerel model klasörü
+    low_cpu_mem_usage: True ise ağırlıklar düşük bellekle yüklenir (bkz. load_whisper_model)
+
+    Döndürür: (model, processor)
+    """
+    import torch
+    from transformers import WhisperProcessor
+
+    processor = WhisperProcessor.from_pretrained(model_name)
+    model = load_whisper_model(model_name, low_cpu_mem_usage)
+    model.to("cuda" if torch.cuda.is_available() else "cpu")
+    model.eval()
+    return model, processor
+
+
+def load_assistant_model(model_name, model, low_cpu_mem_usage=False):
+    """
+    Yardımlı (assisted/speculative) çözümleme için küçük taslak modeli yükler.
+
+    Taslak model ana modelle aynı sözlüğü kullanmalıdır (örn. whisper-medium.en
+    için whisper-tiny.en veya egitim.py ile ince ayarlanmış küçük bir model).
+    Ana model taslak tokenları tek ileri geçişte doğrular; açgözlü çözümlemede
+    çıktı, taslak model olmadan üretilenle aynıdır.
+
+    Parametreler:
+    model_name: Taslak modelin kimliği veya klasörü
+    model: Taslak modelin eşleştirileceği ana model (cihaz ve veri tipi buradan alınır)
+    low_cpu_mem_usage: True ise ağırlıklar düşük bellekle yüklenir
+    """
+    assistant = load_whisper_model(model_name, low_cpu_mem_usage)
+    if assistant.config.vocab_size != model.config.vocab_size:
+        raise ValueError(
+            f"Yardımcı modelin sözlüğü ({assistant.config.vocab_size}) ana modelinkiyle "
+            f"({model.config.vocab_size}) aynı olmalıdır."
+        )
+    assistant.to(model.device, dtype=model.dtype)
+    assistant.eval()
+    return assistant
+
+
+def iterate_batches(split, batch_size=8, sort_window=16):
+    """
+    Veri seti bölümünü süreye göre gruplanmış batch'ler halinde dolaşır.
+
+    Tüm bölümü belleğe almamak için örnekler `batch_size * sort_window`
+    büyüklüğünde pencereler halinde okunur ve her pencere kendi içinde
+    süreye göre sıralanır. Benzer uzunluktaki klipler aynı batch'e düştüğü
+    için dolgu (padding) ve boşa harcanan çözümleme adımları azalır.
+
+    Parametreler:
+    split: `audio` ve `text` sütunlarına sahip veri seti bölümü
+    batch_size: Her batch'teki örnek sayısı
+    sort_window: Sıralama penceresinin batch cinsinden büyüklüğü
+
+    Döndürür: (indeksler, ses dizileri, örnekleme hızı, gerçek metinler) dörtlüleri
+    """
+    window_size = max(1, batch_size * sort_window)
+    for window_start in range(0, len(split), window_size):
+        window = []
+        window_end = min(window_start + window_size, len(split))
+        with profiler.stage("veri_cozme", items=window_end - window_start):
+            for idx in range(window_start, window_end):
+                sample = split[idx]
+                audio_array = np.asarray(sample['audio']['array'], dtype=np.float32)
+                window.append((idx, audio_array, sample['audio']['sampling_rate'], sample['text']))
+
+        # Pencereyi süreye göre sırala
+        window.sort(key=lambda item: len(item[1]) / item[2])
+
+        for batch_start in range(0, len(window), batch_size):
+            batch = window[batch_start:batch_start + batch_size]
+            # Aynı batch'teki örnekler aynı örnekleme hızına sahip olmalıdır
+            for sampling_rate in sorted({item[2] for item in batch}):
+                group = [item for item in batch if item[2] == sampling_rate]
+                yield (
+                    [item[0] for item in group],
+                    [item[1] for item in group],
+                    sampling_rate,
+                    [item[3] for item in group],
+                )
+
+
+def transcribe_batch(model, processor, audio_arrays, sampling_rate, assistant_model=None, generate_kwargs=None):
+    """
+    Bir grup ses dizisini tek bir `generate` çağrısıyla yazıya döker.
+
+    Parametreler:
+    model: WhisperForConditionalGeneration modeli
+    processor: WhisperProcessor
+    audio_arrays: Ses dizilerinin listesi
+    sampling_rate: Seslerin örnekleme hızı
+    assistant_model: Yardımlı çözümleme için taslak model (isteğe bağlı, bkz. load_assistant_model)
+    generate_kwargs: `generate` çağrısına iletilecek ek argümanlar (örn. logits_processor, max_new_tokens)
+
+    Döndürür: Her ses dizisi için tahmin edilen metinlerin listesi
+    """
+    with profiler.stage("ozellik_cikarma", items=len(audio_arrays)):
+        inputs = processor(audio_arrays, return_tensors="pt", sampling_rate=sampling_rate)
+    return transcribe_features(model, processor, inputs.input_features, assistant_model=assistant_model,
+                               generate_kwargs=generate_kwargs)
+
+
+def transcribe_features(model, processor, input_features, assistant_model=None, generate_kwargs=None):
+    """
+    Önceden hesaplanmış log-mel özelliklerini tek bir `generate` çağrısıyla yazıya döker.
+
+    Parametreler:
+    input_features: (batch, özellik sayısı, kare sayısı) boyutlu tensör veya dizi
+    assistant_model: Verilirse taslak modelle yardımlı çözümleme yapılır; transformers
+                     yardımlı üretimi yalnızca batch boyutu 1 ile desteklediğinden
+                     örnekler bu durumda tek tek çözümlenir
+    generate_kwargs: `generate` çağrısına iletilecek ek argümanlar
+
+    Döndürür: Her örnek için tahmin edilen metinlerin listesi
+    """
+    import torch
+
+    input_features = torch.as_tensor(input_features).to(model.device, dtype=model.dtype)
+    generate_kwargs = generate_kwargs or {}
+
+    with profiler.stage("generate", items=len(input_features)), torch.no_grad():
+        if assistant_model is None:
+            generated_ids = model.generate(input_features=input_features, **generate_kwargs)
+        else:
+            generated_ids = [
+                model.generate(input_features=features[None], assistant_model=assistant_model, **generate_kwargs)[0]
+                for features in input_features
+            ]
+    with profiler.stage("batch_decode", items=len(generated_ids)):
+        return processor.batch_decode(generated_ids, skip_special_tokens=True)
+
+
+class ThroughputMeter:
+    """Transkripsiyon hızını (klip/saniye ve gerçek zaman faktörü) ölçen sayaç"""
+    def __init__(self):
+        self.clip_count = 0
+        self.audio_seconds = 0.0
+        self.elapsed_seconds = 0.0
+        self.cache_hits = 0
+
+    def add(self, audio_arrays, sampling_rate, elapsed):
+        self.clip_count += len(audio_arrays)
+        self.audio_seconds += sum(len(audio) for audio in audio_arrays) / sampling_rate
+        self.elapsed_seconds += elapsed
+
+    @property
+    def clips_per_second(self):
+        return self.clip_count / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    @property
+    def real_time_factor(self):
+        """İşlem süresinin ses süresine oranı (1'den küçükse gerçek zamandan hızlı)"""
+        return self.elapsed_seconds / self.audio_seconds if self.audio_seconds else 0.0
+
+    def summary(self):
+        summary = (
+            f"{self.clip_count} klip, {self.audio_seconds:.1f} sn ses, "
+            f"{self.elapsed_seconds:.1f} sn işlem süresi | "
+            f"Hız: {self.clips_per_second:.2f} klip/sn | "
+            f"Gerçek zaman faktörü (RTF): {self.real_time_factor:.3f}"
+        )
+        if self.cache_hits:
+            summary += f" | Önbellekten gelen: {self.cache_hits} klip"
+        return summary
+
+
+def run_batched_transcription(backend, split, batch_size=8, sort_window=16, meter=None, cache=None):
+    """
+    Bir veri seti bölümünün tamamını toplu olarak yazıya döker.
+
+    Parametreler:
+    backend: `transcribe_batch(audio_arrays, sampling_rate)` metoduna sahip arka uç
+             (bkz. cikarim_arka_uclari.py)
+    split: Değerlendirilecek veri seti bölümü
+    batch_size: Her `generate` çağrısındaki örnek sayısı
+    sort_window: Süreye göre sıralama penceresinin batch cinsinden büyüklüğü
+    meter: Hız ölçümlerinin ekleneceği ThroughputMeter (isteğe bağlı)
+    cache: PredictionCache (isteğe bağlı); önbellekte bulunan klipler yeniden çözümlenmez
+
+    Döndürür: (indeks, gerçek metin, tahmin) üçlüleri üreten bir jeneratör
+    """
+    profiler.begin_capture()
+    for indices, audio_arrays, sampling_rate, ground_truths in iterate_batches(split, batch_size, sort_window):
+        predictions = [None] * len(audio_arrays)
+
+        if cache is not None:
+            with profiler.stage("onbellek_okuma", items=len(audio_arrays)):
+                hashes = [audio_hash(audio, sampling_rate) for audio in audio_arrays]
+                cached = cache.get_many(hashes)
+            for position, key in enumerate(hashes):
+                predictions[position] = cached.get(key)
+            if meter is not None:
+                meter.cache_hits += len(cached)
+
+        pending = [position for position, prediction in enumerate(predictions) if prediction is None]
+        if pending:
+            pending_audio = [audio_arrays[position] for position in pending]
+            start = time.perf_counter()
+            with profiler.stage("transkripsiyon", items=len(pending_audio)):
+                transcribed = backend.transcribe_batch(pending_audio, sampling_rate)
+            if meter is not None:
+                meter.add(pending_audio, sampling_rate, time.perf_counter() - start)
+
+            for position, prediction in zip(pending, transcribed):
+                predictions[position] = prediction
+            if cache is not None:
+                with profiler.stage("onbellek_yazma", items=len(pending)):
+                    cache.put_many([(hashes[position], predictions[position]) for position in pending])
+
+        profiler.samples_processed(len(audio_arrays))
+        startup.mark("ilk_transkript")
+        for idx, ground_truth, prediction in zip(indices, ground_truths, predictions):
+            yield idx, ground_truth, prediction
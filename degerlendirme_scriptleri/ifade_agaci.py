@@ -0,0 +1,306 @@
+# ATC İfade Ağacı ile Kısıtlı Çözümleme
+# Bu modül, eğitim transkriptlerindeki kelimelerin token dizilerinden bir önek ağacı (trie) kurar ve diske
+# önbelleğe alır. Ağaç, `generate` sırasında logits işlemcisi olarak kullanılarak çözümlemeyi ATC sözlüğüyle
+# kısıtlar veya bu sözlüğe doğru yönlendirir; ayrıca üretilecek token sayısını ses süresiyle sınırlar
+# Kullanım: python ifade_agaci.py --model mehmedadymn/Air-traffic-control-fine-tuned-faster-whisper [--kaynak metinler.txt]
+
+import argparse
+import hashlib
+import json
+import os
+from num2words import num2words
+from metin_normalizasyonu import phonetic_alphabet
+
+KIPLER = ("kisitla", "yonlendir")
+VARSAYILAN_ONBELLEK = "ifade_agaci"
+
+
+def load_training_texts(source=None):
+    """
+    Ağacın kurulacağı transkriptleri yükler.
+
+    Parametreler:
+    source: None ise hub'daki eğitim bölümünün metinleri; paketlenmiş yerel veri
+            setiyse eğitim bölümünün (yoksa tüm bölümlerin) metinleri; diğer
+            klasörlerde yerel örnek çiftlerinin metinleri; dosyaysa satır başına
+            bir transkript
+    """
+    from paketli_veri_seti import open_dataset, is_packed_dataset
+    if source is None:
+        return open_dataset()['train']['text']
+    if os.path.isdir(source) and is_packed_dataset(source):
+        splits = open_dataset(source)
+        selected = [splits['train']] if 'train' in splits else splits.values()
+        return [text for split in selected for text in split['text']]
+    if os.path.isdir(source):
+        from yerel_ornekler import find_sample_pairs
+        texts = []
+        for _, _, text_path in find_sample_pairs(source):
+            with open(text_path, encoding="utf-8") as file:
+                texts.append(file.read().strip())
+        return texts
+    with open(source, encoding="utf-8") as file:
+        return [line.strip() for line in file if line.strip()]
+
+
+def phraseology_words(texts):
+    """Transkriptlerdeki kelimeler ile fonetik alfabe ve rakam okunuşlarından oluşan sıralı sözlük"""
+    words = {word for text in texts for word in text.lower().split()}
+    words.update(phonetic_alphabet.values())
+    words.update(num2words(digit) for digit in range(10))
+    return sorted(words)
+
+
+class VocabularyTrie:
+    """
+    Kelimelerin (" kelime" biçiminde) token dizilerinden oluşan önek ağacı.
+
+    Düğümler bir listede tutulur; her düğüm {token: çocuk düğüm} sözlüğü ve
+    bir kelimenin orada bitip bitmediğini belirten bayraktan oluşur. Kök
+    düğüm 0'dır. Düğüm başına izin verilen token indeksleri ilk kullanımda
+    hesaplanıp saklanır.
+    """
+    def __init__(self, children, terminal, key):
+        self.children = children
+        self.terminal = terminal
+        self.key = key
+        self._allowed = {}
+
+    @classmethod
+    def build(cls, words, tokenizer, key):
+        children, terminal = [{}], [False]
+        for word in words:
+            node = 0
+            for token in tokenizer.encode(" " + word, add_special_tokens=False):
+                child = children[node].get(token)
+                if child is None:
+                    child = len(children)
+                    children[node][token] = child
+                    children.append({})
+                    terminal.append(False)
+                node = child
+            terminal[node] = True
+        return cls(children, terminal, key)
+
+    def save(self, path):
+        data = {
+            "anahtar": self.key,
+            "cocuklar": [[[token, child] for token, child in node.items()] for node in self.children],
+            "bitis": [index for index, value in enumerate(self.terminal) if value],
+        }
+        temporary_path = path + ".tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump(data, file)
+        os.replace(temporary_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as file:
+            data = json.load(file)
+        children = [{token: child for token, child in node} for node in data["cocuklar"]]
+        terminal = [False] * len(children)
+        for index in data["bitis"]:
+            terminal[index] = True
+        return cls(children, terminal, data["anahtar"])
+
+    def step(self, node, token):
+        """
+        `node` düğümünden `token` ile geçilen düğümü döndürür.
+
+        Kelime bitmişse yeni bir kelimeye kökten başlanabilir; ağaç dışına
+        çıkılırsa (yalnızca yönlendirme kipinde mümkündür) None döndürülür.
+        """
+        child = self.children[node].get(token)
+        if child is None and (node == 0 or self.terminal[node]):
+            child = self.children[0].get(token)
+        return child
+
+    def allowed_tokens(self, node, eos_token_id, device):
+        """Düğümde izin verilen token indekslerini (tensör) döndürür"""
+        import torch
+
+        cache_key = (node, device)
+        allowed = self._allowed.get(cache_key)
+        if allowed is None:
+            tokens = set(self.children[node])
+            if node != 0 and self.terminal[node]:
+                tokens.update(self.children[0])
+                tokens.add(eos_token_id)
+            elif node == 0:
+                tokens.add(eos_token_id)
+            allowed = torch.tensor(sorted(tokens), dtype=torch.long, device=device)
+            self._allowed[cache_key] = allowed
+        return allowed
+
+
+def trie_key(words, tokenizer):
+    """Sözlük ve tokenizer'dan oluşan önbellek anahtarı"""
+    digest = hashlib.sha256()
+    digest.update(f"{tokenizer.name_or_path}:{len(tokenizer)}\n".encode())
+    digest.update("\n".join(words).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def source_identity(source=None):
+    """
+    Transkript kaynağının metinleri okumadan belirlenen kimliği; belirlenemezse None.
+
+    Hub veri seti için deponun revizyonu (çevrimdışıysa None), paketlenmiş yerel
+    veri seti için paket anahtarı, diğer klasör ve dosyalar için metin
+    dosyalarının yolu, boyutu ve değişiklik zamanı kullanılır.
+    """
+    from paketli_veri_seti import is_packed_dataset, DIZIN_DOSYASI, VARSAYILAN_VERI_SETI
+    if source is None:
+        try:
+            from huggingface_hub import HfApi
+            return f"hub:{VARSAYILAN_VERI_SETI}@{HfApi().dataset_info(VARSAYILAN_VERI_SETI).sha}"
+        except Exception:
+            return None
+    if os.path.isdir(source) and is_packed_dataset(source):
+        with open(os.path.join(source, DIZIN_DOSYASI), encoding="utf-8") as file:
+            return f"paket:{json.load(file)['anahtar']}"
+    if os.path.isdir(source):
+        from yerel_ornekler import find_sample_pairs
+        paths = [text_path for _, _, text_path in find_sample_pairs(source)]
+    else:
+        paths = [source]
+    digest = hashlib.sha256()
+    for path in paths:
+        stat = os.stat(path)
+        digest.update(f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}\n".encode("utf-8"))
+    return f"dosya:{digest.hexdigest()[:16]}"
+
+
+def load_or_build_trie(tokenizer, source=None, cache_dir=VARSAYILAN_ONBELLEK):
+    """
+    Ağacı önbellekten yükler; sözlük veya tokenizer değiştiyse yeniden kurup kaydeder.
+
+    Önbellek, kaynağın kimliği (bkz. source_identity) ve tokenizer ile
+    aranır; eşleşme varsa transkriptler hiç okunmaz. Yalnızca eşleşme
+    yoksa metinler yüklenip sözlüğün içerik anahtarı hesaplanır. Hub
+    revizyonu çevrimdışıyken belirlenemediğinden hub kaynağında son
+    bilinen revizyonun ağacı kullanılır.
+
+    Parametreler:
+    tokenizer: Modelin tokenizer'ı
+    source: Transkript kaynağı (bkz. load_training_texts)
+    cache_dir: Ağaç dosyalarının saklandığı klasör
+    """
+    identity = source_identity(source)
+    sources_path = os.path.join(cache_dir, "kaynaklar.json")
+    sources = {}
+    if os.path.exists(sources_path):
+        with open(sources_path, encoding="utf-8") as file:
+            sources = json.load(file)
+    tokenizer_id = f"{tokenizer.name_or_path}:{len(tokenizer)}"
+    source_keys = [f"{identity}|{tokenizer_id}"] if identity else []
+    if source is None:
+        source_keys.append(f"hub:son-bilinen|{tokenizer_id}")
+    source_key = source_keys[0] if source_keys else None
+    if source_key in sources:
+        path = os.path.join(cache_dir, f"agac_{sources[source_key]}.json")
+        if os.path.exists(path):
+            return VocabularyTrie.load(path)
+
+    words = phraseology_words(load_training_texts(source))
+    key = trie_key(words, tokenizer)
+    path = os.path.join(cache_dir, f"agac_{key}.json")
+    if os.path.exists(path):
+        trie = VocabularyTrie.load(path)
+    else:
+        trie = VocabularyTrie.build(words, tokenizer, key)
+        os.makedirs(cache_dir, exist_ok=True)
+        trie.save(path)
+        print(f"İfade ağacı oluşturuldu: {len(words)} kelime, {len(trie.children)} düğüm -> {path}")
+    if source_keys:
+        sources.update({name: key for name in source_keys})
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(sources_path + ".tmp", "w", encoding="utf-8") as file:
+            json.dump(sources, file, ensure_ascii=False, indent=2)
+        os.replace(sources_path + ".tmp", sources_path)
+    return trie
+
+
+class PhraseologyLogitsProcessor:
+    """
+    Çözümlemeyi ifade ağacıyla kısıtlayan veya yönlendiren logits işlemcisi.
+
+    "kisitla" kipinde ağaçta izin verilmeyen tokenların puanı -inf yapılır;
+    "yonlendir" kipinde izin verilen tokenlara `bias` eklenir ve ağaç dışına
+    çıkan diziler serbest bırakılır. Metin, dizideki son özel tokendan
+    (Whisper'da tüm özel tokenlar EOS ve sonrasındadır) sonra başlar; böylece
+    istem (prompt) uzunluğu bilinmeden ve yardımlı çözümlemede de çalışır.
+    Düğümler dizi önekleriyle saklandığından her adımda yalnızca son token
+    işlenir; bu tablo büyümesin diye her batch için yeni bir örnek oluşturulur.
+    `generate` logits işlemcilerinden yalnızca çağrı arayüzünü beklediğinden
+    sınıf transformers.LogitsProcessor'dan türetilmez; modül torch ve
+    transformers içe aktarılmadan yüklenebilir.
+    """
+    def __init__(self, trie, eos_token_id, mode="kisitla", bias=5.0):
+        self.trie = trie
+        self.eos_token_id = eos_token_id
+        self.mode = mode
+        self.bias = bias
+        self._nodes = {(): 0}
+
+    def _text_tokens(self, sequence):
+        for position in range(len(sequence) - 1, -1, -1):
+            if sequence[position] >= self.eos_token_id:
+                return tuple(sequence[position + 1:])
+        return tuple(sequence)
+
+    def _node(self, tokens):
+        node = self._nodes.get(tokens)
+        if node is None and tokens not in self._nodes:
+            parent = self._node(tokens[:-1])
+            node = None if parent is None else self.trie.step(parent, tokens[-1])
+            self._nodes[tokens] = node
+        return node
+
+    def __call__(self, input_ids, scores):
+        import torch
+
+        if self.mode == "kisitla":
+            mask = torch.full_like(scores, float("-inf"))
+        for row, sequence in enumerate(input_ids.tolist()):
+            node = self._node(self._text_tokens(sequence))
+            if node is None:
+                if self.mode == "kisitla":
+                    mask[row] = 0
+                continue
+            allowed = self.trie.allowed_tokens(node, self.eos_token_id, scores.device)
+            if self.mode == "kisitla":
+                mask[row, allowed] = 0
+            else:
+                scores[row, allowed] += self.bias
+        return scores + mask if self.mode == "kisitla" else scores
+
+
+def max_new_tokens_for(durations, tokens_per_second, minimum_tokens=16, limit=None):
+    """
+    Batch'teki en uzun klibin süresine göre üretilecek en fazla token sayısı.
+
+    Parametreler:
+    durations: Kliplerin saniye cinsinden süreleri
+    tokens_per_second: Saniye başına izin verilen token sayısı
+    minimum_tokens: Çok kısa klipler için alt sınır
+    limit: Modelin izin verdiği üst sınır (örn. max_target_positions'tan türetilen)
+    """
+    tokens = max(minimum_tokens, int(max(durations, default=0) * tokens_per_second + 0.5) + minimum_tokens)
+    return min(tokens, limit) if limit else tokens
+
+
+if __name__ == "__main__":
+    from transformers import WhisperTokenizer
+
+    parser = argparse.ArgumentParser(description="Eğitim transkriptlerinden ATC ifade ağacını oluşturur")
+    parser.add_argument("--model", default="mehmedadymn/Air-traffic-control-fine-tuned-faster-whisper",
+                        help="Tokenizer'ın alınacağı model")
+    parser.add_argument("--kaynak", default=None,
+                        help="Transkript kaynağı: yerel örnek klasörü veya satır başına bir metin içeren dosya "
+                             "(varsayılan: hub'daki eğitim bölümü)")
+    parser.add_argument("--onbellek", default=VARSAYILAN_ONBELLEK, help="Ağaç dosyalarının saklanacağı klasör")
+    args = parser.parse_args()
+
+    trie = load_or_build_trie(WhisperTokenizer.from_pretrained(args.model), args.kaynak, args.onbellek)
+    print(f"İfade ağacı hazır: {len(trie.children)} düğüm (anahtar {trie.key})")
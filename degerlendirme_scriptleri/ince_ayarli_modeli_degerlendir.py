@@ -1,129 +1,163 @@
 # İnce Ayarlı Whisper Modelinin Değerlendirme Scripti
 # Bu script, ince ayar yapılmış Whisper modelinin performansını test veri seti üzerinde değerlendirir
 
-import torch
-from transformers import WhisperProcessor, WhisperForConditionalGeneration
+import argparse
 import numpy as np
-import soundfile as sf
-import os
-import jiwer
-from datasets import load_dataset
-import pandas as pd
-import re
+from degerlendirme_motoru import run_batched_transcription, ThroughputMeter
+from cikarim_arka_uclari import create_backend, add_backend_arguments
+from sonuc_yazici import JsonlResultWriter, aggregate_results
+from tahmin_onbellegi import PredictionCache
+from zamanlayici import startup, add_profiling_arguments, configure_profiling, finish_profiling
+from paralel_degerlendirme import run_sharded_evaluation, add_parallel_arguments
+from paketli_veri_seti import open_dataset, VARSAYILAN_VERI_SETI
+
+def load_test_split(source=VARSAYILAN_VERI_SETI):
+    """
+    Test veri setini yükler
 
-# Test veri setini yükle
-dataset = load_dataset("mehmedadymn/air-traffic-dataset")
+    Modül düzeyinde yüklenmez; böylece paralel değerlendirmenin işçi süreçleri
+    scripti içe aktarırken veri setini yeniden yüklemez.
 
-def generate_transcription_and_process_results(model_name, log_file_path="whisper-medium-tr-degerlendirme-ham-veriler.txt", seed=None):
+    Parametreler:
+    source: Hugging Face veri seti kimliği veya paketli_veri_seti.py ile oluşturulmuş yerel klasör
+    """
+    return open_dataset(source)['test']
+
+def build_result_row(idx, ground_truth, prediction):
+    """Bir örneğin JSONL sonuç satırını oluşturur"""
+    normalized_prediction = prediction.strip()
+
+    return {
+        "ornek": idx + 1,
+        "gercek_metin": ground_truth,
+        "tahmin": normalized_prediction,
+    }
+
+def generate_transcription_and_process_results(model_name, results_path="whisper-medium-tr-degerlendirme-sonuclari.jsonl", seed=None,
+                                               batch_size=8, sort_window=16,
+                                               cache_path="tahmin_onbellegi.sqlite", cache_max_mb=256,
+                                               backend="transformers", backend_options=None,
+                                               num_processes=1, threads_per_process=None,
+                                               dataset_source=VARSAYILAN_VERI_SETI):
     """
     İnce ayarlı model ile transkripsiyon oluşturma ve sonuçları işleme fonksiyonu
     
     Parametreler:
     model_name: Kullanılacak modelin adı
-    log_file_path: Sonuçların kaydedileceği geçici dosya yolu
+    results_path: Örnek başına sonuçların akış halinde yazılacağı JSONL dosyası
     seed: Rastgelelik için tohum değeri
+    batch_size: Tek bir `generate` çağrısında işlenecek örnek sayısı
+    sort_window: Süreye göre sıralama penceresinin batch cinsinden büyüklüğü
+    cache_path: Tahmin önbelleği dosyası (None ise önbellek kullanılmaz)
+    cache_max_mb: Tahmin önbelleğinin MB cinsinden üst sınırı
+    backend: Çıkarım arka ucu ("transformers" veya "ctranslate2")
+    backend_options: Arka uca iletilecek ek ayarlar (compute_type, cpu_threads, num_workers, device,
+                     feature_store_dir, assistant_model_name, phraseology_mode, phraseology_source,
+                     phraseology_bias, tokens_per_second, low_cpu_mem_usage)
+    num_processes: 1'den büyükse test bölümü bu kadar işçi sürece dağıtılır (her biri kendi model kopyasıyla)
+    threads_per_process: Süreç başına PyTorch iş parçacığı sayısı (None: çekirdekler eşit paylaştırılır)
+    dataset_source: Test bölümünün alınacağı veri seti (hub kimliği veya paketlenmiş yerel klasör)
     """
     if seed is not None:
         np.random.seed(seed)
 
-    # Model ve işlemciyi yükle
-    processor = WhisperProcessor.from_pretrained(model_name)
-    model = WhisperForConditionalGeneration.from_pretrained(model_name)
-    model.to("cuda" if torch.cuda.is_available() else "cpu")
-
-    with open(log_file_path, "w") as log_file:
-        wer_list = []
-
-        # Her test örneği için transkripsiyon oluştur
-        for idx in range(len(dataset['test'])):
-            sample = dataset['test'][idx]
-            audio_array = np.array(sample['audio']['array'])
-            audio_sr = sample['audio']['sampling_rate']
-            ground_truth = sample['text']
-
-            # Geçici ses dosyası oluştur
-            audio_path = f"temp_audio_{idx}.wav"
-            sf.write(audio_path, audio_array, audio_sr)
-
-            # Ses dosyasını oku
-            audio_input, _ = sf.read(audio_path)
-
-            # Model girdilerini hazırla
-            inputs = processor(audio_input, return_tensors="pt", sampling_rate=audio_sr)
-            inputs = {key: val.to(model.device) for key, val in inputs.items()}
-
-            # Transkripsiyon oluştur
-            with torch.no_grad():
-                generated_ids = model.generate(**inputs)
-                prediction = processor.batch_decode(generated_ids, skip_special_tokens=True)[0]
-
-            normalized_prediction = prediction.strip()
-
-            # WER hesapla
-            wer = jiwer.wer(ground_truth, normalized_prediction)
-            wer_list.append(wer)
-
-            # Sonuçları kaydet
-            log_file.write(f"--------------------------------------------------\n")
-            log_file.write(f"Örnek {idx + 1}:\n")
-            log_file.write(f"Gerçek Metin: {ground_truth}\n")
-            log_file.write(f"Tahmin: {normalized_prediction}\n")
-            log_file.write(f"Kelime Hata Oranı (WER): {wer * 100:.2f}%\n")
-            log_file.write(f"--------------------------------------------------\n")
-
-            # Geçici ses dosyasını sil
-            if os.path.exists(audio_path):
-                os.remove(audio_path)
-
-        # Ortalama WER hesapla
-        avg_wer = np.mean(wer_list) * 100
-
-        log_file.write(f"\n{len(dataset['test'])} örnek üzerindeki Ortalama Kelime Hata Oranı (WER): {avg_wer:.2f}%\n")
-        log_file.write(f"--------------------------------------------------\n")
+    split = load_test_split(dataset_source)
+    startup.mark("veri_seti")
+
+    if num_processes > 1:
+        meter, label = run_sharded_evaluation(
+            split, build_result_row, results_path, num_processes, threads_per_process=threads_per_process,
+            backend=backend, model_name=model_name, backend_options=backend_options,
+            batch_size=batch_size, sort_window=sort_window, cache_path=cache_path, cache_max_mb=cache_max_mb
+        )
+        print(meter.summary())
+        process_evaluation_results(results_path, label=label)
+        return
+
+    # Modeli seçilen arka uçla yükle
+    backend = create_backend(backend, model_name, **(backend_options or {}))
+    meter = ThroughputMeter()
+
+    # Aynı model ve ses için daha önce üretilmiş tahminleri önbellekten kullan
+    cache = None
+    if cache_path:
+        cache = PredictionCache(cache_path, backend.cache_key(), max_bytes=cache_max_mb * 1024 * 1024)
+
+    with JsonlResultWriter(results_path) as writer:
+        # Test örneklerini süreye göre gruplanmış batch'ler halinde yazıya dök
+        for idx, ground_truth, prediction in run_batched_transcription(
+            backend, split, batch_size=batch_size, sort_window=sort_window,
+            meter=meter, cache=cache
+        ):
+            # Sonucu hemen diske yaz (puanlama tüm sonuçlar üzerinde toplu yapılır)
+            writer.write(build_result_row(idx, ground_truth, prediction))
+
+    if cache is not None:
+        cache.close()
+    print(meter.summary())
 
     # Sonuçları işle
-    process_evaluation_log(log_file_path, avg_wer)
+    process_evaluation_results(results_path, label=backend.label)
 
-def process_evaluation_log(log_file_path, avg_wer):
+def process_evaluation_results(results_path, label=""):
     """
-    Değerlendirme sonuçlarını işleyip CSV dosyasına kaydetme fonksiyonu
+    JSONL değerlendirme sonuçlarını tek geçişte puanlayıp CSV dosyasına kaydetme fonksiyonu
     
     Parametreler:
-    log_file_path: İşlenecek log dosyasının yolu
-    avg_wer: Ortalama WER değeri
+    results_path: İşlenecek JSONL sonuç dosyasının yolu
+    label: CSV dosya adına eklenecek arka uç etiketi
     """
-    # Log dosyasını oku
-    with open(log_file_path, 'r') as file:
-        data = file.read()
-
-    # Sonuçları düzenli ifadelerle ayıkla
-    pattern = r"Örnek\s+(\d+):\s*Gerçek Metin:\s*(.+)\s*Tahmin:\s*(.+)\s*Kelime Hata Oranı \(WER\):\s*([\d.]+)%"
-    matches = re.findall(pattern, data)
-
-    # DataFrame oluştur
-    df = pd.DataFrame(matches, columns=['Örnek', 'Gerçek Metin', 'Tahmin', 'WER'])
-
-    # Veri tiplerini düzelt
-    df['Örnek'] = df['Örnek'].astype(int)
-    df['WER'] = df['WER'].astype(float)
-
-    # WER'e göre sırala
-    df_sorted = df.sort_values(by='WER', ascending=False)
-
-    # Dosya adı için WER değerini formatla
-    wer_str = f"{avg_wer:.2f}"
-
-    # CSV dosyasına kaydet
-    csv_filename = f'whisper-medium.en-fine-tuned-for-ATC-{wer_str}-WER-evaluation-data.csv'
-    df_sorted.to_csv(csv_filename, index=False)
-
-    print(f"Ortalama WER: {wer_str}%")
+    columns = [
+        ("ornek", "Örnek"), ("gercek_metin", "Gerçek Metin"), ("tahmin", "Tahmin"), ("wer", "WER"), ("cer", "CER"),
+        ("ikame", "İkame"), ("silme", "Silme"), ("ekleme", "Ekleme"), ("hizalama", "Hizalama"),
+    ]
+    score, csv_filename = aggregate_results(
+        results_path, columns, "whisper-medium.en-fine-tuned-for-ATC" + label + "-{wer}-WER-evaluation-data.csv",
+        reference_key="gercek_metin", hypothesis_key="tahmin", order_key="ornek"
+    )
+
+    if score is None:
+        print(f"{results_path} dosyasında sonuç bulunamadı.")
+        return
+
+    print(score.summary())
     print(f"Sonuçlar şu dosyaya kaydedildi: {csv_filename}")
 
-    # Geçici log dosyasını sil
-    if os.path.exists(log_file_path):
-        os.remove(log_file_path)
+def main(argv=None):
+    """Komut satırı giriş noktası (bkz. komut_satiri.py)"""
+    parser = argparse.ArgumentParser(description="İnce ayarlı Whisper modelini test veri seti üzerinde değerlendirir")
+    parser.add_argument("--model", default="mehmedadymn/Air-traffic-control-fine-tuned-faster-whisper",
+                        help="Değerlendirilecek model kimliği veya klasörü")
+    parser.add_argument("--veri-seti", default=VARSAYILAN_VERI_SETI,
+                        help="Hugging Face veri seti veya paketli_veri_seti.py ile oluşturulmuş yerel klasör")
+    parser.add_argument("--batch-boyutu", type=int, default=8, help="Tek bir generate çağrısındaki örnek sayısı")
+    parser.add_argument("--siralama-penceresi", type=int, default=16,
+                        help="Süreye göre sıralama penceresi (batch cinsinden)")
+    parser.add_argument("--onbellek", default="tahmin_onbellegi.sqlite", help="Tahmin önbelleği dosyası")
+    parser.add_argument("--onbellek-boyutu-mb", type=int, default=256, help="Tahmin önbelleğinin üst sınırı (MB)")
+    parser.add_argument("--onbellegi-kullanma", action="store_true",
+                        help="Önbelleği devre dışı bırakıp tüm klipleri yeniden çözümle")
+    add_backend_arguments(parser)
+    add_profiling_arguments(parser)
+    add_parallel_arguments(parser)
+    args = parser.parse_args(argv)
+    configure_profiling(args)
+
+    generate_transcription_and_process_results(
+        model_name=args.model, batch_size=args.batch_boyutu, sort_window=args.siralama_penceresi,
+        cache_path=None if args.onbellegi_kullanma else args.onbellek, cache_max_mb=args.onbellek_boyutu_mb,
+        backend=args.arka_uc, backend_options={
+            "compute_type": args.hesaplama_tipi, "cpu_threads": args.cpu_is_parcacigi,
+            "num_workers": args.isci_sayisi, "device": args.cihaz,
+            "feature_store_dir": args.ozellik_deposu, "assistant_model_name": args.yardimci_model,
+            "phraseology_mode": args.ifade_kipi, "phraseology_source": args.ifade_kaynagi,
+            "phraseology_bias": args.ifade_puani, "tokens_per_second": args.saniye_basina_token,
+            "low_cpu_mem_usage": args.dusuk_bellek,
+        },
+        num_processes=args.surec_sayisi, threads_per_process=args.surec_basina_is_parcacigi,
+        dataset_source=args.veri_seti,
+    )
+    finish_profiling(args)
 
 if __name__ == "__main__":
-    model_name = "mehmedadymn/Air-traffic-control-fine-tuned-faster-whisper"
-    generate_transcription_and_process_results(model_name=model_name) 
\ No newline at end of file
+    main()
@@ -0,0 +1,62 @@
+# Birleşik Komut Satırı
+# Bu script, değerlendirme, transkripsiyon ve dışa aktarma scriptlerini tek giriş noktasından alt komut
+# olarak çalıştırır. Yalnızca seçilen alt komutun modülü içe aktarılır (torch/transformers gibi ağır
+# kütüphaneler de ancak gerektiğinde yüklenir); çıkışta ilk transkripte kadar geçen süre ve en yüksek
+# bellek kullanımı raporlanır
+# Kullanım: python komut_satiri.py [--baslangic-raporu rapor.json] transkripsiyon --ses kayit.wav --model MODEL
+
+import argparse
+import importlib
+import os
+import sys
+from zamanlayici import startup, report_startup
+
+ARACLAR_DIZINI = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "araclar")
+
+# Alt komut → (modül, açıklama); modüllerin her biri main(argv) sağlar
+KOMUTLAR = {
+    "degerlendir": ("ince_ayarli_modeli_degerlendir", "İnce ayarlı modeli test bölümünde değerlendirir"),
+    "degerlendir-onceden-egitilmis": ("onceden_egitilmis_modeli_degerlendir",
+                                      "Önceden eğitilmiş modeli test bölümünde değerlendirir"),
+    "transkripsiyon": ("uzun_kayit_transkripsiyonu", "Uzun bir kaydı parçalara bölerek transkribe eder"),
+    "disa-aktar": ("modeli_cikarim_icin_disa_aktar", "Eğitilmiş modeli çıkarım için safetensors olarak dışa aktarır"),
+}
+
+
+def run_command(name, argv):
+    """
+    Alt komutun modülünü içe aktarır ve main(argv) fonksiyonunu çalıştırır.
+
+    Parametreler:
+    name: KOMUTLAR içindeki alt komut adı
+    argv: Alt komuta iletilecek argümanlar
+    """
+    module_name = KOMUTLAR[name][0]
+    if name == "disa-aktar" and ARACLAR_DIZINI not in sys.path:
+        sys.path.insert(0, ARACLAR_DIZINI)
+    module = importlib.import_module(module_name)
+    startup.mark("ice_aktarma")
+    return module.main(argv)
+
+
+def main(argv=None):
+    commands = "\n".join(f"  {name:<30} {description}" for name, (_, description) in KOMUTLAR.items())
+    parser = argparse.ArgumentParser(
+        description="Değerlendirme, transkripsiyon ve dışa aktarma için birleşik giriş noktası",
+        epilog=f"Alt komutlar:\n{commands}\n\nAlt komutun seçenekleri için: komut_satiri.py KOMUT --help",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--baslangic-raporu", default=None,
+                        help="İlk transkripte kadar geçen süre ve en yüksek RSS raporunun yazılacağı JSON dosyası")
+    parser.add_argument("komut", choices=list(KOMUTLAR), help="Çalıştırılacak alt komut")
+    parser.add_argument("argumanlar", nargs=argparse.REMAINDER, help="Alt komuta iletilecek argümanlar")
+    args = parser.parse_args(argv)
+
+    try:
+        run_command(args.komut, args.argumanlar)
+    finally:
+        report_startup(args.baslangic_raporu)
+
+
+if __name__ == "__main__":
+    main()
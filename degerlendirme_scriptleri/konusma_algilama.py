@@ -0,0 +1,142 @@
+# Enerji Tabanlı Konuşma Algılama (VAD)
+# Bu modül, uzun frekans kayıtlarını blok blok okuyup telsiz yayınlarına (transmission) ayıran
+# akış (streaming) tabanlı enerji dedektörünü içerir; bellek kullanımı kayıt uzunluğundan bağımsızdır
+
+from collections import deque
+from math import gcd
+import numpy as np
+import soundfile as sf
+from scipy.signal import resample_poly
+
+
+def read_blocks(path, block_seconds=10.0):
+    """
+    Ses dosyasını `soundfile` blok okumasıyla sabit boyutlu mono float32 bloklar halinde okur.
+
+    Döndürür: (örnekleme hızı, blok üreteci)
+    """
+    info = sf.info(path)
+    blocksize = max(1, int(block_seconds * info.samplerate))
+
+    def blocks():
+        for block in sf.blocks(path, blocksize=blocksize, dtype="float32", always_2d=True):
+            yield block.mean(axis=1)
+
+    return info.samplerate, blocks()
+
+
+def resample(audio, source_rate, target_rate=16000):
+    """Sesi çok fazlı (polyphase) filtreyle hedef örnekleme hızına dönüştürür"""
+    if source_rate == target_rate:
+        return audio.astype(np.float32, copy=False)
+    divisor = gcd(int(source_rate), int(target_rate))
+    return resample_poly(audio, target_rate // divisor, source_rate // divisor).astype(np.float32)
+
+
+class EnergyVAD:
+    """
+    Uyarlanır gürültü tabanlı, akış tabanlı enerji dedektörü.
+
+    Ses `frame_seconds` uzunluğundaki karelere bölünür ve her karenin enerjisi
+    (dB) izlenen gürültü tabanıyla karşılaştırılır. Gürültü tabanı sessiz
+    karelerde yavaşça güncellenir, böylece frekanstaki sabit uğultu konuşma
+    sayılmaz. Art arda `min_speech_seconds` kadar yüksek enerji konuşmayı
+    başlatır; `min_silence_seconds` kadar sessizlik bitirir. Başa ve sona
+    `padding_seconds` kadar bağlam eklenir; `max_segment_seconds` (Whisper
+    penceresi) aşılırsa bölüt zorla kesilir.
+    """
+    def __init__(self, sampling_rate, frame_seconds=0.03, threshold_db=9.0, min_speech_seconds=0.15,
+                 min_silence_seconds=0.6, padding_seconds=0.2, max_segment_seconds=30.0, min_floor_db=-70.0):
+        self.sampling_rate = sampling_rate
+        self.frame_length = max(1, int(frame_seconds * sampling_rate))
+        self.threshold_db = threshold_db
+        self.min_speech_frames = max(1, round(min_speech_seconds / frame_seconds))
+        self.min_silence_frames = max(1, round(min_silence_seconds / frame_seconds))
+        self.padding_frames = max(0, round(padding_seconds / frame_seconds))
+        self.max_segment_frames = max(1, int(max_segment_seconds / frame_seconds))
+        self.min_floor_db = min_floor_db
+
+        self.noise_floor_db = None
+        self._remainder = np.zeros(0, dtype=np.float32)
+        self._frame_index = 0
+        self._history = deque(maxlen=self.padding_frames + self.min_speech_frames)
+        self._segment = None
+        self._segment_start = 0
+        self._loud_run = 0
+        self._quiet_run = 0
+
+    def _frame_energies(self, frames):
+        power = np.mean(frames.astype(np.float64) ** 2, axis=1)
+        return 10 * np.log10(np.maximum(power, 1e-12))
+
+    def _update_floor(self, energy_db):
+        if self.noise_floor_db is None:
+            self.noise_floor_db = max(energy_db, self.min_floor_db)
+        elif energy_db < self.noise_floor_db:
+            # Daha sessiz kareye hızlı in, sessiz karelerde yavaşça yüksel
+            self.noise_floor_db = max(energy_db, self.min_floor_db)
+        else:
+            self.noise_floor_db = max(self.min_floor_db, 0.995 * self.noise_floor_db + 0.005 * energy_db)
+
+    def _finish_segment(self, trailing_silence):
+        frames = self._segment[:len(self._segment) - max(0, trailing_silence - self.padding_frames)]
+        start = self._segment_start
+        self._segment = None
+        self._quiet_run = 0
+        audio = np.concatenate(frames) if frames else np.zeros(0, dtype=np.float32)
+        return start * self.frame_length, audio
+
+    def process(self, block):
+        """
+        Yeni bir ses bloğunu işler ve tamamlanan bölütleri döndürür.
+
+        Döndürür: (başlangıç örneği, ses dizisi) çiftlerinin listesi
+        """
+        samples = np.concatenate([self._remainder, np.asarray(block, dtype=np.float32)])
+        frame_count = len(samples) // self.frame_length
+        self._remainder = samples[frame_count * self.frame_length:]
+        if frame_count == 0:
+            return []
+        frames = samples[:frame_count * self.frame_length].reshape(frame_count, self.frame_length)
+        energies = self._frame_energies(frames)
+
+        finished = []
+        for frame, energy_db in zip(frames, energies):
+            if self.noise_floor_db is None:
+                self._update_floor(energy_db)
+            loud = energy_db > self.noise_floor_db + self.threshold_db
+
+            if self._segment is None:
+                self._history.append(frame)
+                self._loud_run = self._loud_run + 1 if loud else 0
+                if not loud:
+                    self._update_floor(energy_db)
+                if self._loud_run >= self.min_speech_frames:
+                    self._segment = list(self._history)
+                    self._segment_start = self._frame_index + 1 - len(self._segment)
+                    self._history.clear()
+                    self._loud_run = 0
+                    self._quiet_run = 0
+            else:
+                self._segment.append(frame)
+                self._quiet_run = 0 if loud else self._quiet_run + 1
+                if self._quiet_run >= self.min_silence_frames:
+                    finished.append(self._finish_segment(self._quiet_run))
+                elif len(self._segment) >= self.max_segment_frames:
+                    finished.append(self._finish_segment(0))
+                    # Kesilen yayın, bir sonraki karede kaldığı yerden yeni bölüt olarak sürer
+                    self._segment, self._segment_start = [], self._frame_index + 1
+            self._frame_index += 1
+        return finished
+
+    def pending_segment(self):
+        """Henüz bitmemiş bölütü (başlangıç örneği, ses dizisi) olarak döndürür; yoksa None"""
+        if not self._segment:
+            return None
+        return self._segment_start * self.frame_length, np.concatenate(self._segment)
+
+    def flush(self):
+        """Dosya sonunda açık kalan bölütü döndürür"""
+        if self._segment:
+            return [self._finish_segment(self._quiet_run)]
+        return []
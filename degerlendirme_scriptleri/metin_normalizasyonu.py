@@ -0,0 +1,128 @@
+# ATC Metin Normalizasyonu
+# Bu modül, model tahminlerindeki sayıları, harfleri ve özel formatları (uçuş seviyesi,
+# pist numarası vb.) ATC veri setindeki yazım biçimine dönüştürür
+
+import re
+import string
+from functools import lru_cache
+from num2words import num2words
+
+# NATO fonetik alfabesi
+phonetic_alphabet = {
+    'a': 'alfa', 'b': 'bravo', 'c': 'charlie', 'd': 'delta', 'e': 'echo',
+    'f': 'foxtrot', 'g': 'golf', 'h': 'hotel', 'i': 'india', 'j': 'juliett',
+    'k': 'kilo', 'l': 'lima', 'm': 'mike', 'n': 'november', 'o': 'oscar',
+    'p': 'papa', 'q': 'quebec', 'r': 'romeo', 's': 'sierra', 't': 'tango',
+    'u': 'uniform', 'v': 'victor', 'w': 'whiskey', 'x': 'x-ray', 'y': 'yankee', 'z': 'zulu'
+}
+
+# Rakam ve harflerin okunuşları için arama tablosu (num2words her rakam için yeniden çağrılmaz)
+_CHARACTER_WORDS = {str(digit): num2words(digit) for digit in range(10)}
+_CHARACTER_WORDS.update(phonetic_alphabet)
+_CHARACTER_WORDS.update({letter.upper(): word for letter, word in phonetic_alphabet.items()})
+
+# Önceden derlenmiş desenler
+_FLIGHT_LEVEL_PATTERN = re.compile(r'\bFL(\d+)\b', re.IGNORECASE)
+_ALTITUDE_PATTERN = re.compile(r'(\d{1,3}(?:,\d{3})?)\s*(feet)', re.IGNORECASE)
+_HYPHENATED_PATTERN = re.compile(r'\b[A-Za-z0-9]+(?:-[A-Za-z0-9]+)+\b')
+_ALPHANUMERIC_PATTERN = re.compile(r'\b(?=[A-Za-z]*\d)[A-Za-z0-9]+\b')
+_RUNWAY_PATTERN = re.compile(r'^(\d{1,2})([LR])$', re.IGNORECASE)
+_DIGITS_PATTERN = re.compile(r'\d+(\.\d+)?')
+_DECIMAL_PATTERN = re.compile(r'^\d+\.\d+$')
+_SINGLE_LETTER_PATTERN = re.compile(r'(?<=\s)([b-hj-zB-HJ-Z])(?=\s)')
+_PUNCTUATION_TABLE = str.maketrans('', '', string.punctuation)
+
+
+@lru_cache(maxsize=4096)
+def _number_words(number):
+    """Tam sayının okunuşunu döndürür (örn. 5000 -> five thousand)"""
+    return num2words(number)
+
+
+def _character_word(char):
+    """Tek bir rakamın veya harfin okunuşunu döndürür"""
+    word = _CHARACTER_WORDS.get(char)
+    if word is None:
+        # ASCII dışı Unicode rakamlar (\d bunlarla da eşleşir)
+        word = _number_words(int(char))
+    return word
+
+
+def _spell_digits(number):
+    """Sayıyı rakam rakam okur (örn. 350 -> three five zero)"""
+    return ' '.join([_character_word(digit) for digit in number])
+
+
+def _convert_flight_level(match):
+    """Uçuş seviyesi formatını dönüştürür (örn. FL350 -> flight level three five zero)"""
+    return f"flight level {_spell_digits(match.group(1))}"
+
+
+def _convert_altitude(match):
+    """Yükseklik formatını dönüştürür (örn. 5000 feet -> five thousand feet)"""
+    number = match.group(1).replace(',', '')
+    return f"{_number_words(int(number))} {match.group(2)}"
+
+
+def _convert_hyphenated_numbers(match):
+    """Tire ile ayrılmış sayı ve harfleri dönüştürür"""
+    result = []
+    for segment in match.group().split('-'):
+        result.append(' '.join([_character_word(char) for char in segment if char.isdigit() or char.isalpha()]))
+    return ' '.join(result)
+
+
+def _convert_alphanumeric(match):
+    """Alfanümerik kodları dönüştürür"""
+    token = match.group()
+
+    # Pist numarası kontrolü (örn. 24L -> two four left)
+    runway_match = _RUNWAY_PATTERN.match(token)
+    if runway_match:
+        expanded_direction = 'left' if runway_match.group(2).upper() == 'L' else 'right'
+        return f"{_spell_digits(runway_match.group(1))} {expanded_direction}"
+
+    if any(char.isdigit() for char in token) and any(char.isalpha() for char in token):
+        return ' '.join([_character_word(char) for char in token if char.isdigit() or char.isalpha()])
+    return token
+
+
+def _convert_digits(match):
+    """Sayıları kelime formatına dönüştürür"""
+    number = match.group()
+    if _DECIMAL_PATTERN.match(number):  # Ondalık sayılar
+        integer_part, decimal_part = number.split('.')
+        return f"{_spell_digits(integer_part)} decimal {_spell_digits(decimal_part)}"
+    elif number.isdigit():  # Tam sayılar
+        return _spell_digits(number)
+    return number
+
+
+def _convert_single_letters(match):
+    """Tek harfleri NATO fonetik alfabesine dönüştürür"""
+    return _CHARACTER_WORDS[match.group(1)]
+
+
+def normalize_prediction(text):
+    """
+    Model tahminlerini normalize etme fonksiyonu.
+    Sayıları, harfleri ve özel formatları standart bir biçime dönüştürür.
+    """
+    # Dönüşümlerin sırası önemlidir; her adım bir öncekinin çıktısı üzerinde çalışır
+    text = _FLIGHT_LEVEL_PATTERN.sub(_convert_flight_level, text)
+    text = _ALTITUDE_PATTERN.sub(_convert_altitude, text)
+    text = _HYPHENATED_PATTERN.sub(_convert_hyphenated_numbers, text)
+    text = _ALPHANUMERIC_PATTERN.sub(_convert_alphanumeric, text)
+    text = _DIGITS_PATTERN.sub(_convert_digits, text)
+    text = _SINGLE_LETTER_PATTERN.sub(_convert_single_letters, text)
+    # Bu noktada metinde rakam kalmadığından rakamlar arasında olmayan noktaları
+    # silmek, tüm noktaları silmekle aynıdır
+    text = text.replace('.', '')
+    text = text.replace('take off', 'takeoff')
+    text = text.translate(_PUNCTUATION_TABLE)
+    return text.lower()
+
+
+def normalize_predictions(texts):
+    """Bir tahmin listesini tek çağrıda normalize eder"""
+    return [normalize_prediction(text) for text in texts]
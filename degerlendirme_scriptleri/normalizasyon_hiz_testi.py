@@ -0,0 +1,161 @@
+# Metin Normalizasyonu Hız Testi
+# Bu script, önceden derlenmiş normalizasyon modülünü ilk (her çağrıda desenleri ve yardımcı
+# fonksiyonları yeniden kuran) sürümle karşılaştırır: çıktıların birebir aynı olduğunu doğrular
+# ve saniyede işlenen metin sayısını raporlar
+# Kullanım: python normalizasyon_hiz_testi.py [--veri-seti] [--tekrar 5]
+
+import argparse
+import csv
+import os
+import re
+import string
+import time
+from num2words import num2words
+from metin_normalizasyonu import normalize_predictions, phonetic_alphabet
+
+ORNEK_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "kaldirilan_ornekler",
+                         "removed-samples-evaluation-data.csv")
+
+# Model çıktılarında sık görülen ve tüm dönüşüm dallarını çalıştıran örnekler
+EK_ORNEKLER = [
+    "Climb FL350, contact Praha 127.125.",
+    "Descend to 5,000 feet, QNH 1013.",
+    "Cleared for take off runway 24L, wind 270 degrees 12 knots.",
+    "Lufthansa 4TP turn left heading 090.",
+    "Squawk 7-7-0-0, OK-ABC report at 3000 feet.",
+    "Runway 06R cleared to land, b c d x.",
+    "Maintain FL 120 and 2500 feet. Then 118.5 decimal.",
+]
+
+
+def legacy_normalize_prediction(text):
+    """Değerlendirme scriptindeki ilk normalize_prediction sürümü (karşılaştırma referansı)"""
+    def convert_flight_level(match):
+        """Uçuş seviyesi formatını dönüştürür (örn. FL350 -> flight level three five zero)"""
+        flight_level_number = match.group(1)
+        expanded_flight_level = ' '.join([num2words(int(digit)) for digit in flight_level_number])
+        return f"flight level {expanded_flight_level}"
+
+    def convert_altitude(match):
+        """Yükseklik formatını dönüştürür (örn. 5000 feet -> five thousand feet)"""
+        number = match.group(1).replace(',', '')
+        feet = match.group(2)
+        num = int(number)
+        number_in_words = num2words(num)
+        return f"{number_in_words} {feet}"
+
+    def convert_hyphenated_numbers(match):
+        """Tire ile ayrılmış sayı ve harfleri dönüştürür"""
+        hyphenated_number = match.group()
+        segments = hyphenated_number.split('-')
+        result = []
+        for segment in segments:
+            sub_result = []
+            for char in segment:
+                if char.isdigit():
+                    sub_result.append(num2words(int(char)))
+                elif char.isalpha():
+                    sub_result.append(phonetic_alphabet[char.lower()])
+            result.append(' '.join(sub_result))
+        return ' '.join(result)
+
+    def convert_alphanumeric(match):
+        """Alfanümerik kodları dönüştürür"""
+        token = match.group()
+        has_digit = any(char.isdigit() for char in token)
+        has_alpha = any(char.isalpha() for char in token)
+
+        # Pist numarası kontrolü (örn. 24L -> two four left)
+        runway_match = re.match(r'^(\d{1,2})([LR])$', token, re.IGNORECASE)
+        if runway_match:
+            number = runway_match.group(1)
+            direction = runway_match.group(2).upper()
+            expanded_number = ' '.join([num2words(int(digit)) for digit in number])
+            expanded_direction = 'left' if direction == 'L' else 'right'
+            return f"{expanded_number} {expanded_direction}"
+
+        if has_digit and has_alpha:
+            result = []
+            for char in token:
+                if char.isdigit():
+                    result.append(num2words(int(char)))
+                elif char.isalpha():
+                    result.append(phonetic_alphabet[char.lower()])
+            return ' '.join(result)
+        return token
+
+    def convert_digits(match):
+        """Sayıları kelime formatına dönüştürür"""
+        number = match.group()
+        if re.match(r'^\d+\.\d+$', number):  # Ondalık sayılar
+            parts = number.split('.')
+            integer_part = ' '.join([num2words(int(digit)) for digit in parts[0]])
+            decimal_part = ' '.join([num2words(int(digit)) for digit in parts[1]])
+            return f"{integer_part} decimal {decimal_part}"
+        elif number.isdigit():  # Tam sayılar
+            return ' '.join([num2words(int(digit)) for digit in number])
+        return number
+
+    def convert_single_letters(match):
+        """Tek harfleri NATO fonetik alfabesine dönüştürür"""
+        letter = match.group(1)
+        return phonetic_alphabet[letter.lower()] if len(letter) == 1 else letter
+
+    # Dönüşümleri uygula
+    text = re.sub(r'\bFL(\d+)\b', convert_flight_level, text, flags=re.IGNORECASE)
+    text = re.sub(r'(\d{1,3}(?:,\d{3})?)\s*(feet)', convert_altitude, text, flags=re.IGNORECASE)
+    text = re.sub(r'\b[A-Za-z0-9]+(?:-[A-Za-z0-9]+)+\b', convert_hyphenated_numbers, text)
+    text = re.sub(r'\b(?=[A-Za-z]*\d)[A-Za-z0-9]+\b', convert_alphanumeric, text)
+    text = re.sub(r'\d+(\.\d+)?', convert_digits, text)
+    text = re.sub(r'(?<=\s)([b-hj-zB-HJ-Z])(?=\s)', convert_single_letters, text)
+    text = re.sub(r'(?<!\d)\.(?!\d)', '', text)
+    text = text.replace('take off', 'takeoff')
+    text = text.translate(str.maketrans('', '', string.punctuation))
+    normalized_text = text.lower()
+
+    return normalized_text
+
+
+def load_texts(include_dataset):
+    """Karşılaştırmada kullanılacak metinleri toplar"""
+    texts = list(EK_ORNEKLER)
+    with open(ORNEK_CSV, encoding="utf-8") as file:
+        for row in csv.DictReader(file):
+            texts.extend([row["Ground Truth"], row["Prediction"]])
+
+    if include_dataset:
+        from datasets import load_dataset
+        dataset = load_dataset("mehmedadymn/air-traffic-dataset")
+        texts.extend(dataset["test"]["text"])
+    return texts
+
+
+def measure(function, texts, repeat):
+    """Fonksiyonun saniyede işlediği metin sayısını ölçer"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function(texts)
+    return len(texts) * repeat / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Metin normalizasyonu hız ve eşdeğerlik testi")
+    parser.add_argument("--veri-seti", action="store_true",
+                        help="Hugging Face test bölümündeki metinleri de karşılaştırmaya ekle")
+    parser.add_argument("--tekrar", type=int, default=5, help="Ölçüm için tekrar sayısı")
+    args = parser.parse_args()
+
+    texts = load_texts(args.veri_seti)
+
+    # Çıktıların birebir aynı olduğunu doğrula
+    expected = [legacy_normalize_prediction(text) for text in texts]
+    actual = normalize_predictions(texts)
+    mismatches = [(text, old, new) for text, old, new in zip(texts, expected, actual) if old != new]
+    for text, old, new in mismatches[:10]:
+        print(f"Fark: {text!r}\n  eski: {old!r}\n  yeni: {new!r}")
+    print(f"{len(texts)} metin karşılaştırıldı, {len(mismatches)} farklı çıktı bulundu.")
+
+    legacy_speed = measure(lambda items: [legacy_normalize_prediction(text) for text in items], texts, args.tekrar)
+    new_speed = measure(normalize_predictions, texts, args.tekrar)
+    print(f"Eski sürüm: {legacy_speed:,.0f} metin/sn")
+    print(f"Yeni sürüm: {new_speed:,.0f} metin/sn ({new_speed / legacy_speed:.1f}x)")
@@ -0,0 +1,203 @@
+# Log-Mel Özellik Deposu
+# Bu modül, Whisper log-mel özelliklerini (ses özeti, özellik çıkarıcı ayarları) anahtarıyla
+# bir kez hesaplayıp bellek eşlemeli (memory-mapped) float16 dosyasında saklar; eğitim ve
+# değerlendirme scriptleri özellikleri STFT'yi yeniden çalıştırmadan, kopyalamadan okur
+# Kullanım: python ozellik_deposu.py --depo ./ozellik_deposu --bolum test
+
+import argparse
+import hashlib
+import json
+import os
+import numpy as np
+from tahmin_onbellegi import audio_hash
+
+OZELLIK_DOSYASI = "ozellikler.f16"
+DIZIN_DOSYASI = "dizin.jsonl"
+
+
+def extractor_config_key(feature_extractor):
+    """Özellik çıkarıcının çıktıyı etkileyen ayarlarının kısa özetini döndürür"""
+    config = feature_extractor.to_dict()
+    config.pop("processor_class", None)
+    return hashlib.sha256(json.dumps(config, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+class FeatureStore:
+    """
+    Ekleme tabanlı (append-only) log-mel özellik deposu.
+
+    Özellikler tek bir ham float16 dosyasına arka arkaya yazılır; her kaydın
+    anahtarı, dosyadaki ofseti, şekli ve ses süresi `dizin.jsonl` dosyasında
+    tutulur. Okuma, dosyanın bellek eşlemesi üzerinden kopyasız görünüm
+    (view) döndürür. Aynı anda tek bir süreç yazmalıdır; okuyucu sayısı sınırsızdır.
+    Çok süreçli kullanımda depo ana süreçte doldurulur, işçiler salt okunur açar.
+    """
+    def __init__(self, root, feature_extractor, read_only=False):
+        """
+        Parametreler:
+        root: Deponun bulunduğu klasör (yoksa oluşturulur)
+        feature_extractor: WhisperFeatureExtractor; ayarları anahtarın parçasıdır
+        read_only: True ise depoya yazılmaz; eksik özellikler hesaplanır ama eklenmez
+        """
+        self.root = root
+        self.feature_extractor = feature_extractor
+        self.config_key = extractor_config_key(feature_extractor)
+        self.read_only = read_only
+        if not read_only:
+            os.makedirs(root, exist_ok=True)
+
+        self._data_path = os.path.join(root, OZELLIK_DOSYASI)
+        self._index_path = os.path.join(root, DIZIN_DOSYASI)
+        self._entries = {}
+        self._memmap = None
+        self._load_index()
+
+    def _load_index(self):
+        data_size = os.path.getsize(self._data_path) // 2 if os.path.exists(self._data_path) else 0
+        if not os.path.exists(self._index_path):
+            return
+        with open(self._index_path, encoding="utf-8") as file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                # Yazma sırasında kesilmiş kayıtları yok say
+                if entry["ofset"] + int(np.prod(entry["sekil"])) <= data_size:
+                    self._entries[entry["anahtar"]] = entry
+
+    def __getstate__(self):
+        # Bellek eşlemesi DataLoader işçilerine kopyalanmaz; her süreç kendisi açar
+        state = self.__dict__.copy()
+        state["_memmap"] = None
+        return state
+
+    def _key(self, audio_key):
+        return f"{self.config_key}:{audio_key}"
+
+    def _view(self, entry):
+        end = entry["ofset"] + int(np.prod(entry["sekil"]))
+        if self._memmap is None or len(self._memmap) < end:
+            self._memmap = np.memmap(self._data_path, dtype=np.float16, mode="r")
+        return self._memmap[entry["ofset"]:end].reshape(entry["sekil"])
+
+    def __contains__(self, audio_key):
+        return self._key(audio_key) in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, audio_key):
+        """Kaydın float16 özelliklerini kopyasız görünüm olarak döndürür; yoksa None"""
+        entry = self._entries.get(self._key(audio_key))
+        return None if entry is None else self._view(entry)
+
+    def duration(self, audio_key):
+        """Kaydın ses süresini saniye cinsinden döndürür; yoksa None"""
+        entry = self._entries.get(self._key(audio_key))
+        return None if entry is None else entry["sure_sn"]
+
+    def put_many(self, items):
+        """(ses özeti, özellikler, ses süresi) üçlülerini depoya ekler"""
+        if self.read_only:
+            raise RuntimeError(f"{self.root} özellik deposu salt okunur açıldı.")
+        entries = []
+        with open(self._data_path, "ab") as data_file:
+            offset = data_file.tell() // 2
+            for audio_key, features, duration in items:
+                features = np.ascontiguousarray(features, dtype=np.float16)
+                data_file.write(features.tobytes())
+                entries.append({
+                    "anahtar": self._key(audio_key), "ofset": offset,
+                    "sekil": list(features.shape), "sure_sn": round(float(duration), 3),
+                })
+                offset += features.size
+
+        with open(self._index_path, "a", encoding="utf-8") as index_file:
+            for entry in entries:
+                index_file.write(json.dumps(entry) + "\n")
+        for entry in entries:
+            self._entries[entry["anahtar"]] = entry
+
+    def features_for_audio(self, audio_arrays, sampling_rate, audio_keys=None):
+        """
+        Ses dizilerinin özelliklerini depodan okur; eksik olanları tek seferde hesaplayıp ekler.
+
+        Parametreler:
+        audio_arrays: Ses dizilerinin listesi
+        sampling_rate: Seslerin örnekleme hızı
+        audio_keys: Önceden hesaplanmış ses özetleri (verilmezse hesaplanır)
+
+        Döndürür: Her ses için (özellik sayısı, kare sayısı) boyutlu float16 dizilerinin listesi
+        """
+        if audio_keys is None:
+            audio_keys = [audio_hash(audio, sampling_rate) for audio in audio_arrays]
+
+        missing = [position for position, key in enumerate(audio_keys) if key not in self]
+        if missing:
+            computed = self.feature_extractor(
+                [audio_arrays[position] for position in missing], sampling_rate=sampling_rate
+            ).input_features
+            if self.read_only:
+                # Salt okunur depoda eksik özellikler yalnızca bu çağrı için hesaplanır
+                features = {
+                    position: np.asarray(values, dtype=np.float16) for position, values in zip(missing, computed)
+                }
+                return [features[position] if position in features else self.get(key)
+                        for position, key in enumerate(audio_keys)]
+            self.put_many([
+                (audio_keys[position], features, len(audio_arrays[position]) / sampling_rate)
+                for position, features in zip(missing, computed)
+            ])
+        return [self.get(key) for key in audio_keys]
+
+    def index_split(self, split, batch_size=32):
+        """
+        Veri seti bölümündeki tüm örnekleri depoya ekler ve sırasıyla ses özetlerini döndürür.
+
+        Bölümün ses özetleri, veri setinin parmak iziyle birlikte depoya yazılır;
+        aynı bölüm yeniden istendiğinde sesler çözülmeden doğrudan okunur.
+        """
+        fingerprint = getattr(split, "_fingerprint", None)
+        keys_path = os.path.join(self.root, f"bolum_{fingerprint}.json") if fingerprint else None
+        if keys_path and os.path.exists(keys_path):
+            with open(keys_path, encoding="utf-8") as file:
+                keys = json.load(file)
+            if all(key in self for key in keys):
+                return keys
+
+        keys = []
+        for start in range(0, len(split), batch_size):
+            batch = split[start:start + batch_size]["audio"]
+            sampling_rate = batch[0]["sampling_rate"]
+            arrays = [np.asarray(audio["array"], dtype=np.float32) for audio in batch]
+            batch_keys = [audio_hash(audio, sampling_rate) for audio in arrays]
+            self.features_for_audio(arrays, sampling_rate, audio_keys=batch_keys)
+            keys.extend(batch_keys)
+
+        if keys_path:
+            with open(keys_path, "w", encoding="utf-8") as file:
+                json.dump(keys, file)
+        return keys
+
+
+if __name__ == "__main__":
+    from datasets import Audio
+    from transformers import WhisperFeatureExtractor
+    from paketli_veri_seti import open_dataset, VARSAYILAN_VERI_SETI
+
+    parser = argparse.ArgumentParser(description="Veri seti bölümünün log-mel özelliklerini önceden hesaplar")
+    parser.add_argument("--depo", default="ozellik_deposu", help="Özellik deposu klasörü")
+    parser.add_argument("--veri-seti", default=VARSAYILAN_VERI_SETI,
+                        help="Hugging Face veri seti veya paketli_veri_seti.py ile oluşturulmuş yerel klasör")
+    parser.add_argument("--bolum", nargs="+", default=["test"], help="Hesaplanacak bölümler")
+    parser.add_argument("--model", default="openai/whisper-medium.en", help="Özellik çıkarıcının alınacağı model")
+    args = parser.parse_args()
+
+    feature_extractor = WhisperFeatureExtractor.from_pretrained(args.model)
+    store = FeatureStore(args.depo, feature_extractor)
+    dataset = open_dataset(args.veri_seti)
+    for split_name in args.bolum:
+        split = dataset[split_name].cast_column("audio", Audio(sampling_rate=feature_extractor.sampling_rate))
+        keys = store.index_split(split)
+        print(f"{split_name}: {len(keys)} örnek depoda ({args.depo})")
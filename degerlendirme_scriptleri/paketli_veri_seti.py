@@ -0,0 +1,251 @@
+# Paketlenmiş Yerel Veri Seti
+# Bu modül, `kaldirilan_ornekler` düzenindeki veya herhangi bir WAV + metin klasörünü tek bir ham
+# float32 ses dosyasına (ses.f32) ve ofset/süre dizinine (dizin.json) paketler. Klipler dosyanın bellek
+# eşlemesinden kopyasız görünüm olarak okunur; eğitim ve değerlendirme scriptleri paketi hub'daki veri
+# setinin yerine çevrimdışı kaynak olarak kullanabilir
+# Kullanım: python paketli_veri_seti.py --kaynak ../kaldirilan_ornekler --cikti ../paketli_ornekler [--test-orani 0.2]
+
+import argparse
+import hashlib
+import json
+import os
+import time
+import numpy as np
+import soundfile as sf
+from yerel_ornekler import find_sample_pairs
+
+VARSAYILAN_VERI_SETI = "mehmedadymn/air-traffic-dataset"
+SES_DOSYASI = "ses.f32"
+DIZIN_DOSYASI = "dizin.json"
+PAKET_SURUMU = 1
+
+
+def is_packed_dataset(path):
+    """Klasörün paketlenmiş veri seti olup olmadığını döndürür"""
+    return os.path.isfile(os.path.join(path, DIZIN_DOSYASI)) and os.path.isfile(os.path.join(path, SES_DOSYASI))
+
+
+def pack_directory(source_dir, output_dir, split_name="test", test_fraction=None, seed=42, sampling_rate=16000):
+    """
+    WAV + metin çiftlerini tek bir ses dosyasına ve dizine paketler.
+
+    Sesler mono float32'ye ve `sampling_rate` hızına dönüştürülüp arka arkaya
+    yazılır; dizin, her klibin örnek cinsinden ofsetini ve uzunluğunu, metnini
+    ve bölümünü tutar. Dizin, ses dosyası tamamlandıktan sonra yazılır; yarıda
+    kalan bir paketleme önceki paketi bozmaz.
+
+    Parametreler:
+    source_dir: Örneklerin bulunduğu klasör (bkz. yerel_ornekler.find_sample_pairs)
+    output_dir: Paketin yazılacağı klasör
+    split_name: `test_fraction` verilmezse tüm örneklerin atanacağı bölüm
+    test_fraction: Verilirse örnekler bu oranda rastgele "test", kalanı "train" bölümüne ayrılır
+    seed: Bölme için rastgelelik tohumu
+    sampling_rate: Paketteki seslerin örnekleme hızı
+
+    Döndürür: Paketlenen örnek sayısı
+    """
+    # scipy yalnızca paketlemede gerekir; paketi açan scriptler içe aktarma maliyetini ödemez
+    from konusma_algilama import resample
+
+    pairs = find_sample_pairs(source_dir)
+    if not pairs:
+        raise ValueError(f"{source_dir} klasöründe WAV + metin çifti bulunamadı.")
+
+    splits = [split_name] * len(pairs)
+    if test_fraction is not None:
+        order = np.random.default_rng(seed).permutation(len(pairs))
+        test_rows = set(order[:int(round(len(pairs) * test_fraction))].tolist())
+        splits = ["test" if row in test_rows else "train" for row in range(len(pairs))]
+
+    os.makedirs(output_dir, exist_ok=True)
+    audio_path = os.path.join(output_dir, SES_DOSYASI)
+    temporary_audio_path = audio_path + ".tmp"
+    ids, texts, offsets, lengths = [], [], [], []
+    digest = hashlib.sha256()
+    offset = 0
+    with open(temporary_audio_path, "wb") as audio_file:
+        for sample_id, wav_path, text_path in pairs:
+            audio, source_rate = sf.read(wav_path, dtype="float32")
+            if audio.ndim > 1:
+                audio = audio.mean(axis=1)
+            if source_rate != sampling_rate:
+                audio = resample(audio, source_rate, sampling_rate)
+            data = np.ascontiguousarray(audio, dtype="<f4").tobytes()
+            audio_file.write(data)
+            digest.update(data)
+            with open(text_path, encoding="utf-8") as file:
+                texts.append(file.read().strip())
+            ids.append(sample_id)
+            offsets.append(offset)
+            lengths.append(len(audio))
+            offset += len(audio)
+
+    index = {
+        "surum": PAKET_SURUMU, "ornekleme_hizi": sampling_rate, "anahtar": digest.hexdigest()[:16],
+        "kimlik": ids, "metin": texts, "ofset": offsets, "uzunluk": lengths, "bolum": splits,
+    }
+    index_path = os.path.join(output_dir, DIZIN_DOSYASI)
+    temporary_index_path = index_path + ".tmp"
+    with open(temporary_index_path, "w", encoding="utf-8") as file:
+        json.dump(index, file, ensure_ascii=False)
+    os.replace(temporary_audio_path, audio_path)
+    os.replace(temporary_index_path, index_path)
+    return len(pairs)
+
+
+class PackedSplit:
+    """
+    Paketin bir bölümü; Hugging Face veri seti bölümünün scriptlerde kullanılan kısmını taklit eder.
+
+    `split[i]` örnek sözlüğü, `split[i:j]` / `split[[...]]` sütun sözlüğü ve
+    `split["text"]` sütun listesi döndürür. Sesler ("audio" → {"array",
+    "sampling_rate"}) ses dosyasının bellek eşlemesinden kopyasız, salt okunur
+    görünümlerdir. `select`, `select_columns`, `remove_columns` ve
+    `add_column("text", ...)` yeni bir görünüm döndürür; veri kopyalanmaz.
+    """
+    def __init__(self, root, index, rows, columns=("id", "audio", "text"), texts=None):
+        self.root = root
+        self._index = index
+        self._rows = np.asarray(rows, dtype=np.int64)
+        self._texts = texts
+        self.column_names = list(columns)
+        self.sampling_rate = index["ornekleme_hizi"]
+        self._memmap = None
+
+    def __getstate__(self):
+        # Bellek eşlemesi işçi süreçlere kopyalanmaz; her süreç kendisi açar
+        state = self.__dict__.copy()
+        state["_memmap"] = None
+        return state
+
+    def _view(self, columns=None, rows=None, texts=None):
+        return PackedSplit(
+            self.root, self._index, self._rows if rows is None else rows,
+            self.column_names if columns is None else columns, self._texts if texts is None else texts,
+        )
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __iter__(self):
+        for position in range(len(self)):
+            yield self[position]
+
+    @property
+    def _fingerprint(self):
+        """Paket anahtarı, seçili satırlar ve değiştirilmiş metinlerden oluşan parmak izi (FeatureStore için)"""
+        digest = hashlib.sha256()
+        digest.update(self._index["anahtar"].encode())
+        digest.update(self._rows.tobytes())
+        if self._texts is not None:
+            digest.update("\n".join(self._texts).encode("utf-8"))
+        return digest.hexdigest()[:16]
+
+    def durations(self):
+        """Kliplerin saniye cinsinden süreleri (sesler okunmaz)"""
+        return self._index["_uzunluk"][self._rows] / self.sampling_rate
+
+    def _audio(self, row):
+        if self._memmap is None:
+            self._memmap = np.memmap(os.path.join(self.root, SES_DOSYASI), dtype="<f4", mode="r")
+        offset = self._index["_ofset"][row]
+        return {"path": None, "array": self._memmap[offset:offset + self._index["_uzunluk"][row]],
+                "sampling_rate": self.sampling_rate}
+
+    def _column(self, name, positions):
+        if name not in self.column_names:
+            raise KeyError(f"'{name}' sütunu yok; mevcut sütunlar: {self.column_names}")
+        if name == "audio":
+            return [self._audio(self._rows[position]) for position in positions]
+        if name == "text" and self._texts is not None:
+            return [self._texts[position] for position in positions]
+        values = self._index["metin" if name == "text" else "kimlik"]
+        return [values[self._rows[position]] for position in positions]
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self._column(key, range(len(self)))
+        if isinstance(key, (int, np.integer)):
+            position = int(key) + (len(self) if key < 0 else 0)
+            if not 0 <= position < len(self):
+                raise IndexError(f"{key} indeksi {len(self)} örneklik bölümün dışında")
+            return {name: self._column(name, [position])[0] for name in self.column_names}
+        positions = range(len(self))[key] if isinstance(key, slice) else [int(position) for position in key]
+        return {name: self._column(name, positions) for name in self.column_names}
+
+    def select(self, indices):
+        positions = np.asarray(list(indices), dtype=np.int64)
+        texts = None if self._texts is None else [self._texts[position] for position in positions]
+        return self._view(rows=self._rows[positions], texts=texts)
+
+    def select_columns(self, column_names):
+        column_names = [column_names] if isinstance(column_names, str) else list(column_names)
+        for name in column_names:
+            self._column(name, [])
+        return self._view(columns=column_names)
+
+    def remove_columns(self, column_names):
+        column_names = {column_names} if isinstance(column_names, str) else set(column_names)
+        return self._view(columns=[name for name in self.column_names if name not in column_names])
+
+    def add_column(self, name, values):
+        """Yalnızca "text" sütunu eklenebilir (örn. damıtmada öğretmen etiketleri)"""
+        if name != "text" or name in self.column_names:
+            raise ValueError("Paketlenmiş bölüme yalnızca kaldırılmış 'text' sütunu yeniden eklenebilir.")
+        values = list(values)
+        if len(values) != len(self):
+            raise ValueError(f"Sütun uzunluğu ({len(values)}) bölüm uzunluğuyla ({len(self)}) aynı olmalıdır.")
+        return self._view(columns=self.column_names + ["text"], texts=values)
+
+    def cast_column(self, name, feature):
+        """Sesler paketleme sırasında dönüştürüldüğünden yalnızca aynı örnekleme hızı kabul edilir"""
+        sampling_rate = getattr(feature, "sampling_rate", None)
+        if name == "audio" and sampling_rate not in (None, self.sampling_rate):
+            raise ValueError(
+                f"Paket {self.sampling_rate} Hz; {sampling_rate} Hz için --ornekleme-hizi ile yeniden paketleyin."
+            )
+        return self
+
+
+def load_packed_dataset(root):
+    """
+    Paketi açar ve bölüm adından PackedSplit'e sözlük döndürür.
+
+    Yalnızca dizin okunur; ses dosyası ilk erişimde bellek eşlemesiyle açılır.
+    """
+    with open(os.path.join(root, DIZIN_DOSYASI), encoding="utf-8") as file:
+        index = json.load(file)
+    index["_ofset"] = np.asarray(index["ofset"], dtype=np.int64)
+    index["_uzunluk"] = np.asarray(index["uzunluk"], dtype=np.int64)
+    split_names = np.asarray(index["bolum"])
+    return {
+        split_name: PackedSplit(root, index, np.flatnonzero(split_names == split_name))
+        for split_name in dict.fromkeys(index["bolum"])
+    }
+
+
+def open_dataset(source=VARSAYILAN_VERI_SETI):
+    """Paketlenmiş yerel klasörü veya Hugging Face veri setini bölüm sözlüğü olarak açar"""
+    if os.path.isdir(source) and is_packed_dataset(source):
+        return load_packed_dataset(source)
+    from datasets import load_dataset
+    return load_dataset(source)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="WAV + metin klasörünü bellek eşlemeli yerel veri setine paketler")
+    parser.add_argument("--kaynak", required=True, help="Örneklerin bulunduğu klasör (örn. ../kaldirilan_ornekler)")
+    parser.add_argument("--cikti", required=True, help="Paketin yazılacağı klasör")
+    parser.add_argument("--bolum", default="test", help="Tüm örneklerin atanacağı bölüm (--test-orani verilmezse)")
+    parser.add_argument("--test-orani", type=float, default=None,
+                        help="Verilirse örnekler bu oranda test, kalanı train bölümüne ayrılır")
+    parser.add_argument("--tohum", type=int, default=42, help="Bölme için rastgelelik tohumu")
+    parser.add_argument("--ornekleme-hizi", type=int, default=16000, help="Paketteki seslerin örnekleme hızı")
+    args = parser.parse_args()
+
+    count = pack_directory(args.kaynak, args.cikti, args.bolum, args.test_orani, args.tohum, args.ornekleme_hizi)
+    start = time.perf_counter()
+    splits = load_packed_dataset(args.cikti)
+    opened = time.perf_counter() - start
+    summary = ", ".join(f"{name}: {len(split)}" for name, split in splits.items())
+    print(f"{count} örnek paketlendi ({summary}) -> {args.cikti} | Açılış süresi: {opened * 1000:.1f} ms")
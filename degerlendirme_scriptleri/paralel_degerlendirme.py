@@ -0,0 +1,148 @@
+# Çok Süreçli (Parçalı) Değerlendirme
+# Bu modül, test bölümünü süreye göre sıralama pencereleri büyüklüğünde parçalara ayırıp her biri kendi
+# model kopyasına ve sınırlı sayıda PyTorch iş parçacığına sahip işçi süreçlere dağıtır; parça sonuçları
+# örnek numarasına göre sıralanarak tek bir JSONL dosyasında birleştirilir. Özellik deposu tek yazarlı
+# olduğundan bölümün özellikleri işçiler başlamadan ana süreçte depoya eklenir; işçiler depoyu salt okunur açar
+
+import json
+import multiprocessing
+import os
+import time
+from cikarim_arka_uclari import create_backend
+from degerlendirme_motoru import run_batched_transcription, ThroughputMeter
+from sonuc_yazici import JsonlResultWriter, iter_results
+from tahmin_onbellegi import PredictionCache
+
+# İşçi sürecin modeli ve önbelleği (süreç başına bir kez yüklenir)
+_worker = {}
+
+
+def default_threads_per_process(num_processes):
+    """Çekirdekleri süreçler arasında eşit paylaştıran iş parçacığı sayısı"""
+    return max(1, (os.cpu_count() or 1) // max(1, num_processes))
+
+
+def shard_ranges(length, shard_size):
+    """[0, length) aralığını `shard_size` büyüklüğünde ardışık (başlangıç, bitiş) parçalarına böler"""
+    shard_size = max(1, shard_size)
+    return [(start, min(start + shard_size, length)) for start in range(0, length, shard_size)]
+
+
+def prepare_feature_store(split, model_name, feature_store_dir):
+    """
+    Bölümün log-mel özelliklerini işçiler başlamadan önce ana süreçte depoya ekler.
+
+    Depo tek yazarlıdır (ofset ekleme kipindeki dosya sonundan alınır, dizin
+    ayrıca eklenir); işçiler aynı anda yazarsa dizin kayıtları başka kliplerin
+    özelliklerini gösterebilir. Bu yüzden yazma yalnızca burada yapılır.
+    """
+    from transformers import WhisperFeatureExtractor
+    from ozellik_deposu import FeatureStore
+
+    store = FeatureStore(feature_store_dir, WhisperFeatureExtractor.from_pretrained(model_name))
+    store.index_split(split)
+
+
+def _init_worker(threads, backend_name, model_name, backend_options, cache_path, cache_max_mb):
+    import torch
+
+    # Her süreç yalnızca kendi payına düşen çekirdekleri kullanır
+    torch.set_num_threads(threads)
+    backend = create_backend(backend_name, model_name, **(backend_options or {}))
+    cache = None
+    if cache_path:
+        cache = PredictionCache(cache_path, backend.cache_key(), max_bytes=cache_max_mb * 1024 * 1024)
+    _worker.update(backend=backend, cache=cache)
+
+
+def _evaluate_shard(task):
+    start, shard, build_row, batch_size, sort_window = task
+    meter = ThroughputMeter()
+    started = time.time()
+    rows = [
+        build_row(start + idx, ground_truth, prediction)
+        for idx, ground_truth, prediction in run_batched_transcription(
+            _worker["backend"], shard, batch_size=batch_size, sort_window=sort_window,
+            meter=meter, cache=_worker["cache"]
+        )
+    ]
+    return rows, meter, _worker["backend"].label, started, time.time()
+
+
+def run_sharded_evaluation(split, build_row, results_path, num_processes, threads_per_process=None,
+                           backend="transformers", model_name=None, backend_options=None,
+                           batch_size=8, sort_window=16, cache_path=None, cache_max_mb=256):
+    """
+    Veri seti bölümünü işçi süreçlere dağıtarak yazıya döker ve sonuçları JSONL dosyasına yazar.
+
+    Parçalar tek süreçli motorun sıralama pencereleriyle aynı sınırlara sahiptir;
+    böylece her batch tek süreçli çalıştırmadakiyle aynı kliplerden oluşur ve süreç
+    sayısı ne olursa olsun aynı tahminler elde edilir. Sonuçlar geldikçe dosyaya
+    yazılır, tüm parçalar bitince dosya örnek numarasına göre sıralanır.
+
+    Parametreler:
+    split: Değerlendirilecek veri seti bölümü (işçilere pickle ile aktarılır)
+    build_row: (indeks, gerçek metin, tahmin) alıp JSONL satırı döndüren modül düzeyi fonksiyon
+    results_path: Birleştirilmiş sonuçların yazılacağı JSONL dosyası
+    num_processes: İşçi süreç sayısı
+    threads_per_process: Süreç başına PyTorch iş parçacığı sayısı (None: çekirdekler eşit paylaştırılır)
+    backend, model_name, backend_options: Her süreçte `create_backend` ile oluşturulacak arka uç
+                                          (özellik deposu ana süreçte doldurulur, işçilerde salt okunurdur)
+    batch_size, sort_window: `run_batched_transcription` ayarları
+    cache_path, cache_max_mb: Tüm süreçlerin paylaştığı tahmin önbelleği (None ise kullanılmaz)
+
+    Döndürür: (ThroughputMeter, arka uç etiketi); sürenin ölçümü model yüklemeyi içermez
+    """
+    threads = threads_per_process or default_threads_per_process(num_processes)
+    backend_options = dict(backend_options or {})
+    if backend == "transformers" and backend_options.get("feature_store_dir"):
+        prepare_feature_store(split, model_name, backend_options["feature_store_dir"])
+        backend_options["feature_store_read_only"] = True
+    tasks = [
+        (start, split.select(range(start, end)), build_row, batch_size, sort_window)
+        for start, end in shard_ranges(len(split), batch_size * sort_window)
+    ]
+    print(f"{len(split)} örnek {len(tasks)} parçaya bölündü; {num_processes} süreç x {threads} iş parçacığı")
+
+    meter = ThroughputMeter()
+    label = ""
+    first_start, last_end = None, None
+    # CUDA ve PyTorch iş parçacığı havuzları fork ile güvenli kopyalanmadığından spawn kullanılır
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(
+        num_processes, initializer=_init_worker,
+        initargs=(threads, backend, model_name, backend_options, cache_path, cache_max_mb)
+    ) as pool, JsonlResultWriter(results_path) as writer:
+        for completed, (rows, shard_meter, label, started, finished) in enumerate(
+                pool.imap_unordered(_evaluate_shard, tasks), start=1):
+            for row in rows:
+                writer.write(row)
+            meter.clip_count += shard_meter.clip_count
+            meter.audio_seconds += shard_meter.audio_seconds
+            meter.cache_hits += shard_meter.cache_hits
+            first_start = started if first_start is None else min(first_start, started)
+            last_end = finished if last_end is None else max(last_end, finished)
+            print(f"Parça tamamlandı: {completed}/{len(tasks)}")
+
+    if first_start is not None:
+        meter.elapsed_seconds = last_end - first_start
+    sort_results(results_path)
+    return meter, label
+
+
+def sort_results(path, key="ornek"):
+    """JSONL sonuç dosyasını verilen anahtara göre sıralayıp yeniden yazar"""
+    rows = sorted(iter_results(path), key=lambda row: row[key])
+    temporary_path = path + ".tmp"
+    with open(temporary_path, "w", encoding="utf-8") as file:
+        for row in rows:
+            file.write(json.dumps(row, ensure_ascii=False) + "\n")
+    os.replace(temporary_path, path)
+
+
+def add_parallel_arguments(parser):
+    """Değerlendirme scriptlerinin ortak çok süreçli değerlendirme argümanlarını ekler"""
+    parser.add_argument("--surec-sayisi", type=int, default=1,
+                        help="Kendi model kopyasıyla çalışan işçi süreç sayısı (1: tek süreç)")
+    parser.add_argument("--surec-basina-is-parcacigi", type=int, default=None,
+                        help="Süreç başına PyTorch iş parçacığı sayısı (varsayılan: çekirdek sayısı / süreç sayısı)")
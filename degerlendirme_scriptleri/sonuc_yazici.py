@@ -0,0 +1,111 @@
+# Akışlı Sonuç Yazıcı
+# Bu modül, değerlendirme sonuçlarını transkripsiyon döngüsü sırasında satır satır
+# JSONL dosyasına yazar ve puanlanmış CSV özetini tek geçişte bu dosyadan üretir
+
+import csv
+import json
+import os
+from wer_hesaplama import score_corpus, format_alignment
+from zamanlayici import profiler
+
+
+class JsonlResultWriter:
+    """
+    Örnek başına sonuçları JSONL dosyasına ekleyen yazıcı.
+
+    Her satır yazıldıktan hemen sonra diske aktarılır (flush); böylece
+    çalışma yarıda kesilse bile o ana kadarki sonuçlar kaybolmaz.
+    """
+    def __init__(self, path, append=False, fsync=False):
+        """
+        Parametreler:
+        path: Sonuçların yazılacağı JSONL dosyası
+        append: True ise mevcut dosyanın sonuna eklenir, aksi halde dosya sıfırlanır
+        fsync: True ise her satırdan sonra işletim sistemi önbelleği de diske yazdırılır
+        """
+        self.path = path
+        self.fsync = fsync
+        self._file = open(path, "a" if append else "w", encoding="utf-8")
+
+    def write(self, row):
+        with profiler.stage("sonuc_yazma", items=1):
+            self._file.write(json.dumps(row, ensure_ascii=False) + "\n")
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def iter_results(path):
+    """
+    JSONL sonuç dosyasını satır satır okur.
+
+    Çalışma yazma sırasında kesildiyse son satır yarım kalmış olabilir;
+    çözümlenemeyen satırlar atlanır.
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def aggregate_results(path, columns, csv_filename_template, reference_key, hypothesis_key, order_key=None):
+    """
+    JSONL sonuçlarını tek geçişte okuyup toplu olarak puanlar ve WER'e göre sıralı CSV dosyası üretir.
+
+    Okunan her satıra örnek başına `wer`, `cer`, `ikame`, `silme`, `ekleme` ve
+    `hizalama` alanları eklenir; `columns` bu alanlara da başvurabilir.
+
+    Parametreler:
+    path: JSONL sonuç dosyası
+    columns: (anahtar, CSV sütun başlığı) çiftlerinin listesi
+    csv_filename_template: `{wer}` yer tutucusu içeren CSV dosya adı şablonu
+    reference_key: Gerçek metnin tutulduğu anahtar
+    hypothesis_key: Puanlanacak tahminin tutulduğu anahtar
+    order_key: Verilirse WER'i eşit satırlar bu anahtara göre sıralanır; böylece CSV,
+               satırların JSONL dosyasındaki sırasından (örn. süreç sayısından) bağımsız olur
+
+    Döndürür: (CorpusScore, CSV dosya adı); hiç sonuç yoksa (None, None)
+    """
+    rows = list(iter_results(path))
+    if not rows:
+        return None, None
+
+    references = [row[reference_key] for row in rows]
+    hypotheses = [row[hypothesis_key] for row in rows]
+    with profiler.stage("wer_puanlama", items=len(rows)):
+        score = score_corpus(references, hypotheses)
+
+        for row, reference, hypothesis, words, characters in zip(rows, references, hypotheses, score.words, score.characters):
+            row["wer"] = round(words.error_rate * 100, 2)
+            row["cer"] = round(characters.error_rate * 100, 2)
+            row["ikame"] = words.substitutions
+            row["silme"] = words.deletions
+            row["ekleme"] = words.insertions
+            row["hizalama"] = format_alignment(reference, hypothesis, words.operations)
+
+    # WER'e göre azalan sırada CSV dosyasına kaydet
+    if order_key is not None:
+        rows.sort(key=lambda row: row[order_key])
+    rows.sort(key=lambda row: row["wer"], reverse=True)
+    csv_filename = csv_filename_template.format(wer=f"{score.wer * 100:.2f}")
+    with profiler.stage("csv_yazma", items=len(rows)), open(csv_filename, "w", encoding="utf-8", newline="") as file:
+        writer = csv.writer(file, lineterminator="\n")
+        writer.writerow([header for _, header in columns])
+        writer.writerows([row[key] for key, _ in columns] for row in rows)
+
+    return score, csv_filename
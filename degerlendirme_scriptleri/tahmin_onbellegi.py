@@ -0,0 +1,141 @@
+# Tahmin Önbelleği
+# Bu modül, model tahminlerini (model sürümü, ses içeriği, üretim ayarları) anahtarıyla
+# diskte saklar; böylece aynı modelle yapılan tekrar değerlendirmeler klipleri yeniden çözümlemez
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import numpy as np
+
+
+def audio_hash(audio_array, sampling_rate):
+    """Ses içeriğinin ve örnekleme hızının SHA-256 özetini döndürür"""
+    digest = hashlib.sha256()
+    digest.update(str(int(sampling_rate)).encode())
+    digest.update(np.ascontiguousarray(audio_array, dtype=np.float32).tobytes())
+    return digest.hexdigest()
+
+
+def model_fingerprint(model_name, model):
+    """
+    Modelin sürümünü tanımlayan bir parmak izi döndürür.
+
+    Hub'dan yüklenen modeller için indirilen revizyonun commit özeti kullanılır.
+    Yerel klasörlerde ağırlık dosyalarının adı, boyutu ve değiştirilme zamanı
+    özetlenir; dosyalar değiştiğinde parmak izi de değişir.
+    """
+    if os.path.isdir(model_name):
+        digest = hashlib.sha256()
+        for root, _, files in sorted(os.walk(model_name)):
+            for file_name in sorted(files):
+                path = os.path.join(root, file_name)
+                stat = os.stat(path)
+                digest.update(f"{os.path.relpath(path, model_name)}:{stat.st_size}:{stat.st_mtime_ns}\n".encode())
+        return f"yerel:{digest.hexdigest()}"
+
+    commit_hash = getattr(getattr(model, "config", None), "_commit_hash", None)
+    if commit_hash:
+        return f"{model_name}@{commit_hash}"
+    return model_name
+
+
+def generation_config_key(model, **generate_kwargs):
+    """Modelin üretim (generate) ayarlarını ve ek argümanları kararlı bir metne dönüştürür"""
+    config = model.generation_config.to_dict()
+    config.pop("transformers_version", None)
+    config.update(generate_kwargs)
+    return json.dumps(config, sort_keys=True, default=str)
+
+
+class PredictionCache:
+    """
+    SQLite tabanlı, boyutu sınırlı kalıcı tahmin önbelleği.
+
+    Kayıtlar (model anahtarı, ses özeti) çiftiyle tutulur. Toplam boyut
+    `max_bytes` değerini aştığında en uzun süredir kullanılmayan kayıtlar silinir.
+    """
+    def __init__(self, path, model_key, max_bytes=256 * 1024 * 1024):
+        """
+        Parametreler:
+        path: SQLite veritabanı dosyası
+        model_key: Model parmak izi ve üretim ayarlarından oluşan anahtar
+        max_bytes: Önbelleğin yaklaşık üst boyut sınırı
+        """
+        self.path = path
+        self.model_key = hashlib.sha256(model_key.encode()).hexdigest()
+        self.max_bytes = max_bytes
+        # Paralel değerlendirmede birden fazla süreç aynı dosyaya yazar; kilit için beklenir
+        self._connection = sqlite3.connect(path, timeout=60)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS predictions ("
+            " model_key TEXT NOT NULL,"
+            " audio_hash TEXT NOT NULL,"
+            " prediction TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_used REAL NOT NULL,"
+            " PRIMARY KEY (model_key, audio_hash))"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS predictions_last_used ON predictions (last_used)")
+        self._connection.commit()
+
+    def get_many(self, hashes):
+        """Önbellekte bulunan ses özetleri için {özet: tahmin} sözlüğü döndürür"""
+        found = {}
+        hashes = list(hashes)
+        for start in range(0, len(hashes), 500):
+            chunk = hashes[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._connection.execute(
+                f"SELECT audio_hash, prediction FROM predictions WHERE model_key = ? AND audio_hash IN ({placeholders})",
+                [self.model_key, *chunk],
+            ).fetchall()
+            found.update(rows)
+
+        if found:
+            now = time.time()
+            self._connection.executemany(
+                "UPDATE predictions SET last_used = ? WHERE model_key = ? AND audio_hash = ?",
+                [(now, self.model_key, key) for key in found],
+            )
+            self._connection.commit()
+        return found
+
+    def put_many(self, items):
+        """(ses özeti, tahmin) çiftlerini kaydeder ve gerekirse eski kayıtları siler"""
+        now = time.time()
+        self._connection.executemany(
+            "INSERT OR REPLACE INTO predictions VALUES (?, ?, ?, ?, ?)",
+            [
+                (self.model_key, key, prediction, len(key) + len(prediction.encode("utf-8")) + len(self.model_key), now)
+                for key, prediction in items
+            ],
+        )
+        self._connection.commit()
+        self._evict()
+
+    def _evict(self):
+        """Toplam boyut sınırı aşıldıysa en eski kayıtları sınırın %90'ına inene kadar siler"""
+        total = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM predictions").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        target = self.max_bytes * 0.9
+        removed = []
+        for rowid, size in self._connection.execute("SELECT rowid, size FROM predictions ORDER BY last_used"):
+            if total <= target:
+                break
+            removed.append((rowid,))
+            total -= size
+        self._connection.executemany("DELETE FROM predictions WHERE rowid = ?", removed)
+        self._connection.commit()
+
+    def close(self):
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,160 @@
+# Uzun Kayıt Transkripsiyon Scripti
+# Bu script, saatler süren sürekli frekans kayıtlarını (WAV/FLAC) sabit bellekle yazıya döker:
+# dosya bloklar halinde okunur, enerji dedektörüyle telsiz yayınlarına ayrılır ve yayınlar
+# üretici/tüketici hattında ince ayarlı modelle toplu olarak çözümlenir. Çıktı, zaman damgalı
+# yayınlardan oluşan bir JSONL dosyasıdır
+# Kullanım: python uzun_kayit_transkripsiyonu.py kayit.flac [kayit2.wav ...] --cikti yayinlar.jsonl
+
+import argparse
+import queue
+import threading
+import time
+from cikarim_arka_uclari import create_backend, add_backend_arguments
+from konusma_algilama import EnergyVAD, read_blocks, resample
+from sonuc_yazici import JsonlResultWriter
+from zamanlayici import startup, report_startup
+
+VARSAYILAN_MODEL = "mehmedadymn/Air-traffic-control-fine-tuned-faster-whisper"
+HEDEF_ORNEKLEME_HIZI = 16000
+_BITTI = object()
+
+
+class _ProducerError:
+    """Üretici iş parçacığında oluşan hatayı tüketiciye taşıyan kuyruk öğesi"""
+    def __init__(self, error):
+        self.error = error
+
+
+def format_timestamp(seconds):
+    """Saniyeyi SS:DD:ss.s biçimine dönüştürür"""
+    hours, remainder = divmod(seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    return f"{int(hours):02d}:{int(minutes):02d}:{seconds:04.1f}"
+
+
+def produce_segments(paths, segment_queue, block_seconds, vad_options):
+    """
+    Üretici: dosyaları blok blok okur, yayınlara ayırır ve 16 kHz'e dönüştürüp kuyruğa koyar.
+
+    Kuyruk sınırlı olduğundan, çözümleme geride kaldığında okuma da bekler.
+    Okuma, çözme veya yeniden örnekleme hatası kuyruğa konur ve tüketicide
+    yeniden yükseltilir; yarım kalan transkript başarılı sayılmaz.
+    """
+    try:
+        for path in paths:
+            sampling_rate, blocks = read_blocks(path, block_seconds)
+            vad = EnergyVAD(sampling_rate, **vad_options)
+            for block in blocks:
+                for start, audio in vad.process(block):
+                    segment_queue.put((path, start / sampling_rate, (start + len(audio)) / sampling_rate,
+                                       resample(audio, sampling_rate, HEDEF_ORNEKLEME_HIZI)))
+            for start, audio in vad.flush():
+                segment_queue.put((path, start / sampling_rate, (start + len(audio)) / sampling_rate,
+                                   resample(audio, sampling_rate, HEDEF_ORNEKLEME_HIZI)))
+    except BaseException as e:
+        segment_queue.put(_ProducerError(e))
+    else:
+        segment_queue.put(_BITTI)
+
+
+def _is_end(item):
+    return item is _BITTI or isinstance(item, _ProducerError)
+
+
+def transcribe_recordings(backend, paths, output_path, batch_size=8, block_seconds=10.0, queue_size=64,
+                          vad_options=None):
+    """
+    Kayıtları yazıya döker ve her yayını zaman damgasıyla JSONL dosyasına yazar.
+
+    Parametreler:
+    backend: Çıkarım arka ucu (`cikarim_arka_uclari`)
+    paths: Kayıt dosyalarının listesi
+    output_path: Çıktı JSONL dosyası
+    batch_size: Tek seferde çözümlenen yayın sayısı
+    block_seconds: Dosyadan bir seferde okunan ses süresi
+    queue_size: Çözümlenmeyi bekleyen en fazla yayın sayısı (bellek sınırı)
+    vad_options: `EnergyVAD` ayarları
+
+    Döndürür: (yayın sayısı, toplam yayın süresi sn)
+
+    Kayıtlardan biri okunamazsa, o ana kadar gelen yayınlar yazıldıktan sonra
+    üreticideki hata yükseltilir.
+    """
+    segment_queue = queue.Queue(maxsize=queue_size)
+    producer = threading.Thread(
+        target=produce_segments, args=(paths, segment_queue, block_seconds, vad_options or {}), daemon=True
+    )
+    producer.start()
+
+    count, speech_seconds = 0, 0.0
+    producer_error = None
+    with JsonlResultWriter(output_path) as writer:
+        done = False
+        while not done:
+            batch = [segment_queue.get()]
+            # Kuyrukta bekleyen yayınları batch dolana kadar topla
+            while len(batch) < batch_size and not _is_end(batch[-1]):
+                try:
+                    batch.append(segment_queue.get_nowait())
+                except queue.Empty:
+                    break
+            if _is_end(batch[-1]):
+                end_item = batch.pop()
+                if isinstance(end_item, _ProducerError):
+                    producer_error = end_item.error
+                done = True
+            if not batch:
+                continue
+
+            predictions = backend.transcribe_batch([audio for _, _, _, audio in batch], HEDEF_ORNEKLEME_HIZI)
+            startup.mark("ilk_transkript")
+            for (path, start, end, _), prediction in zip(batch, predictions):
+                writer.write({"dosya": path, "baslangic_sn": round(start, 2), "bitis_sn": round(end, 2),
+                              "metin": prediction.strip()})
+                print(f"[{format_timestamp(start)} - {format_timestamp(end)}] {prediction.strip()}")
+                count += 1
+                speech_seconds += end - start
+
+    producer.join()
+    if producer_error is not None:
+        raise producer_error
+    return count, speech_seconds
+
+
+def main(argv=None):
+    """Komut satırı giriş noktası (bkz. komut_satiri.py)"""
+    parser = argparse.ArgumentParser(description="Uzun frekans kayıtlarını yayınlara ayırıp yazıya döker")
+    parser.add_argument("kayitlar", nargs="+", help="WAV/FLAC kayıt dosyaları")
+    parser.add_argument("--model", default=VARSAYILAN_MODEL, help="Model kimliği veya klasörü")
+    parser.add_argument("--cikti", default="yayinlar.jsonl", help="Zaman damgalı yayınların yazılacağı JSONL dosyası")
+    parser.add_argument("--batch-boyutu", type=int, default=8, help="Tek seferde çözümlenen yayın sayısı")
+    parser.add_argument("--blok-suresi", type=float, default=10.0, help="Dosyadan bir seferde okunan süre (sn)")
+    parser.add_argument("--kuyruk-boyutu", type=int, default=64, help="Çözümlenmeyi bekleyen en fazla yayın")
+    parser.add_argument("--esik-db", type=float, default=9.0, help="Konuşma için gürültü tabanının üzerindeki eşik (dB)")
+    parser.add_argument("--en-kisa-sessizlik", type=float, default=0.6, help="Yayını bitiren sessizlik süresi (sn)")
+    parser.add_argument("--baslangic-raporu", default=None,
+                        help="İlk transkripte kadar geçen süre ve en yüksek RSS raporunun yazılacağı JSON dosyası")
+    add_backend_arguments(parser)
+    args = parser.parse_args(argv)
+
+    backend = create_backend(
+        args.arka_uc, args.model, compute_type=args.hesaplama_tipi, cpu_threads=args.cpu_is_parcacigi,
+        num_workers=args.isci_sayisi, device=args.cihaz, feature_store_dir=args.ozellik_deposu,
+        assistant_model_name=args.yardimci_model, phraseology_mode=args.ifade_kipi,
+        phraseology_source=args.ifade_kaynagi, phraseology_bias=args.ifade_puani,
+        tokens_per_second=args.saniye_basina_token, low_cpu_mem_usage=args.dusuk_bellek
+    )
+    start = time.perf_counter()
+    count, speech_seconds = transcribe_recordings(
+        backend, args.kayitlar, args.cikti, batch_size=args.batch_boyutu, block_seconds=args.blok_suresi,
+        queue_size=args.kuyruk_boyutu,
+        vad_options={"threshold_db": args.esik_db, "min_silence_seconds": args.en_kisa_sessizlik},
+    )
+    elapsed = time.perf_counter() - start
+    print(f"{count} yayın ({speech_seconds:.1f} sn konuşma) {elapsed:.1f} sn'de yazıya döküldü: {args.cikti}")
+    if args.baslangic_raporu:
+        report_startup(args.baslangic_raporu)
+
+
+if __name__ == "__main__":
+    main()
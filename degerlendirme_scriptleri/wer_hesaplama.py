@@ -0,0 +1,268 @@
+# Toplu WER/CER Hesaplama
+# Bu modül, tüm (gerçek metin, tahmin) çiftlerinin düzenleme mesafesini tam sayıya
+# kodlanmış belirteçler üzerinde NumPy ile toplu olarak hesaplar; örnek başına hizalama
+# ile birlikte derlem (corpus) düzeyinde WER, CER ve ikame/silme/ekleme dağılımını üretir
+
+from dataclasses import dataclass, field
+from typing import List
+import numpy as np
+
+
+@dataclass
+class AlignmentResult:
+    """Tek bir çiftin hizalama sonucu"""
+    hits: int
+    substitutions: int
+    deletions: int
+    insertions: int
+    reference_length: int
+    operations: str = ""
+
+    @property
+    def errors(self):
+        return self.substitutions + self.deletions + self.insertions
+
+    @property
+    def error_rate(self):
+        """Hata oranı; boş gerçek metinlerde payda 1 kabul edilir"""
+        return self.errors / max(self.reference_length, 1)
+
+
+@dataclass
+class CorpusScore:
+    """Derlem düzeyindeki puanlar ve örnek başına sonuçlar"""
+    words: List[AlignmentResult] = field(default_factory=list)
+    characters: List[AlignmentResult] = field(default_factory=list)
+
+    def _rate(self, results):
+        total = sum(result.reference_length for result in results)
+        return sum(result.errors for result in results) / total if total else 0.0
+
+    @property
+    def wer(self):
+        """Derlem WER: toplam hata / toplam gerçek kelime sayısı"""
+        return self._rate(self.words)
+
+    @property
+    def cer(self):
+        """Derlem CER: toplam karakter hatası / toplam gerçek karakter sayısı"""
+        return self._rate(self.characters)
+
+    @property
+    def mean_wer(self):
+        """Örnek başına WER değerlerinin ortalaması (kısa örneklerde yanıltıcı olabilir)"""
+        return float(np.mean([result.error_rate for result in self.words])) if self.words else 0.0
+
+    def breakdown(self):
+        """Kelime düzeyinde toplam doğru/ikame/silme/ekleme sayıları"""
+        return {
+            "dogru": sum(result.hits for result in self.words),
+            "ikame": sum(result.substitutions for result in self.words),
+            "silme": sum(result.deletions for result in self.words),
+            "ekleme": sum(result.insertions for result in self.words),
+        }
+
+    def summary(self):
+        counts = self.breakdown()
+        return (
+            f"Derlem WER: {self.wer * 100:.2f}% | CER: {self.cer * 100:.2f}% | "
+            f"Örnek ortalaması WER: {self.mean_wer * 100:.2f}% | "
+            f"İkame: {counts['ikame']}, Silme: {counts['silme']}, Ekleme: {counts['ekleme']}"
+        )
+
+
+def _encode(sequences, vocabulary):
+    """Belirteç dizilerini ortak bir sözlükle tam sayı dizilerine dönüştürür"""
+    return [[vocabulary.setdefault(token, len(vocabulary)) for token in sequence] for sequence in sequences]
+
+
+def _cost_matrices(references, hypotheses, error_weight, keep_matrices):
+    """
+    Aynı gruptaki tüm çiftlerin hizalama maliyetlerini birlikte hesaplar.
+
+    Maliyet `hata sayısı * error_weight - doğru sayısı` olarak kodlanır; böylece
+    en az hatalı hizalamalar arasından en çok doğru eşleşme içeren seçilir ve
+    ikame/silme/ekleme sayıları geri izleme yapmadan son hücreden çıkarılabilir.
+    Satırlar gerçek metin, sütunlar tahmin belirteçleridir. Her satırda silme ve
+    ikame adımları vektörel olarak, aynı satırdaki ekleme zinciri ise
+    `minimum.accumulate` ile tek işlemde çözülür. Kısa çiftlerin dolgu bölgesi
+    yalnızca kendi uzunluklarının dışındaki hücreleri etkiler.
+
+    Döndürür: (son hücre maliyetleri, tam matrisler veya None)
+    """
+    batch = len(references)
+    ref_lengths = np.array([len(reference) for reference in references])
+    hyp_lengths = np.array([len(hypothesis) for hypothesis in hypotheses])
+    max_ref, max_hyp = int(ref_lengths.max()), int(hyp_lengths.max())
+
+    ref_matrix = np.full((batch, max(max_ref, 1)), -1, dtype=np.int64)
+    hyp_matrix = np.full((batch, max(max_hyp, 1)), -2, dtype=np.int64)
+    for row, (reference, hypothesis) in enumerate(zip(references, hypotheses)):
+        ref_matrix[row, :len(reference)] = reference
+        hyp_matrix[row, :len(hypothesis)] = hypothesis
+    hyp_matrix = hyp_matrix[:, :max_hyp]
+
+    rows = np.arange(batch)
+    insertion_costs = np.arange(max_hyp + 1, dtype=np.int64) * error_weight
+    matrices = np.empty((batch, max_ref + 1, max_hyp + 1), dtype=np.int64) if keep_matrices else None
+    current = np.broadcast_to(insertion_costs, (batch, max_hyp + 1)).copy()
+    final_costs = current[rows, hyp_lengths].copy()
+    if keep_matrices:
+        matrices[:, 0, :] = current
+
+    for i in range(1, max_ref + 1):
+        previous = current
+        # Eşleşme -1, ikame +error_weight
+        diagonal = np.where(hyp_matrix == ref_matrix[:, i - 1:i], -1, error_weight)
+        candidate = np.empty_like(previous)
+        candidate[:, 0] = i * error_weight
+        np.minimum(previous[:, 1:] + error_weight, previous[:, :-1] + diagonal, out=candidate[:, 1:])
+        current = np.minimum.accumulate(candidate - insertion_costs, axis=1) + insertion_costs
+        if keep_matrices:
+            matrices[:, i, :] = current
+
+        finished = ref_lengths == i
+        final_costs[finished] = current[rows[finished], hyp_lengths[finished]]
+    return final_costs, matrices
+
+
+def _counts_from_cost(cost, reference_length, hypothesis_length, error_weight):
+    """Son hücredeki maliyetten doğru/ikame/silme/ekleme sayılarını hesaplar"""
+    errors = -(-cost // error_weight)
+    hits = errors * error_weight - cost
+    # doğru + ikame + silme = gerçek uzunluk, doğru + ikame + ekleme = tahmin uzunluğu
+    substitutions = reference_length + hypothesis_length - 2 * hits - errors
+    deletions = reference_length - hits - substitutions
+    insertions = hypothesis_length - hits - substitutions
+    return hits, substitutions, deletions, insertions
+
+
+def _backtrace(costs, reference, hypothesis, error_weight):
+    """Maliyet matrisinden işlem dizisini (C: doğru, S: ikame, D: silme, I: ekleme) çıkarır"""
+    i, j = len(reference), len(hypothesis)
+    # Hücre erişimi Python listelerinde NumPy skalerlerinden çok daha hızlıdır
+    costs = costs[:i + 1, :j + 1].tolist()
+    operations = []
+    while i > 0 or j > 0:
+        if i > 0 and j > 0:
+            match = reference[i - 1] == hypothesis[j - 1]
+            if costs[i][j] == costs[i - 1][j - 1] + (-1 if match else error_weight):
+                operations.append("C" if match else "S")
+                i -= 1
+                j -= 1
+                continue
+        if i > 0 and costs[i][j] == costs[i - 1][j] + error_weight:
+            operations.append("D")
+            i -= 1
+        else:
+            operations.append("I")
+            j -= 1
+    return "".join(reversed(operations))
+
+
+def align_sequences(references, hypotheses, with_operations=False, max_cells=250_000):
+    """
+    Belirteç dizisi çiftlerini toplu olarak hizalar.
+
+    Çiftler uzunluklarına göre sıralanıp toplam matris boyutu `max_cells`
+    hücreyi aşmayacak küçük gruplara ayrılır; böylece dolgu az, çalışan veri
+    önbelleğe sığacak kadar küçük kalır.
+
+    Parametreler:
+    references: Gerçek metin belirteç dizileri
+    hypotheses: Tahmin belirteç dizileri
+    with_operations: True ise örnek başına işlem dizisi de çıkarılır
+    max_cells: Bir grubun maliyet matrislerinin toplam hücre sınırı
+
+    Döndürür: Girdi sırasıyla AlignmentResult listesi
+    """
+    vocabulary = {}
+    encoded_refs = _encode(references, vocabulary)
+    encoded_hyps = _encode(hypotheses, vocabulary)
+
+    order = sorted(range(len(encoded_refs)), key=lambda k: (len(encoded_refs[k]), len(encoded_hyps[k])))
+    results = [None] * len(order)
+
+    start = 0
+    while start < len(order):
+        end = start + 1
+        max_ref = len(encoded_refs[order[start]])
+        max_hyp = len(encoded_hyps[order[start]])
+        while end < len(order):
+            next_ref = max(max_ref, len(encoded_refs[order[end]]))
+            next_hyp = max(max_hyp, len(encoded_hyps[order[end]]))
+            if (end - start + 1) * (next_ref + 1) * (next_hyp + 1) > max_cells:
+                break
+            max_ref, max_hyp = next_ref, next_hyp
+            end += 1
+
+        group = order[start:end]
+        # Doğru sayısı hiçbir zaman bu ağırlığa ulaşamaz; hata sayısı her zaman önceliklidir
+        error_weight = max(max_ref, max_hyp) + 1
+        final_costs, matrices = _cost_matrices(
+            [encoded_refs[k] for k in group], [encoded_hyps[k] for k in group], error_weight, with_operations
+        )
+        ref_lengths = np.array([len(encoded_refs[k]) for k in group])
+        hyp_lengths = np.array([len(encoded_hyps[k]) for k in group])
+        counts = np.stack(_counts_from_cost(final_costs, ref_lengths, hyp_lengths, error_weight), axis=1).tolist()
+
+        for row, k in enumerate(group):
+            operations = _backtrace(matrices[row], encoded_refs[k], encoded_hyps[k], error_weight) if with_operations else ""
+            results[k] = AlignmentResult(*counts[row], len(encoded_refs[k]), operations)
+        start = end
+    return results
+
+
+def _words(text):
+    return text.split()
+
+
+def _characters(text):
+    return list(" ".join(text.split()))
+
+
+def score_corpus(references, hypotheses, with_alignment=True):
+    """
+    Tüm (gerçek metin, tahmin) çiftlerini tek seferde puanlar.
+
+    Parametreler:
+    references: Gerçek metinlerin listesi
+    hypotheses: Tahminlerin listesi
+    with_alignment: True ise kelime düzeyinde örnek başına hizalama da çıkarılır
+
+    Döndürür: Kelime ve karakter düzeyinde sonuçları içeren CorpusScore
+    """
+    return CorpusScore(
+        words=align_sequences(
+            [_words(text) for text in references], [_words(text) for text in hypotheses], with_operations=with_alignment
+        ),
+        characters=align_sequences([_characters(text) for text in references], [_characters(text) for text in hypotheses]),
+    )
+
+
+def format_alignment(reference, hypothesis, operations):
+    """
+    Kelime hizalamasını okunabilir tek satıra dönüştürür.
+
+    Doğru kelimeler olduğu gibi, ikameler [gerçek->tahmin], silmeler [-gerçek],
+    eklemeler [+tahmin] biçiminde yazılır.
+    """
+    ref_words, hyp_words = _words(reference), _words(hypothesis)
+    i = j = 0
+    parts = []
+    for operation in operations:
+        if operation == "C":
+            parts.append(ref_words[i])
+            i += 1
+            j += 1
+        elif operation == "S":
+            parts.append(f"[{ref_words[i]}->{hyp_words[j]}]")
+            i += 1
+            j += 1
+        elif operation == "D":
+            parts.append(f"[-{ref_words[i]}]")
+            i += 1
+        else:
+            parts.append(f"[+{hyp_words[j]}]")
+            j += 1
+    return " ".join(parts)
@@ -0,0 +1,113 @@
+# Yardımlı (Speculative) Çözümleme Karşılaştırması
+# Bu script, ince ayarlı modeli test bölümünde (veya yerel örneklerde) taslak modelli ve taslak modelsiz
+# açgözlü çözümlemeyle yazıya döker; çıktıların token düzeyinde aynı olduğunu doğrular ve hızlanmayı raporlar
+# Kullanım: python yardimli_cozumleme_karsilastirma.py --yardimci-model openai/whisper-tiny.en [--ornek-dizini ../kaldirilan_ornekler]
+
+import argparse
+import json
+import time
+import numpy as np
+import torch
+from degerlendirme_motoru import load_model_and_processor, load_assistant_model
+
+VARSAYILAN_MODEL = "mehmedadymn/Air-traffic-control-fine-tuned-faster-whisper"
+
+
+def load_samples(sample_dir, limit):
+    """Yerel örnek klasörünü, paketlenmiş yerel veri setini veya hub'daki test bölümünü yükler"""
+    from paketli_veri_seti import open_dataset, is_packed_dataset
+    if sample_dir and is_packed_dataset(sample_dir):
+        split = open_dataset(sample_dir)['test']
+        return split.select(range(min(limit, len(split)))) if limit else split
+    if sample_dir:
+        from yerel_ornekler import load_local_samples
+        return load_local_samples(sample_dir, limit=limit)
+    from datasets import Audio
+    split = open_dataset()['test'].cast_column("audio", Audio(sampling_rate=16000))
+    return split.select(range(min(limit, len(split)))) if limit else split
+
+
+def timed_generate(model, input_features, **generate_kwargs):
+    start = time.perf_counter()
+    with torch.no_grad():
+        generated_ids = model.generate(input_features=input_features, **generate_kwargs)
+    return generated_ids, time.perf_counter() - start
+
+
+def compare(model, processor, assistant, samples, batch_size):
+    """
+    Her örneği taslak modelli ve taslak modelsiz (batch boyutu 1) çözümler ve
+    aynı örnekler için toplu açgözlü çözümlemenin süresini de ölçer.
+
+    Döndürür: Sonuç sözlüğü
+    """
+    features = []
+    audio_seconds = 0.0
+    for sample in samples:
+        audio = np.asarray(sample["audio"]["array"], dtype=np.float32)
+        sampling_rate = sample["audio"]["sampling_rate"]
+        audio_seconds += len(audio) / sampling_rate
+        features.append(processor(audio, sampling_rate=sampling_rate, return_tensors="pt").input_features)
+    features = [feature.to(model.device, dtype=model.dtype) for feature in features]
+
+    # Isınma
+    timed_generate(model, features[0])
+    timed_generate(model, features[0], assistant_model=assistant)
+
+    greedy_seconds, assisted_seconds, mismatches = 0.0, 0.0, []
+    for position, feature in enumerate(features):
+        greedy_ids, elapsed = timed_generate(model, feature)
+        greedy_seconds += elapsed
+        assisted_ids, elapsed = timed_generate(model, feature, assistant_model=assistant)
+        assisted_seconds += elapsed
+        if not torch.equal(greedy_ids, assisted_ids):
+            mismatches.append({
+                "ornek": position + 1,
+                "acgozlu": processor.batch_decode(greedy_ids, skip_special_tokens=True)[0],
+                "yardimli": processor.batch_decode(assisted_ids, skip_special_tokens=True)[0],
+            })
+
+    batched_seconds = 0.0
+    for start in range(0, len(features), batch_size):
+        _, elapsed = timed_generate(model, torch.cat(features[start:start + batch_size]))
+        batched_seconds += elapsed
+
+    return {
+        "ornek_sayisi": len(features),
+        "ses_suresi_sn": round(audio_seconds, 2),
+        "acgozlu_sn": round(greedy_seconds, 3),
+        "yardimli_sn": round(assisted_seconds, 3),
+        f"acgozlu_batch{batch_size}_sn": round(batched_seconds, 3),
+        "hizlanma": round(greedy_seconds / assisted_seconds, 3) if assisted_seconds else None,
+        "ayni_cikti": len(features) - len(mismatches),
+        "farkli_cikti": mismatches,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Taslak modelli yardımlı çözümlemeyi açgözlü çözümlemeyle karşılaştırır")
+    parser.add_argument("--model", default=VARSAYILAN_MODEL, help="Ana (ince ayarlı) model")
+    parser.add_argument("--yardimci-model", required=True, help="Aynı sözlüğü kullanan küçük taslak model")
+    parser.add_argument("--ornek-dizini", default=None,
+                        help="Hub yerine kullanılacak yerel örnek klasörü (örn. ../kaldirilan_ornekler) "
+                             "veya paketlenmiş yerel veri seti")
+    parser.add_argument("--ornek-sayisi", type=int, default=None, help="Karşılaştırılacak en fazla örnek sayısı")
+    parser.add_argument("--batch-boyutu", type=int, default=8, help="Toplu açgözlü çözümleme için batch boyutu")
+    parser.add_argument("--cikti", default=None, help="Sonuçların yazılacağı JSON dosyası")
+    args = parser.parse_args()
+
+    model, processor = load_model_and_processor(args.model)
+    assistant = load_assistant_model(args.yardimci_model, model)
+    samples = load_samples(args.ornek_dizini, args.ornek_sayisi)
+    result = compare(model, processor, assistant, samples, args.batch_boyutu)
+
+    print(f"{result['ornek_sayisi']} örnek, {result['ses_suresi_sn']} sn ses")
+    print(f"Açgözlü (batch 1): {result['acgozlu_sn']} sn | Yardımlı (batch 1): {result['yardimli_sn']} sn | "
+          f"Hızlanma: {result['hizlanma']}x")
+    print(f"Açgözlü (batch {args.batch_boyutu}): {result[f'acgozlu_batch{args.batch_boyutu}_sn']} sn")
+    print(f"Aynı çıktı: {result['ayni_cikti']}/{result['ornek_sayisi']}")
+    for mismatch in result["farkli_cikti"]:
+        print(f"  Örnek {mismatch['ornek']}: '{mismatch['acgozlu']}' != '{mismatch['yardimli']}'")
+    if args.cikti:
+        with open(args.cikti, "w", encoding="utf-8") as file:
+            json.dump(result, file, ensure_ascii=False, indent=2)
@@ -0,0 +1,52 @@
+# Yerel Ses Örnekleri
+# Bu modül, `kaldirilan_ornekler` düzenindeki (sample_<id>/audio_<id>.wav + text_<id>.txt)
+# veya aynı adlı WAV + metin çiftlerinden oluşan klasörleri Hugging Face veri seti
+# örnekleriyle aynı biçimde okur; hub'a erişmeden yapılan testlerde kullanılır
+
+import os
+import soundfile as sf
+
+
+def find_sample_pairs(root):
+    """
+    Klasördeki (kimlik, ses dosyası, metin dosyası) üçlülerini bulur.
+
+    `audio_<id>.wav` dosyası için `text_<id>.txt`, diğer ses dosyaları için
+    aynı adlı `.txt` dosyası metin olarak kabul edilir. Metni olmayan ses
+    dosyaları atlanır.
+    """
+    pairs = []
+    for directory, _, files in sorted(os.walk(root)):
+        for file_name in sorted(files):
+            stem, extension = os.path.splitext(file_name)
+            if extension.lower() not in (".wav", ".flac"):
+                continue
+            if stem.startswith("audio_"):
+                sample_id = stem[len("audio_"):]
+                text_name = f"text_{sample_id}.txt"
+            else:
+                sample_id = stem
+                text_name = f"{stem}.txt"
+            text_path = os.path.join(directory, text_name)
+            if os.path.exists(text_path):
+                pairs.append((sample_id, os.path.join(directory, file_name), text_path))
+    return pairs
+
+
+def load_local_samples(root, limit=None):
+    """
+    Klasördeki örnekleri `{'id', 'audio': {'array', 'sampling_rate'}, 'text'}` sözlükleri olarak yükler.
+
+    Parametreler:
+    root: Örneklerin bulunduğu klasör
+    limit: Yüklenecek en fazla örnek sayısı (None ise tümü)
+    """
+    samples = []
+    for sample_id, audio_path, text_path in find_sample_pairs(root)[:limit]:
+        audio_array, sampling_rate = sf.read(audio_path, dtype="float32")
+        if audio_array.ndim > 1:
+            audio_array = audio_array.mean(axis=1)
+        with open(text_path, encoding="utf-8") as file:
+            text = file.read().strip()
+        samples.append({"id": sample_id, "audio": {"array": audio_array, "sampling_rate": sampling_rate}, "text": text})
+    return samples
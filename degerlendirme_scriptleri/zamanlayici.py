@@ -0,0 +1,305 @@
+# Aşama Zamanlayıcıları ve Profil Çıkarma
+# Bu modül, değerlendirme döngüsünün aşamalarını (veri çözme, özellik çıkarma, generate,
+# batch_decode, normalizasyon, WER puanlama ...) ölçen isteğe bağlı ve düşük maliyetli zamanlayıcıları,
+# Chrome izi (trace) / JSON dışa aktarımını, belirli sayıda örnek için cProfile/torch.profiler desteğini ve
+# soğuk başlangıç ölçümünü (ilk transkripte kadar geçen süre, en yüksek bellek kullanımı) içerir
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+
+# Süreç başlangıç zamanı okunamazsa başlangıç olarak bu modülün içe aktarıldığı an kullanılır
+_IMPORTED_AT = time.perf_counter()
+
+
+class _NullStage:
+    """Zamanlayıcı kapalıyken kullanılan, hiçbir şey yapmayan bağlam yöneticisi"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ("profiler", "name", "items", "start")
+
+    def __init__(self, profiler, name, items):
+        self.profiler = profiler
+        self.name = name
+        self.items = items
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.profiler._record(self.name, self.start, time.perf_counter(), self.items)
+        return False
+
+
+class StageProfiler:
+    """
+    Aşama başına süre, çağrı sayısı ve işlenen öğe sayısını toplayan zamanlayıcı.
+
+    Kapalıyken `stage()` paylaşılan boş bir bağlam yöneticisi döndürür; açıkken
+    her aşama için bir Chrome izi olayı da tutulur. Aşamalar iç içe olabilir
+    (örn. `generate` aşaması `transkripsiyon` aşamasının içindedir); tablodaki
+    yüzdeler toplam çalışma süresine göredir.
+    """
+    def __init__(self):
+        self.enabled = False
+        self.keep_events = True
+        self._lock = threading.Lock()
+        self._totals = defaultdict(lambda: [0, 0.0, 0])
+        self._events = []
+        self._started = None
+        self._capture = None
+
+    def enable(self, keep_events=True):
+        """Ölçümü başlatır ve önceki kayıtları temizler"""
+        self.enabled = True
+        self.keep_events = keep_events
+        self._totals.clear()
+        self._events.clear()
+        self._started = time.perf_counter()
+
+    def stage(self, name, items=0):
+        """`with profiler.stage("generate", items=8):` biçiminde kullanılan aşama zamanlayıcısı"""
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name, items)
+
+    def _record(self, name, start, end, items):
+        with self._lock:
+            totals = self._totals[name]
+            totals[0] += 1
+            totals[1] += end - start
+            totals[2] += items
+            if self.keep_events:
+                self._events.append((name, start, end, threading.get_ident(), items))
+
+    def breakdown(self):
+        """Aşama başına (ad, çağrı, toplam sn, ortalama ms, öğe, yüzde) satırlarını döndürür"""
+        wall = time.perf_counter() - self._started if self._started else 0.0
+        rows = []
+        for name, (calls, total, items) in sorted(self._totals.items(), key=lambda item: -item[1][1]):
+            rows.append((name, calls, total, total / calls * 1000 if calls else 0.0, items,
+                         total / wall * 100 if wall else 0.0))
+        return rows, wall
+
+    def format_table(self):
+        """Aşama dökümünü okunabilir bir tablo olarak döndürür"""
+        rows, wall = self.breakdown()
+        lines = [f"{'Aşama':<22}{'Çağrı':>8}{'Toplam sn':>12}{'Ort. ms':>10}{'Öğe':>8}{'%':>7}"]
+        for name, calls, total, mean_ms, items, percent in rows:
+            lines.append(f"{name:<22}{calls:>8}{total:>12.3f}{mean_ms:>10.2f}{items:>8}{percent:>7.1f}")
+        lines.append(f"Toplam çalışma süresi: {wall:.2f} sn")
+        return "\n".join(lines)
+
+    def export_json(self, path):
+        """Aşama dökümünü JSON olarak yazar"""
+        rows, wall = self.breakdown()
+        data = {
+            "toplam_sure_sn": wall,
+            "asamalar": [
+                {"ad": name, "cagri": calls, "toplam_sn": total, "ortalama_ms": mean_ms, "oge": items, "yuzde": percent}
+                for name, calls, total, mean_ms, items, percent in rows
+            ],
+        }
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(data, file, ensure_ascii=False, indent=2)
+
+    def export_chrome_trace(self, path):
+        """Olayları chrome://tracing veya Perfetto ile açılabilen Chrome izi biçiminde yazar"""
+        origin = self._started or 0.0
+        events = [
+            {"name": name, "ph": "X", "ts": (start - origin) * 1e6, "dur": (end - start) * 1e6,
+             "pid": os.getpid(), "tid": thread, "args": {"oge": items}}
+            for name, start, end, thread, items in self._events
+        ]
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+
+    # --- Belirli sayıda örnek için ayrıntılı profil ---
+
+    def configure_capture(self, kind, sample_limit, output_path):
+        """
+        İlk `sample_limit` örnek boyunca cProfile veya torch.profiler çalıştırılmasını ayarlar.
+
+        Parametreler:
+        kind: "cprofile" veya "torch"
+        sample_limit: Profili alınacak örnek sayısı
+        output_path: cProfile için .prof, torch için Chrome izi (.json) dosyası
+        """
+        self._capture = {"kind": kind, "limit": sample_limit, "path": output_path,
+                         "seen": 0, "profiler": None, "done": False}
+
+    def begin_capture(self):
+        """Değerlendirme döngüsünün başında çağrılır; ayarlanmış bir profil varsa başlatır"""
+        capture = self._capture
+        if capture is None or capture["done"] or capture["profiler"] is not None:
+            return
+        if capture["kind"] == "torch":
+            import torch
+            activities = [torch.profiler.ProfilerActivity.CPU]
+            if torch.cuda.is_available():
+                activities.append(torch.profiler.ProfilerActivity.CUDA)
+            capture["profiler"] = torch.profiler.profile(activities=activities, record_shapes=True)
+            capture["profiler"].__enter__()
+        else:
+            import cProfile
+            capture["profiler"] = cProfile.Profile()
+            capture["profiler"].enable()
+
+    def samples_processed(self, count):
+        """Değerlendirme döngüsü tarafından her batch'ten sonra çağrılır; sınıra ulaşınca profili durdurur"""
+        capture = self._capture
+        if capture is None or capture["done"] or capture["profiler"] is None:
+            return
+        capture["seen"] += count
+        if capture["seen"] >= capture["limit"]:
+            self._stop_capture(capture)
+
+    def _stop_capture(self, capture):
+        profiler = capture["profiler"]
+        capture["done"] = True
+        if capture["kind"] == "torch":
+            profiler.__exit__(None, None, None)
+            profiler.export_chrome_trace(capture["path"])
+            print(profiler.key_averages().table(sort_by="self_cpu_time_total", row_limit=20))
+        else:
+            import pstats
+            profiler.disable()
+            profiler.dump_stats(capture["path"])
+            pstats.Stats(profiler).sort_stats("cumulative").print_stats(25)
+        print(f"{capture['seen']} örneklik profil şu dosyaya kaydedildi: {capture['path']}")
+
+    def finish(self, trace_path=None, json_path=None):
+        """Süren profili kapatır, aşama tablosunu yazdırır ve istenen dosyaları üretir"""
+        if self._capture is not None and self._capture["profiler"] is not None and not self._capture["done"]:
+            self._stop_capture(self._capture)
+        if not self.enabled:
+            return
+        print(self.format_table())
+        if trace_path:
+            self.export_chrome_trace(trace_path)
+            print(f"Chrome izi şu dosyaya kaydedildi: {trace_path}")
+        if json_path:
+            self.export_json(json_path)
+            print(f"Aşama dökümü şu dosyaya kaydedildi: {json_path}")
+
+
+def process_uptime():
+    """Sürecin başlangıcından (yorumlayıcının açılışı dahil) bu yana geçen saniye"""
+    try:
+        with open("/proc/self/stat") as file:
+            # Komut adı boşluk içerebileceğinden alanlar son parantezden sonra sayılır
+            start_ticks = int(file.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as file:
+            uptime = float(file.read().split()[0])
+        return uptime - start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return time.perf_counter() - _IMPORTED_AT
+
+
+def peak_rss_mb():
+    """Sürecin şimdiye kadarki en yüksek yerleşik bellek (RSS) kullanımı (MB); ölçülemezse None"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux'ta KB, macOS'ta bayt cinsindendir
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class StartupTracker:
+    """
+    Soğuk başlangıcın kilometre taşlarını kaydeder.
+
+    Her aşama (örn. `ice_aktarma`, `veri_seti`, `model_yuklendi`,
+    `ilk_transkript`) yalnızca ilk çağrıldığında, süreç başlangıcından
+    geçen süre ve o ana kadarki en yüksek RSS ile birlikte kaydedilir;
+    sonraki çağrıların maliyeti bir sözlük aramasıdır.
+    """
+    def __init__(self):
+        self.marks = {}
+        self.reported = False
+
+    def mark(self, name):
+        if name not in self.marks:
+            self.marks[name] = (process_uptime(), peak_rss_mb())
+
+    def summary(self):
+        if not self.marks:
+            return ""
+        lines = ["Başlangıç raporu (süreç başlangıcından itibaren):"]
+        for name, (elapsed, peak) in self.marks.items():
+            memory = f"{peak:.0f} MB" if peak is not None else "-"
+            lines.append(f"  {name:<16} {elapsed:8.2f} sn | en yüksek RSS {memory}")
+        return "\n".join(lines)
+
+    def export_json(self, path):
+        data = {
+            name: {"sure_sn": round(elapsed, 3), "en_yuksek_rss_mb": None if peak is None else round(peak, 1)}
+            for name, (elapsed, peak) in self.marks.items()
+        }
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(data, file, ensure_ascii=False, indent=2)
+
+
+# Tüm modüllerin paylaştığı zamanlayıcı ve başlangıç ölçümü
+profiler = StageProfiler()
+startup = StartupTracker()
+
+
+def report_startup(path=None):
+    """Başlangıç raporunu (bir kez) yazdırır; `path` verilirse JSON olarak da kaydeder"""
+    summary = startup.summary()
+    if not summary:
+        return
+    if not startup.reported:
+        print(summary)
+        startup.reported = True
+    if path:
+        startup.export_json(path)
+        print(f"Başlangıç raporu şu dosyaya kaydedildi: {path}")
+
+
+def add_profiling_arguments(parser):
+    """Değerlendirme scriptlerinin ortak zamanlama/profil argümanlarını ekler"""
+    parser.add_argument("--zamanla", action="store_true", help="Aşama başına süre dökümünü yazdır")
+    parser.add_argument("--zaman-izi", default=None, help="Aşamaların Chrome izi (trace) dosyası")
+    parser.add_argument("--zaman-dokumu", default=None, help="Aşama dökümünün yazılacağı JSON dosyası")
+    parser.add_argument("--profil", choices=["cprofile", "torch"], default=None,
+                        help="İlk örnekler için cProfile veya torch.profiler çalıştır")
+    parser.add_argument("--profil-ornek-sayisi", type=int, default=32, help="Profili alınacak örnek sayısı")
+    parser.add_argument("--profil-cikti", default=None,
+                        help="Profil dosyası (varsayılan: profil.prof veya profil_izi.json)")
+    parser.add_argument("--baslangic-raporu", default=None,
+                        help="İlk transkripte kadar geçen süre ve en yüksek RSS raporunun yazılacağı JSON dosyası")
+
+
+def configure_profiling(args):
+    """Ayrıştırılmış argümanlara göre paylaşılan zamanlayıcıyı açar"""
+    if args.zamanla or args.zaman_izi or args.zaman_dokumu:
+        profiler.enable(keep_events=bool(args.zaman_izi))
+    if args.profil:
+        default_path = "profil.prof" if args.profil == "cprofile" else "profil_izi.json"
+        profiler.configure_capture(args.profil, args.profil_ornek_sayisi, args.profil_cikti or default_path)
+
+
+def finish_profiling(args):
+    """Değerlendirme bittiğinde tabloyu yazdırır ve dosyaları üretir"""
+    profiler.finish(trace_path=args.zaman_izi, json_path=args.zaman_dokumu)
+    if args.baslangic_raporu:
+        report_startup(args.baslangic_raporu)
@@ -0,0 +1,215 @@
+# Önceden Artırılmış Eğitim Parçaları
+# Bu modül, artırma seviyesi önceden bilinen epoch'lar için artırılmış seslerin log-mel
+# özelliklerini çekirdeklere dağıtılmış bir süreç havuzuyla diske (epoch başına bir parça) yazar.
+# AugmentedDataset eğitim sırasında artırma yapmak yerine bu parçaları okur; bir sonraki epoch'un
+# parçası, mevcut epoch eğitilirken arka planda üretilebilir
+# Kullanım: python artirilmis_parcalar.py --parca-dizini ./artirilmis_parcalar --epochlar 0 1 2
+
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import shutil
+import threading
+import time
+import numpy as np
+from veri_artirma import augmentation_level_for_epoch, get_batch_augmenter
+
+OZELLIK_DOSYASI = "ozellikler.f16"
+MANIFEST_DOSYASI = "manifest.json"
+
+_worker_state = {}
+
+
+def shard_path(root, epoch):
+    """Epoch parçasının klasörünü döndürür"""
+    return os.path.join(root, f"epoch_{int(epoch):03d}")
+
+
+def load_shard(root, epoch, expected_count=None, expected_level=None):
+    """
+    Tamamlanmış epoch parçasını bellek eşlemesiyle açar.
+
+    Örnek sayısı veya artırma seviyesi beklenenden farklı olan (örn. başka bir
+    eğitim ayarıyla üretilmiş) parçalar yok sayılır.
+
+    Döndürür: (manifest, (örnek, özellik, kare) boyutlu float16 memmap) veya parça yoksa None
+    """
+    directory = shard_path(root, epoch)
+    manifest_path = os.path.join(directory, MANIFEST_DOSYASI)
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path, encoding="utf-8") as file:
+        manifest = json.load(file)
+    if expected_count is not None and manifest["ornek_sayisi"] != expected_count:
+        return None
+    if expected_level is not None and not np.isclose(manifest["artirma_seviyesi"], expected_level):
+        return None
+    features = np.memmap(os.path.join(directory, OZELLIK_DOSYASI), dtype=np.float16, mode="r",
+                         shape=tuple(manifest["sekil"]))
+    return manifest, features
+
+
+def _init_worker(dataset, feature_extractor, features_path, shape):
+    _worker_state.update(dataset=dataset, feature_extractor=feature_extractor,
+                         features=np.memmap(features_path, dtype=np.float16, mode="r+", shape=shape))
+
+
+def _render_chunk(task):
+    """Bir grup örneği artırır, özelliklerini çıkarır ve parçadaki satırlarına yazar"""
+    start, end, level, seed = task
+    dataset, feature_extractor = _worker_state["dataset"], _worker_state["feature_extractor"]
+    rows = dataset[start:end]
+    sampling_rate = rows["audio"][0]["sampling_rate"]
+    audio_arrays = [np.asarray(audio["array"], dtype=np.float32) for audio in rows["audio"]]
+    augmented = get_batch_augmenter(level)(audio_arrays, sampling_rate, np.random.default_rng(seed))
+    features = feature_extractor(augmented, sampling_rate=sampling_rate).input_features
+    _worker_state["features"][start:end] = np.asarray(features, dtype=np.float16)
+    return end - start
+
+
+def default_processes(reserved_cores=0):
+    """Eğitim süreci ve DataLoader işçileri için `reserved_cores` (+1) çekirdek bırakan süreç sayısı"""
+    return max(1, (os.cpu_count() or 1) - reserved_cores - 1)
+
+
+def generate_epoch_shard(dataset, feature_extractor, root, epoch, level, processes=None, chunk_size=32, seed=42):
+    """
+    Bir epoch için tüm eğitim örneklerinin artırılmış özelliklerini diske yazar.
+
+    Parça önce geçici bir klasöre yazılır ve tamamlanınca yeniden adlandırılır;
+    yarıda kalan üretimler okunmaz.
+
+    Parametreler:
+    dataset: 16 kHz'e dönüştürülmüş Hugging Face eğitim bölümü
+    feature_extractor: WhisperFeatureExtractor
+    root: Parçaların ana klasörü
+    epoch: Epoch numarası (0'dan başlar)
+    level: Bu epoch'un artırma seviyesi
+    processes: Süreç sayısı (None: tüm çekirdekler)
+    chunk_size: Bir görevde işlenen örnek sayısı
+    seed: Tohum; epoch ve örnek konumuyla birleştirilir
+
+    Döndürür: Parça klasörü
+    """
+    directory = shard_path(root, epoch)
+    if load_shard(root, epoch, expected_count=len(dataset), expected_level=level) is not None:
+        return directory
+
+    temporary = directory + ".tmp"
+    shutil.rmtree(temporary, ignore_errors=True)
+    os.makedirs(temporary)
+    shape = (len(dataset), feature_extractor.feature_size, feature_extractor.nb_max_frames)
+    features_path = os.path.join(temporary, OZELLIK_DOSYASI)
+    np.memmap(features_path, dtype=np.float16, mode="w+", shape=shape).flush()
+
+    tasks = [(start, min(start + chunk_size, len(dataset)), level, (seed, int(epoch), start))
+             for start in range(0, len(dataset), chunk_size)]
+    started = time.perf_counter()
+    # Eğitim süreci çok iş parçacıklı ve CUDA/torch durumu taşıdığından fork güvenli değildir
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(processes, initializer=_init_worker,
+                      initargs=(dataset, feature_extractor, features_path, shape)) as pool:
+        for _ in pool.imap_unordered(_render_chunk, tasks):
+            pass
+
+    manifest = {
+        "epoch": int(epoch), "artirma_seviyesi": level, "ornek_sayisi": len(dataset),
+        "sekil": list(shape), "tohum": seed, "uretim_suresi_sn": round(time.perf_counter() - started, 2),
+    }
+    with open(os.path.join(temporary, MANIFEST_DOSYASI), "w", encoding="utf-8") as file:
+        json.dump(manifest, file, ensure_ascii=False, indent=2)
+    shutil.rmtree(directory, ignore_errors=True)
+    os.replace(temporary, directory)
+    print(f"Epoch {int(epoch)} parçası hazır ({manifest['uretim_suresi_sn']} sn): {directory}")
+    return directory
+
+
+class ShardPrefetcher:
+    """
+    Sonraki epoch'ların parçalarını eğitimle eş zamanlı olarak arka planda üretir.
+
+    İstenen epoch'lar sıraya alınır ve tek bir arka plan iş parçacığında sırayla
+    üretilir; asıl iş, o iş parçacığının açtığı (spawn) süreç havuzunda yapılır.
+    Havuz, eğitimle çekirdek paylaştığından varsayılan olarak DataLoader
+    işçilerine (`reserved_cores`) ve eğitim sürecine yer bırakır. Eski
+    epoch'ların parçaları disk alanı için silinir.
+    """
+    def __init__(self, dataset, feature_extractor, root, initial_level, final_level, epochs,
+                 processes=None, seed=42, keep_previous=False, reserved_cores=0):
+        self.dataset = dataset
+        self.feature_extractor = feature_extractor
+        self.root = root
+        self.initial_level = initial_level
+        self.final_level = final_level
+        self.epochs = epochs
+        self.processes = processes or default_processes(reserved_cores)
+        self.seed = seed
+        self.keep_previous = keep_previous
+        self._queue = queue.Queue()
+        self._requested = set()
+        self._thread = None
+
+    def _run(self):
+        while True:
+            epoch = self._queue.get()
+            try:
+                level = augmentation_level_for_epoch(epoch, self.initial_level, self.final_level, self.epochs)
+                generate_epoch_shard(self.dataset, self.feature_extractor, self.root, epoch, level,
+                                     processes=self.processes, seed=self.seed)
+            except Exception as error:
+                print(f"Epoch {epoch} parçası üretilemedi, artırma eğitim sırasında yapılacak: {error}")
+            finally:
+                self._queue.task_done()
+
+    def prefetch(self, epoch):
+        """`epoch` için parça üretimini sıraya alır (eğitim dışındaki veya istenmiş epoch'lar atlanır)"""
+        epoch = int(epoch)
+        if epoch >= self.epochs or epoch in self._requested:
+            return
+        self._requested.add(epoch)
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        self._queue.put(epoch)
+
+    def wait(self):
+        """Sıradaki tüm üretimlerin bitmesini bekler"""
+        self._queue.join()
+
+    def remove_before(self, epoch):
+        """`epoch`'tan önceki epoch'ların parçalarını siler"""
+        if self.keep_previous:
+            return
+        for previous in range(int(epoch)):
+            shutil.rmtree(shard_path(self.root, previous), ignore_errors=True)
+
+
+if __name__ == "__main__":
+    import sys
+    from datasets import Audio
+    from transformers import WhisperFeatureExtractor
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "degerlendirme_scriptleri"))
+    from paketli_veri_seti import open_dataset, VARSAYILAN_VERI_SETI
+
+    parser = argparse.ArgumentParser(description="Eğitim epoch'ları için önceden artırılmış özellik parçaları üretir")
+    parser.add_argument("--parca-dizini", default="artirilmis_parcalar", help="Parçaların yazılacağı klasör")
+    parser.add_argument("--veri-seti", default=VARSAYILAN_VERI_SETI,
+                        help="Hugging Face veri seti veya paketli_veri_seti.py ile oluşturulmuş yerel klasör")
+    parser.add_argument("--epochlar", type=int, nargs="+", default=[0], help="Üretilecek epoch numaraları")
+    parser.add_argument("--toplam-epoch", type=int, default=10, help="Eğitimdeki toplam epoch sayısı")
+    parser.add_argument("--baslangic-seviyesi", type=float, default=0.5, help="İlk epoch'un artırma seviyesi")
+    parser.add_argument("--bitis-seviyesi", type=float, default=0.1, help="Son epoch'un artırma seviyesi")
+    parser.add_argument("--surec-sayisi", type=int, default=None, help="Süreç sayısı (varsayılan: tüm çekirdekler)")
+    parser.add_argument("--model", default="openai/whisper-medium.en", help="Özellik çıkarıcının alınacağı model")
+    parser.add_argument("--tohum", type=int, default=42, help="Rastgelelik tohumu")
+    args = parser.parse_args()
+
+    feature_extractor = WhisperFeatureExtractor.from_pretrained(args.model)
+    train_split = open_dataset(args.veri_seti)["train"]
+    train_split = train_split.cast_column("audio", Audio(sampling_rate=feature_extractor.sampling_rate))
+    for epoch in args.epochlar:
+        level = augmentation_level_for_epoch(epoch, args.baslangic_seviyesi, args.bitis_seviyesi, args.toplam_epoch)
+        generate_epoch_shard(train_split, feature_extractor, args.parca_dizini, epoch, level,
+                             processes=args.surec_sayisi, seed=args.tohum)
@@ -0,0 +1,160 @@
+# Bilgi Damıtma (Knowledge Distillation)
+# Bu modül, ince ayarlı modeli öğretmen olarak kullanıp daha az decoder katmanlı (veya daha küçük tabanlı)
+# bir öğrenci model eğitmek için gereken parçaları içerir: öğretmenden öğrenci oluşturma, öğretmen
+# etiketlerinin (pseudo-label) diske önbelleğe alınması ve logit KL kaybını ekleyen Seq2SeqTrainer alt sınıfı
+
+import copy
+import json
+import os
+import re
+import sys
+import numpy as np
+import torch
+import torch.nn.functional as F
+from transformers import WhisperForConditionalGeneration
+from uzunluk_gruplu_ornekleyici import LengthBucketedSeq2SeqTrainer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "degerlendirme_scriptleri"))
+from wer_hesaplama import score_corpus
+
+_DECODER_LAYER_PATTERN = re.compile(r'^model\.decoder\.layers\.(\d+)\.')
+
+
+def decoder_layer_map(teacher_layers, student_layers):
+    """Öğrencinin her decoder katmanının kopyalanacağı, eşit aralıklı öğretmen katmanları (ilk ve son dahil)"""
+    if student_layers == 1:
+        return [teacher_layers - 1]
+    return [int(round(index)) for index in np.linspace(0, teacher_layers - 1, student_layers)]
+
+
+def build_student_model(teacher, decoder_layers):
+    """
+    Öğretmenle aynı encoder'a ve daha az decoder katmanına sahip öğrenci model oluşturur.
+
+    Encoder, gömmeler ve son katman normu öğretmenden aynen kopyalanır; decoder
+    katmanları öğretmenin eşit aralıklı katmanlarından alınır. Otoregresif
+    çözümlemenin maliyeti decoder'da olduğundan CPU'da hızlanma decoder katman
+    sayısıyla orantılıdır.
+    """
+    config = copy.deepcopy(teacher.config)
+    config.decoder_layers = decoder_layers
+    student = WhisperForConditionalGeneration(config)
+    student.generation_config = copy.deepcopy(teacher.generation_config)
+
+    layer_map = decoder_layer_map(teacher.config.decoder_layers, decoder_layers)
+    teacher_state = teacher.state_dict()
+    student_state = {}
+    for key in student.state_dict():
+        match = _DECODER_LAYER_PATTERN.match(key)
+        source = key
+        if match:
+            source = f"model.decoder.layers.{layer_map[int(match.group(1))]}." + key[match.end():]
+        student_state[key] = teacher_state[source]
+    student.load_state_dict(student_state)
+    print(f"Öğrenci model: {decoder_layers} decoder katmanı (öğretmen katmanları {layer_map})")
+    return student
+
+
+def teacher_pseudo_labels(teacher, tokenizer, feature_store, audio_keys, cache_path, teacher_key,
+                          batch_size=16, max_length=225):
+    """
+    Öğretmenin her eğitim örneği için ürettiği transkriptleri döndürür.
+
+    Etiketler, artırılmamış özelliklerden (özellik deposu) açgözlü çözümlemeyle
+    üretilir ve ses özetine göre `cache_path` dosyasında saklanır; öğretmen
+    değişmediği sürece yalnızca eksik örnekler çözümlenir.
+
+    Parametreler:
+    feature_store: Özelliklerin okunacağı FeatureStore
+    audio_keys: Örneklerin özellik deposu anahtarları (bkz. FeatureStore.index_split)
+    teacher_key: Öğretmen modeli tanımlayan anahtar (değişirse önbellek geçersiz olur)
+    """
+    labels = {}
+    if os.path.exists(cache_path):
+        with open(cache_path, encoding="utf-8") as file:
+            cached = json.load(file)
+        if cached.get("ogretmen") == teacher_key:
+            labels = cached["etiketler"]
+
+    def save():
+        temporary_path = cache_path + ".tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump({"ogretmen": teacher_key, "etiketler": labels}, file, ensure_ascii=False)
+        os.replace(temporary_path, cache_path)
+
+    missing = [key for key in dict.fromkeys(audio_keys) if key not in labels]
+    if missing:
+        print(f"Öğretmen etiketleri üretiliyor: {len(missing)} örnek")
+        teacher.eval()
+        for batch_number, start in enumerate(range(0, len(missing), batch_size), start=1):
+            batch_keys = missing[start:start + batch_size]
+            features = torch.from_numpy(np.stack([feature_store.get(key) for key in batch_keys]))
+            with torch.no_grad():
+                generated_ids = teacher.generate(
+                    input_features=features.to(teacher.device, dtype=teacher.dtype), max_length=max_length
+                )
+            for key, text in zip(batch_keys, tokenizer.batch_decode(generated_ids, skip_special_tokens=True)):
+                labels[key] = text.strip()
+            # Uzun üretimler yarıda kalırsa kaldığı yerden devam edilebilsin
+            if batch_number % 50 == 0:
+                save()
+        save()
+    return [labels[key] for key in audio_keys]
+
+
+def select_pseudo_labels(references, pseudo_labels, max_wer=0.1):
+    """
+    Gerçek metne göre WER'i `max_wer` değerini aşmayan öğretmen etiketlerini seçer.
+
+    Eşiği aşan (öğretmenin yanıldığı veya halüsinasyon ürettiği) örneklerde
+    gerçek metin kullanılır.
+
+    Döndürür: (eğitim metinleri, öğretmen etiketi kullanılan örnek sayısı)
+    """
+    score = score_corpus(references, pseudo_labels, with_alignment=False)
+    texts, accepted = [], 0
+    for reference, pseudo_label, result in zip(references, pseudo_labels, score.words):
+        if result.error_rate <= max_wer:
+            texts.append(pseudo_label)
+            accepted += 1
+        else:
+            texts.append(reference)
+    return texts, accepted
+
+
+def distillation_loss(student_logits, teacher_logits, labels, temperature=2.0):
+    """
+    Etiketli (dolgu olmayan) konumlarda öğretmen ve öğrenci dağılımları arasındaki KL ıraksaması.
+
+    Gradyan büyüklüğünün sıcaklıktan bağımsız kalması için T^2 ile ölçeklenir.
+    """
+    mask = labels.ne(-100)
+    student_log_probs = F.log_softmax(student_logits[mask].float() / temperature, dim=-1)
+    teacher_log_probs = F.log_softmax(teacher_logits[mask].float() / temperature, dim=-1)
+    kl = F.kl_div(student_log_probs, teacher_log_probs, log_target=True, reduction='batchmean')
+    return kl * temperature ** 2
+
+
+class DistillationSeq2SeqTrainer(LengthBucketedSeq2SeqTrainer):
+    """
+    Kaybı `(1 - kl_weight) * çapraz entropi + kl_weight * KL(öğretmen || öğrenci)` olan eğitici.
+
+    Çapraz entropi, eğitim metinlerine (gerçek metin veya öğretmen etiketi)
+    göre hesaplanır. Öğretmen dondurulur ve yalnızca ileri geçişte kullanılır.
+    """
+    def __init__(self, *args, teacher_model=None, temperature=2.0, kl_weight=0.8, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.teacher_model = teacher_model
+        self.temperature = temperature
+        self.kl_weight = kl_weight
+        self.teacher_model.to(self.args.device)
+        self.teacher_model.eval()
+        self.teacher_model.requires_grad_(False)
+
+    def compute_loss(self, model, inputs, return_outputs=False, num_items_in_batch=None):
+        outputs = model(**inputs)
+        with torch.no_grad():
+            teacher_logits = self.teacher_model(**inputs).logits
+        kl = distillation_loss(outputs.logits, teacher_logits, inputs['labels'], self.temperature)
+        loss = (1 - self.kl_weight) * outputs.loss + self.kl_weight * kl
+        return (loss, outputs) if return_outputs else loss
@@ -1,91 +1,92 @@
 # ATC Verileri için Whisper Modeli İnce Ayar Eğitim Scripti
 # Bu script, ATC iletişimleri için Whisper modelini ince ayar yapar
 
-from datasets import load_dataset, Audio
+from datasets import Audio
 from transformers import (
     WhisperTokenizer,
     WhisperProcessor,
     WhisperFeatureExtractor,
     WhisperForConditionalGeneration,
     Seq2SeqTrainingArguments,
-    Seq2SeqTrainer,
     EarlyStoppingCallback,
     TrainerCallback
 )
 from dataclasses import dataclass
 from typing import Any, Dict, List, Union
+import os
+import sys
 import torch
 import evaluate
 import numpy as np
-from audiomentations import Compose, AddGaussianNoise, TimeStretch, PitchShift, Shift, Gain, ClippingDistortion, Trim
+from veri_artirma import augment_audio_with_clipping, augmentation_level_for_epoch, get_batch_augmenter
+from artirilmis_parcalar import load_shard, ShardPrefetcher
+from uzunluk_gruplu_ornekleyici import (
+    compute_lengths, DurationBucketBatchSampler, PaddingReportCallback, LengthBucketedSeq2SeqTrainer
+)
+from damitma import build_student_model, teacher_pseudo_labels, select_pseudo_labels, DistillationSeq2SeqTrainer
+from katmanli_dogrulama import stratified_subset, with_tiered_validation
 
-# Veri setini yükle
-dataset = load_dataset("mehmedadymn/air-traffic-dataset")
-train_dataset = dataset['train']
-test_dataset = dataset['test']
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "degerlendirme_scriptleri"))
+from ozellik_deposu import FeatureStore
+from tahmin_onbellegi import model_fingerprint
+from paketli_veri_seti import open_dataset
 
 # Model parametreleri
+# Veri seti kaynağı (hub kimliği veya paketli_veri_seti.py ile oluşturulmuş çevrimdışı yerel klasör)
+dataset_source = 'mehmedadymn/air-traffic-dataset'
+# Yardımlı çözümlemede (--yardimci-model) kullanılacak taslak model için aynı sözlüğe sahip
+# küçük bir model (örn. 'openai/whisper-tiny.en') aynı ayarlarla eğitilebilir
 model_id = 'openai/whisper-medium.en'
 out_dir = 'whisper-medium.en-atc-dataset'
 epochs = 10
+feature_store_dir = 'ozellik_deposu'
+augmentation_shard_dir = 'artirilmis_parcalar'  # None: artırma yalnızca eğitim sırasında yapılır
+train_max_batch_size = 16
+train_max_label_tokens = 16 * 48  # Batch başına (örnek sayısı x en uzun etiket) bütçesi
+dataloader_num_workers = 4
+
+# Damıtma (distillation) ayarları: öğretmen verilirse ince ayarlı öğretmenden daha küçük bir öğrenci eğitilir
+teacher_model_id = None  # örn. 'mehmedadymn/Air-traffic-control-fine-tuned-faster-whisper' veya yerel klasör
+student_model_id = None  # None: öğretmenden türetilir; örn. 'openai/whisper-small.en' daha küçük tabanla başlatır
+student_decoder_layers = 2  # Öğretmenden türetilen öğrencinin decoder katman sayısı
+freeze_student_encoder = True  # Öğretmenden kopyalanan encoder eğitilmez
+distillation_temperature = 2.0
+distillation_kl_weight = 0.8  # Kayıp = (1 - ağırlık) * çapraz entropi + ağırlık * KL
+pseudo_label_max_wer = 0.1  # Gerçek metne göre WER'i bu eşiği aşan öğretmen etiketleri kullanılmaz
+if teacher_model_id is not None:
+    out_dir = out_dir + '-damitilmis'
+
+# Katmanlı doğrulama: her epoch öğretmen zorlamalı kayıp/token doğruluğu ve süreye göre tabakalı alt kümede WER;
+# tam (generate tabanlı) WER yalnızca her `full_validation_every` epoch'ta ve eğitim sonunda hesaplanır.
+# False: her epoch tüm test bölümünde generate çalıştırılır
+tiered_validation = True
+validation_subset_size = 200
+full_validation_every = 3
+
+class StoredFeatureDataset(torch.utils.data.Dataset):
+    """Log-mel özelliklerini özellik deposundan kopyasız okuyan veri seti sınıfı"""
+    def __init__(self, dataset, feature_store, tokenizer):
+        self.feature_store = feature_store
+        # Eksik özellikler yalnızca ilk çalıştırmada hesaplanır
+        self.audio_keys = feature_store.index_split(dataset)
+        self.labels = tokenizer(dataset['text'])['input_ids']
+
+    def __len__(self):
+        return len(self.audio_keys)
+
+    def __getitem__(self, idx):
+        return {
+            'input_features': self.feature_store.get(self.audio_keys[idx]),
+            'labels': self.labels[idx]
+        }
 
-# Model bileşenlerini yükle
-feature_extractor = WhisperFeatureExtractor.from_pretrained(model_id)
-tokenizer = WhisperTokenizer.from_pretrained(model_id, language='English', task='transcribe')
-processor = WhisperProcessor.from_pretrained(model_id, language='English', task='transcribe')
-
-# Ses örneklerini 16kHz'e dönüştür
-train_dataset = train_dataset.cast_column('audio', Audio(sampling_rate=16000))
-test_dataset = test_dataset.cast_column('audio', Audio(sampling_rate=16000))
-
-def augment_audio_with_clipping(audio, sampling_rate, augmentation_level):
-    """Ses verisi artırma fonksiyonu"""
-    noise_severity = augmentation_level * 0.05
-    pitch_severity = augmentation_level * 2
-    time_stretch_severity = 1.0 + (augmentation_level * 0.2)
-    shift_severity = augmentation_level * 0.1
-    gain_severity = augmentation_level * 10
-    min_noise_amplitude = max(0.001, noise_severity / 10)
-    
-    # Ses artırma işlemleri
-    augment = Compose([
-        AddGaussianNoise(min_amplitude=min_noise_amplitude, max_amplitude=noise_severity, p=0.5),
-        TimeStretch(min_rate=1.0, max_rate=time_stretch_severity, p=0.5),
-        PitchShift(min_semitones=-pitch_severity, max_semitones=pitch_severity, p=0.5),
-        Shift(min_shift=-shift_severity, max_shift=shift_severity, p=0.5),
-        Gain(min_gain_in_db=-gain_severity, max_gain_in_db=gain_severity, p=0.5),
-        ClippingDistortion(p=0.3),
-        Trim(top_db=30, p=0.3)
-    ])
-    augmented_audio = augment(samples=audio, sample_rate=sampling_rate)
-    return augmented_audio
-
-def prepare_dataset(batch):
-    """Veri setini model için hazırlama fonksiyonu"""
-    audio = batch['audio']
-    batch['input_features'] = []
-    for a in audio:
-        audio_array = a['array'].astype(np.float32)
-        input_features = feature_extractor(audio_array, sampling_rate=a['sampling_rate']).input_features[0]
-        batch['input_features'].append(input_features)
-    tokenized = tokenizer(batch['text'], padding='longest', return_attention_mask=True)
-    batch['labels'] = tokenized['input_ids']
-    batch['decoder_attention_mask'] = tokenized['attention_mask']
-    return batch
-
-# Test veri setini hazırla
-test_dataset = test_dataset.map(
-    prepare_dataset,
-    batched=True,
-    batch_size=64,
-    num_proc=4
-)
 
 class AugmentedDataset(torch.utils.data.Dataset):
     """Dinamik veri artırma için özel veri seti sınıfı"""
     def __init__(
         self, dataset, feature_extractor, tokenizer, augment_audio_with_clipping,
-        initial_augmentation_level=0.5, final_augmentation_level=0.1, epochs=10
+        initial_augmentation_level=0.5, final_augmentation_level=0.1, epochs=10,
+        batch_augmentation=True, shard_dir=None
     ):
         self.dataset = dataset
         self.feature_extractor = feature_extractor
@@ -96,55 +97,108 @@ class AugmentedDataset(torch.utils.data.Dataset):
         self.epochs = epochs - 1
         self.current_epoch = 0
         self.augmentation_level = initial_augmentation_level
+        # True ise batch'ler vektörleştirilmiş artırıcıdan, değilse örnek örnek audiomentations zincirinden geçer
+        self.batch_augmentation = batch_augmentation
+        # Verilirse epoch'un önceden artırılmış özellikleri (hazırsa) bu klasördeki parçadan okunur
+        self.shard_dir = shard_dir
+        self._shard = None
+        self._rng = None
+
+    def __getstate__(self):
+        # Parçanın bellek eşlemesi DataLoader işçilerine kopyalanmaz; her işçi kendisi açar
+        state = self.__dict__.copy()
+        state['_shard'] = None
+        return state
 
     def set_epoch(self, epoch):
         """Epoch başına artırma seviyesini güncelle"""
         self.current_epoch = epoch
-        decay_rate = (self.final_augmentation_level / self.initial_augmentation_level) ** (1 / self.epochs)
-        self.augmentation_level = self.initial_augmentation_level * (decay_rate ** self.current_epoch)
+        self.augmentation_level = augmentation_level_for_epoch(
+            self.current_epoch, self.initial_augmentation_level, self.final_augmentation_level, self.epochs + 1
+        )
+        self._shard = None
         print(f"Epoch {self.current_epoch}: Artırma seviyesi {self.augmentation_level} olarak ayarlandı")
 
     def __len__(self):
         return len(self.dataset)
 
+    def _random_generator(self):
+        """DataLoader işçilerinin her biri için farklı tohumlu rastgele sayı üreteci"""
+        if self._rng is None:
+            self._rng = np.random.default_rng(torch.initial_seed() % 2 ** 32)
+        return self._rng
+
     def __getitem__(self, idx):
         """Veri örneğini hazırla ve artır"""
-        batch = self.dataset[idx]
-        audio = batch['audio']
-        audio_array = audio['array'].astype(np.float32)
-        augmented_audio = self.augment_audio_with_clipping(
-            audio_array, audio['sampling_rate'], self.augmentation_level
-        )
-        input_features = self.feature_extractor(
-            augmented_audio, sampling_rate=audio['sampling_rate']
-        ).input_features[0]
-        batch['input_features'] = input_features
-        tokenized = self.tokenizer(
-            batch['text'], padding='longest', return_attention_mask=True
-        )
-        batch['labels'] = tokenized['input_ids']
-        batch['decoder_attention_mask'] = tokenized['attention_mask']
-        return batch
+        return self.__getitems__([idx])[0]
 
-# Artırılmış eğitim veri setini oluştur
-train_dataset = AugmentedDataset(
-    dataset=train_dataset,
-    feature_extractor=feature_extractor,
-    tokenizer=tokenizer,
-    augment_audio_with_clipping=augment_audio_with_clipping,
-    initial_augmentation_level=0.5,
-    final_augmentation_level=0.1,
-    epochs=epochs
-)
+    def _epoch_shard(self):
+        """Mevcut epoch'un tamamlanmış parçasının özelliklerini döndürür; henüz yoksa None"""
+        if self.shard_dir is None:
+            return None
+        if self._shard is None:
+            loaded = load_shard(
+                self.shard_dir, self.current_epoch,
+                expected_count=len(self.dataset), expected_level=self.augmentation_level
+            )
+            if loaded is not None:
+                self._shard = loaded[1]
+        return self._shard
+
+    def __getitems__(self, indices):
+        """Batch'teki örnekleri tek seferde oku, artır ve özelliklerini çıkar"""
+        shard = self._epoch_shard()
+        if shard is not None:
+            texts = self.dataset.select_columns(['text'])[list(indices)]['text']
+            tokenized = self.tokenizer(texts, return_attention_mask=True)
+            return [
+                {
+                    'input_features': shard[idx],
+                    'labels': tokenized['input_ids'][position],
+                    'decoder_attention_mask': tokenized['attention_mask'][position]
+                }
+                for position, idx in enumerate(indices)
+            ]
+
+        rows = self.dataset[list(indices)]
+        sampling_rate = rows['audio'][0]['sampling_rate']
+        audio_arrays = [audio['array'].astype(np.float32) for audio in rows['audio']]
+        if self.batch_augmentation:
+            augment = get_batch_augmenter(self.augmentation_level)
+            augmented_audio = augment(audio_arrays, sampling_rate, self._random_generator())
+        else:
+            augmented_audio = [
+                self.augment_audio_with_clipping(audio_array, sampling_rate, self.augmentation_level)
+                for audio_array in audio_arrays
+            ]
+        input_features = self.feature_extractor(
+            augmented_audio, sampling_rate=sampling_rate
+        ).input_features
+        # Etiketler ayrı ayrı tokenize edilir; batch dolgusu veri toplayıcıda yapılır
+        tokenized = self.tokenizer(rows['text'], return_attention_mask=True)
+        return [
+            {
+                'input_features': input_features[position],
+                'labels': tokenized['input_ids'][position],
+                'decoder_attention_mask': tokenized['attention_mask'][position]
+            }
+            for position in range(len(audio_arrays))
+        ]
 
 class UpdateDatasetEpochCallback(TrainerCallback):
     """Her epoch başında veri seti artırma seviyesini güncelleyen callback"""
-    def __init__(self, train_dataset):
+    def __init__(self, train_dataset, shard_prefetcher=None):
         self.train_dataset = train_dataset
+        self.shard_prefetcher = shard_prefetcher
 
     def on_epoch_begin(self, args, state, control, **kwargs):
+        epoch = int(round(state.epoch))
         if hasattr(self.train_dataset, 'set_epoch'):
-            self.train_dataset.set_epoch(state.epoch)
+            self.train_dataset.set_epoch(epoch)
+        if self.shard_prefetcher is not None:
+            # Epoch N eğitilirken epoch N+1'in parçası arka planda hazırlanır
+            self.shard_prefetcher.remove_before(epoch)
+            self.shard_prefetcher.prefetch(epoch + 1)
 
 @dataclass
 class DataCollatorSpeechSeq2SeqWithPadding:
@@ -160,6 +214,8 @@ class DataCollatorSpeechSeq2SeqWithPadding:
         batch = self.processor.feature_extractor.pad(
             input_features, return_tensors='pt'
         )
+        # Depodan gelen float16 özellikler modele float32 olarak verilir
+        batch['input_features'] = batch['input_features'].float()
         
         # Etiketleri hazırla
         label_features = [{'input_ids': feature['labels']} for feature in features]
@@ -173,77 +229,183 @@ class DataCollatorSpeechSeq2SeqWithPadding:
         batch['decoder_attention_mask'] = labels_batch['attention_mask']
         return batch
 
-# Modeli yükle ve yapılandır
-model = WhisperForConditionalGeneration.from_pretrained(model_id)
-model.config.forced_decoder_ids = None
-model.config.suppress_tokens = []
-model.config.pad_token_id = tokenizer.pad_token_id
 
-# Veri toplayıcıyı oluştur
-data_collator = DataCollatorSpeechSeq2SeqWithPadding(
-    processor=processor,
-    decoder_start_token_id=model.config.decoder_start_token_id,
-)
+def main():
+    """
+    Eğitimi çalıştırır.
 
-# Değerlendirme metriğini yükle
-metric = evaluate.load('wer')
-
-def compute_metrics(pred):
-    """WER (Word Error Rate) hesaplama fonksiyonu"""
-    pred_ids = pred.predictions
-    label_ids = pred.label_ids
-    label_ids[label_ids == -100] = tokenizer.pad_token_id
-    pred_str = tokenizer.batch_decode(pred_ids, skip_special_tokens=True)
-    label_str = tokenizer.batch_decode(label_ids, skip_special_tokens=True)
-    wer = 100 * metric.compute(predictions=pred_str, references=label_str)
-    return {'wer': wer}
-
-# Eğitim argümanlarını ayarla
-training_args = Seq2SeqTrainingArguments(
-    output_dir=out_dir,
-    per_device_train_batch_size=16,
-    per_device_eval_batch_size=16,
-    gradient_accumulation_steps=2,
-    learning_rate=1e-5,
-    warmup_steps=500,
-    num_train_epochs=epochs,
-    evaluation_strategy='epoch',
-    save_strategy='epoch',
-    logging_strategy='epoch',
-    predict_with_generate=True,
-    generation_max_length=225,
-    report_to=['tensorboard'],
-    load_best_model_at_end=True,
-    metric_for_best_model='wer',
-    greater_is_better=False,
-    dataloader_num_workers=4,
-    save_total_limit=2,
-    lr_scheduler_type='cosine',
-    seed=42,
-    data_seed=42,
-    weight_decay=0.01,
-    bf16=True,
-    fp16=False
-)
+    Artırılmış parçaları üreten spawn süreçleri bu scripti `__mp_main__`
+    olarak yeniden içe aktarır; eğitim yalnızca doğrudan çalıştırıldığında
+    başladığından işçiler veri setini ve modeli yeniden yüklemez.
+    """
+    # Veri setini yükle
+    dataset = open_dataset(dataset_source)
+    train_dataset = dataset['train']
+    test_dataset = dataset['test']
 
-# Eğiticiyi oluştur
-trainer = Seq2SeqTrainer(
-    args=training_args,
-    model=model,
-    train_dataset=train_dataset,
-    eval_dataset=test_dataset,
-    data_collator=data_collator,
-    compute_metrics=compute_metrics,
-    tokenizer=tokenizer,
-    callbacks=[
-        EarlyStoppingCallback(early_stopping_patience=3),
-        UpdateDatasetEpochCallback(train_dataset)
-    ]
-)
+    # Model bileşenlerini yükle
+    feature_extractor = WhisperFeatureExtractor.from_pretrained(model_id)
+    tokenizer = WhisperTokenizer.from_pretrained(model_id, language='English', task='transcribe')
+    processor = WhisperProcessor.from_pretrained(model_id, language='English', task='transcribe')
+
+    # Ses örneklerini 16kHz'e dönüştür
+    train_dataset = train_dataset.cast_column('audio', Audio(sampling_rate=16000))
+    test_dataset = test_dataset.cast_column('audio', Audio(sampling_rate=16000))
+
+    # Katmanlı doğrulamanın alt kümesi test örneklerinin sürelerine göre bir kez seçilir
+    validation_subset = None
+    if tiered_validation:
+        test_durations, _ = compute_lengths(test_dataset, tokenizer)
+        validation_subset = stratified_subset(test_durations, validation_subset_size, seed=42)
+
+    # Test veri setini hazırla (özellikler depodan okunur, STFT her çalıştırmada tekrarlanmaz)
+    feature_store = FeatureStore(feature_store_dir, feature_extractor)
+    test_dataset = StoredFeatureDataset(test_dataset, feature_store, tokenizer)
+
+    # Damıtmada eğitim metinleri öğretmenin (eşiği geçen) transkriptleriyle değiştirilir
+    teacher_model = None
+    if teacher_model_id is not None:
+        teacher_model = WhisperForConditionalGeneration.from_pretrained(teacher_model_id)
+        teacher_model.to('cuda' if torch.cuda.is_available() else 'cpu')
+        pseudo_labels = teacher_pseudo_labels(
+            teacher_model, tokenizer, feature_store, feature_store.index_split(train_dataset),
+            cache_path=os.path.join(feature_store_dir, 'ogretmen_etiketleri.json'),
+            teacher_key=model_fingerprint(teacher_model_id, teacher_model)
+        )
+        train_texts, accepted = select_pseudo_labels(train_dataset['text'], pseudo_labels, pseudo_label_max_wer)
+        print(f"Öğretmen etiketi kullanılan örnek: {accepted}/{len(train_texts)}")
+        train_dataset = train_dataset.remove_columns('text').add_column('text', train_texts)
+
+    # Artırılmış eğitim veri setini oluştur
+    train_dataset = AugmentedDataset(
+        dataset=train_dataset,
+        feature_extractor=feature_extractor,
+        tokenizer=tokenizer,
+        augment_audio_with_clipping=augment_audio_with_clipping,
+        initial_augmentation_level=0.5,
+        final_augmentation_level=0.1,
+        epochs=epochs,
+        shard_dir=augmentation_shard_dir
+    )
+
+    # Sonraki epoch'ların artırılmış parçalarını eğitimle eş zamanlı üret
+    shard_prefetcher = None
+    if augmentation_shard_dir is not None:
+        # Parça üretimi DataLoader işçilerine ve eğitim sürecine çekirdek bırakır
+        shard_prefetcher = ShardPrefetcher(
+            train_dataset.dataset, feature_extractor, augmentation_shard_dir,
+            initial_level=0.5, final_level=0.1, epochs=epochs, reserved_cores=dataloader_num_workers
+        )
+
+    # Modeli yükle ve yapılandır
+    if teacher_model is None:
+        model = WhisperForConditionalGeneration.from_pretrained(model_id)
+    elif student_model_id is not None:
+        model = WhisperForConditionalGeneration.from_pretrained(student_model_id)
+    else:
+        model = build_student_model(teacher_model, student_decoder_layers)
+        if freeze_student_encoder:
+            model.freeze_encoder()
+    model.config.forced_decoder_ids = None
+    model.config.suppress_tokens = []
+    model.config.pad_token_id = tokenizer.pad_token_id
+
+    # Veri toplayıcıyı oluştur
+    data_collator = DataCollatorSpeechSeq2SeqWithPadding(
+        processor=processor,
+        decoder_start_token_id=model.config.decoder_start_token_id,
+    )
+
+    # Değerlendirme metriğini yükle
+    metric = evaluate.load('wer')
+
+    def compute_metrics(pred):
+        """WER (Word Error Rate) hesaplama fonksiyonu"""
+        pred_ids = pred.predictions
+        label_ids = pred.label_ids
+        label_ids[label_ids == -100] = tokenizer.pad_token_id
+        pred_str = tokenizer.batch_decode(pred_ids, skip_special_tokens=True)
+        label_str = tokenizer.batch_decode(label_ids, skip_special_tokens=True)
+        wer = 100 * metric.compute(predictions=pred_str, references=label_str)
+        return {'wer': wer}
+
+    # Eğitim argümanlarını ayarla
+    training_args = Seq2SeqTrainingArguments(
+        output_dir=out_dir,
+        per_device_train_batch_size=16,
+        per_device_eval_batch_size=16,
+        gradient_accumulation_steps=2,
+        learning_rate=1e-5,
+        warmup_steps=500,
+        num_train_epochs=epochs,
+        evaluation_strategy='epoch',
+        save_strategy='epoch',
+        logging_strategy='epoch',
+        predict_with_generate=True,
+        generation_max_length=225,
+        report_to=['tensorboard'],
+        load_best_model_at_end=True,
+        # Katmanlı doğrulamada en iyi model her epoch aynı alt kümede ölçülen WER ile seçilir
+        metric_for_best_model='wer_alt_kume' if tiered_validation else 'wer',
+        greater_is_better=False,
+        dataloader_num_workers=dataloader_num_workers,
+        save_total_limit=2,
+        lr_scheduler_type='cosine',
+        seed=42,
+        data_seed=42,
+        weight_decay=0.01,
+        bf16=True,
+        fp16=False
+    )
+
+    # Eğitim batch'lerini süre ve etiket uzunluğuna göre grupla (sabit 16 yerine token bütçesi)
+    train_durations, train_label_lengths = compute_lengths(train_dataset.dataset, tokenizer)
+    train_batch_sampler = DurationBucketBatchSampler(
+        train_durations, train_label_lengths,
+        max_tokens=train_max_label_tokens, max_batch_size=train_max_batch_size, seed=42, epochs=epochs
+    )
+
+    # Eğiticiyi oluştur (damıtmada kayba öğretmen logitleriyle KL eklenir)
+    trainer_class, trainer_options = LengthBucketedSeq2SeqTrainer, {}
+    if teacher_model is not None:
+        trainer_class = DistillationSeq2SeqTrainer
+        trainer_options = dict(
+            teacher_model=teacher_model, temperature=distillation_temperature, kl_weight=distillation_kl_weight
+        )
+    if tiered_validation:
+        trainer_class = with_tiered_validation(trainer_class)
+        trainer_options.update(validation_subset=validation_subset, full_validation_every=full_validation_every)
+    trainer = trainer_class(
+        train_batch_sampler=train_batch_sampler,
+        args=training_args,
+        model=model,
+        train_dataset=train_dataset,
+        eval_dataset=test_dataset,
+        data_collator=data_collator,
+        compute_metrics=compute_metrics,
+        tokenizer=tokenizer,
+        callbacks=[
+            EarlyStoppingCallback(early_stopping_patience=3),
+            UpdateDatasetEpochCallback(train_dataset, shard_prefetcher),
+            PaddingReportCallback(train_batch_sampler, baseline_batch_size=16)
+        ],
+        **trainer_options
+    )
+
+    # İlk epoch'un parçası eğitimden önce üretilir; sonrakiler bir önceki epoch eğitilirken hazırlanır
+    if shard_prefetcher is not None:
+        shard_prefetcher.prefetch(0)
+        shard_prefetcher.wait()
+
+    # Eğitimi başlat
+    trainer.train()
+
+    # Son değerlendirme metriklerini hesapla ve yazdır
+    final_metrics = trainer.evaluate(eval_dataset=test_dataset)
+    print("Son değerlendirme metrikleri:", final_metrics)
+    if tiered_validation:
+        print(f"Katmanlı doğrulamayla kazanılan toplam değerlendirme süresi: {trainer.validation_time_saved:.1f} sn")
 
-# Eğitimi başlat
-trainer.train()
 
-# Son değerlendirme metriklerini hesapla ve yazdır
-final_metrics = trainer.evaluate(eval_dataset=test_dataset)
-print("Son değerlendirme metrikleri:", final_metrics) 
\ No newline at end of file
+if __name__ == '__main__':
+    main()
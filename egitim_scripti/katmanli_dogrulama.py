@@ -0,0 +1,186 @@
+# Katmanlı Doğrulama
+# Bu modül, her epoch'ta test bölümünün tamamında generate çalıştırmak yerine daha ucuz bir doğrulama
+# yapan Seq2SeqTrainer karışımını (mixin) içerir: her epoch öğretmen zorlamalı (teacher-forced) kayıp ve
+# token doğruluğu ile süreye göre tabakalı sabit bir alt kümede generate tabanlı WER hesaplanır; tam WER
+# yalnızca her k epoch'ta ve eğitim sonunda hesaplanır. Tam değerlendirmeye göre kazanılan süre raporlanır
+
+import time
+import numpy as np
+import torch
+from transformers import EvalPrediction
+
+_SUBCLASSES = {}
+
+
+def stratified_subset(durations, size, strata=5, seed=42):
+    """
+    Süreye göre tabakalı, sabit bir alt küme seçer.
+
+    Örnekler süre yüzdeliklerine göre `strata` tabakaya ayrılır ve her
+    tabakadan büyüklüğüyle orantılı sayıda örnek rastgele (sabit tohumla)
+    seçilir; böylece kısa ve uzun yayınlar alt kümede test bölümündeki
+    oranlarıyla temsil edilir ve alt küme epoch'tan epoch'a değişmez.
+
+    Parametreler:
+    durations: Örneklerin saniye cinsinden süreleri
+    size: Alt küme büyüklüğü (veri setinden büyükse tüm örnekler döner)
+    strata: Tabaka sayısı
+    seed: Rastgelelik tohumu
+
+    Döndürür: Sıralı örnek indeksleri listesi
+    """
+    durations = np.asarray(durations, dtype=np.float64)
+    if size >= len(durations):
+        return list(range(len(durations)))
+    rng = np.random.default_rng(seed)
+    edges = np.quantile(durations, np.linspace(0, 1, strata + 1)[1:-1])
+    labels = np.searchsorted(edges, durations, side='right')
+    groups = [np.flatnonzero(labels == stratum) for stratum in range(strata)]
+    # Kalan kontenjan en büyük kesirli paya sahip tabakalara dağıtılır
+    shares = np.array([len(group) for group in groups]) * size / len(durations)
+    counts = np.floor(shares).astype(int)
+    for stratum in np.argsort(counts - shares)[:size - counts.sum()]:
+        counts[stratum] += 1
+    selected = [rng.choice(group, count, replace=False) for group, count in zip(groups, counts) if count]
+    return sorted(int(index) for index in np.concatenate(selected))
+
+
+class TieredValidationMixin:
+    """
+    Seq2SeqTrainer.evaluate yerine katmanlı doğrulama yapan karışım.
+
+    Her değerlendirmede:
+    - tüm test bölümünde öğretmen zorlamalı tek ileri geçişle `loss` ve
+      `token_dogrulugu` (maskelenmemiş etiketlerde argmax isabeti),
+    - `validation_subset` indekslerinde generate ile `wer_alt_kume`
+    hesaplanır. Eğitim sırasında her `full_validation_every` epoch'ta, son
+    epoch'ta ve eğitim dışındaki çağrılarda generate tüm bölümde çalıştırılır
+    ve `wer` de raporlanır; `wer_alt_kume` bu tahminlerden çıkarılır.
+
+    `wer_alt_kume` her değerlendirmede aynı alt kümede hesaplandığından
+    `metric_for_best_model` olarak kullanılabilir; erken durdurma ve
+    `load_best_model_at_end` bu metrikle çalışır. Tam generate'in maliyeti
+    son tam değerlendirmenin (henüz yoksa alt kümenin) örnek başına
+    süresinden tahmin edilir ve kazanılan süre `kazanilan_sure_sn` olarak
+    loglanır.
+    """
+    def __init__(self, *args, validation_subset=None, full_validation_every=3, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.validation_subset = validation_subset
+        self.full_validation_every = full_validation_every
+        self.validation_time_saved = 0.0
+        self._generate_seconds_per_sample = None
+        self._in_training_loop = False
+
+    def train(self, *args, **kwargs):
+        self._in_training_loop = True
+        try:
+            return super().train(*args, **kwargs)
+        finally:
+            self._in_training_loop = False
+
+    def _full_validation_due(self):
+        if not self._in_training_loop:
+            return True
+        epoch = int(round(self.state.epoch or 0))
+        return epoch % self.full_validation_every == 0 or epoch >= self.args.num_train_epochs
+
+    def _teacher_forced_metrics(self, eval_dataset, metric_key_prefix):
+        """Tek ileri geçişle ortalama kayıp ve token doğruluğu (generate çalıştırılmaz)"""
+        dataloader = self.get_eval_dataloader(eval_dataset)
+        model = self._wrap_model(self.model, training=False, dataloader=dataloader)
+        model.eval()
+        totals = torch.zeros(4, dtype=torch.float64, device=self.args.device)
+        for inputs in dataloader:
+            inputs = self._prepare_inputs(inputs)
+            labels = inputs['labels']
+            with torch.no_grad(), self.compute_loss_context_manager():
+                loss, outputs = self.compute_loss(model, inputs, return_outputs=True)
+            mask = labels.ne(-100)
+            correct = outputs.logits.argmax(dim=-1).eq(labels) & mask
+            totals += torch.stack([
+                loss.detach().double() * len(labels), labels.new_tensor(len(labels)).double(),
+                correct.sum().double(), mask.sum().double(),
+            ])
+        loss_sum, samples, correct, tokens = self.accelerator.reduce(totals, reduction='sum').tolist()
+        return {
+            f'{metric_key_prefix}_loss': loss_sum / max(samples, 1),
+            f'{metric_key_prefix}_token_dogrulugu': correct / max(tokens, 1),
+        }
+
+    def _generate_predictions(self, eval_dataset, ignore_keys, metric_key_prefix):
+        start = time.perf_counter()
+        output = self.evaluation_loop(
+            self.get_eval_dataloader(eval_dataset), description='Evaluation', prediction_loss_only=False,
+            ignore_keys=ignore_keys, metric_key_prefix=metric_key_prefix,
+        )
+        elapsed = time.perf_counter() - start
+        self._generate_seconds_per_sample = elapsed / max(output.num_samples, 1)
+        return output
+
+    def evaluate(self, eval_dataset=None, ignore_keys=None, metric_key_prefix='eval', **gen_kwargs):
+        eval_dataset = self.eval_dataset if eval_dataset is None else eval_dataset
+        if self.validation_subset is None:
+            return super().evaluate(
+                eval_dataset, ignore_keys=ignore_keys, metric_key_prefix=metric_key_prefix, **gen_kwargs
+            )
+
+        # Seq2SeqTrainer.evaluate'teki generate ayarları
+        gen_kwargs = gen_kwargs.copy()
+        if gen_kwargs.get('max_length') is None and gen_kwargs.get('max_new_tokens') is None \
+                and self.args.generation_max_length is not None:
+            gen_kwargs['max_length'] = self.args.generation_max_length
+        if gen_kwargs.get('num_beams') is None and self.args.generation_num_beams is not None:
+            gen_kwargs['num_beams'] = self.args.generation_num_beams
+        self.gather_function = self.accelerator.gather
+        self._gen_kwargs = gen_kwargs
+
+        start = time.perf_counter()
+        full = self._full_validation_due()
+        metrics = self._teacher_forced_metrics(eval_dataset, metric_key_prefix)
+        if full:
+            output = self._generate_predictions(eval_dataset, ignore_keys, metric_key_prefix)
+            metrics[f'{metric_key_prefix}_wer'] = output.metrics[f'{metric_key_prefix}_wer']
+            subset_metrics = self.compute_metrics(EvalPrediction(
+                predictions=output.predictions[self.validation_subset],
+                label_ids=output.label_ids[self.validation_subset],
+            ))
+            metrics[f'{metric_key_prefix}_wer_alt_kume'] = subset_metrics['wer']
+            # Tam değerlendirmenin maliyeti generate süresidir; öğretmen zorlamalı geçiş ek maliyettir
+            estimated = self._generate_seconds_per_sample * len(eval_dataset)
+        else:
+            subset = torch.utils.data.Subset(eval_dataset, self.validation_subset)
+            seconds_per_sample = self._generate_seconds_per_sample
+            output = self._generate_predictions(subset, ignore_keys, metric_key_prefix)
+            metrics[f'{metric_key_prefix}_wer_alt_kume'] = output.metrics[f'{metric_key_prefix}_wer']
+            # Tam değerlendirme = tüm bölümde generate (kayıp da bu sırada hesaplanırdı)
+            estimated = (seconds_per_sample or self._generate_seconds_per_sample) * len(eval_dataset)
+
+        elapsed = time.perf_counter() - start
+        saved = estimated - elapsed
+        self.validation_time_saved += saved
+        metrics.update({
+            f'{metric_key_prefix}_sure_sn': elapsed,
+            f'{metric_key_prefix}_kazanilan_sure_sn': saved,
+            f'{metric_key_prefix}_toplam_kazanilan_sure_sn': self.validation_time_saved,
+        })
+        if self.state.epoch is not None:
+            metrics['epoch'] = self.state.epoch
+        print(
+            f"Katmanlı doğrulama ({'tam' if full else f'{len(self.validation_subset)} örneklik alt küme'}): "
+            f"{elapsed:.1f} sn, tam değerlendirmeye göre kazanılan {saved:.1f} sn "
+            f"(toplam {self.validation_time_saved:.1f} sn)"
+        )
+
+        self.log(metrics)
+        self.control = self.callback_handler.on_evaluate(self.args, self.state, self.control, metrics)
+        return metrics
+
+
+def with_tiered_validation(trainer_class):
+    """Verilen eğitici sınıfının katmanlı doğrulama yapan alt sınıfını döndürür"""
+    if trainer_class not in _SUBCLASSES:
+        _SUBCLASSES[trainer_class] = type(
+            f'TieredValidation{trainer_class.__name__}', (TieredValidationMixin, trainer_class), {}
+        )
+    return _SUBCLASSES[trainer_class]
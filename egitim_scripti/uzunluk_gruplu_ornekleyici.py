@@ -0,0 +1,222 @@
+# Süreye Göre Gruplanmış Batch Örnekleyici
+# Bu modül, eğitim örneklerini ses süresi ve etiket uzunluğuna göre kovalara ayırıp sabit örnek
+# sayısı yerine token bütçesiyle batch'ler oluşturan örnekleyiciyi ve bu örnekleyiciyi kullanan
+# Seq2SeqTrainer alt sınıfını içerir. Her epoch'taki etiket dolgusu (padding) oranı raporlanır
+
+import io
+from functools import partial
+import numpy as np
+import soundfile as sf
+import torch
+from datasets import Audio
+from transformers import Seq2SeqTrainer, TrainerCallback
+from transformers.trainer_utils import seed_worker
+
+
+def compute_lengths(dataset, tokenizer, batch_size=256):
+    """
+    Veri setindeki her örneğin ses süresini (saniye) ve etiket token sayısını hesaplar.
+
+    Sesler çözülmez; süre, ses dosyasının başlığından (paketlenmiş yerel veri
+    setlerinde dizinden) okunur.
+
+    Döndürür: (süreler, etiket uzunlukları) numpy dizileri
+    """
+    if hasattr(dataset, 'durations'):
+        return dataset.durations(), np.array([len(ids) for ids in tokenizer(dataset['text'])['input_ids']])
+    raw = dataset.cast_column('audio', Audio(decode=False))
+    durations, label_lengths = [], []
+    for start in range(0, len(raw), batch_size):
+        rows = raw[start:start + batch_size]
+        for audio in rows['audio']:
+            if audio.get('bytes'):
+                durations.append(sf.info(io.BytesIO(audio['bytes'])).duration)
+            else:
+                durations.append(sf.info(audio['path']).duration)
+        label_lengths.extend(len(ids) for ids in tokenizer(rows['text'])['input_ids'])
+    return np.array(durations), np.array(label_lengths)
+
+
+def padding_stats(batches, label_lengths):
+    """Batch listesi için etiket dolgu oranını ve batch boyutu istatistiklerini döndürür"""
+    real = sum(int(label_lengths[batch].sum()) for batch in batches)
+    padded = sum(int(label_lengths[batch].max()) * len(batch) for batch in batches)
+    sizes = [len(batch) for batch in batches]
+    return {
+        'batch_sayisi': len(batches),
+        'ortalama_batch_boyutu': float(np.mean(sizes)) if sizes else 0.0,
+        'dolgu_orani': 1 - real / padded if padded else 0.0,
+    }
+
+
+class DurationBucketBatchSampler(torch.utils.data.Sampler):
+    """
+    Süre ve etiket uzunluğuna göre gruplanmış, token bütçeli batch örnekleyici.
+
+    Her epoch'ta indeksler karıştırılır ve `max_batch_size * bucket_window`
+    büyüklüğündeki pencerelere bölünür. Pencereler (etiket uzunluğu, süre)
+    sırasına göre dizilip batch'lere ayrılır: bir batch'in en uzun etiketi ile
+    örnek sayısının çarpımı `max_tokens` değerini, örnek sayısı da
+    `max_batch_size` değerini geçmez. Whisper kodlayıcısı her örneği 30 saniyeye
+    doldurduğundan kodlayıcı belleği örnek sayısıyla sınırlanır. Batch'lerin
+    sırası yeniden karıştırılır.
+
+    Trainer adım sayısını ilk `len()` çağrısından sabitlediğinden her epoch
+    aynı sayıda batch üretilir: uzunluk, ilk `epochs` epoch'un en büyük batch
+    sayısıdır; daha az batch çıkan epoch'larda en büyük batch'ler ikiye
+    bölünür (bütçe korunur). `epochs`'tan sonraki bir epoch daha fazla batch
+    üretirse fazlası o epoch'ta atlanır.
+    """
+    def __init__(self, durations, label_lengths, max_tokens=2048, max_batch_size=32, bucket_window=50, seed=42,
+                 epochs=1, drop_last=False):
+        """
+        Parametreler:
+        durations: Örneklerin ses süreleri (saniye)
+        label_lengths: Örneklerin etiket token sayıları
+        max_tokens: Bir batch'teki (örnek sayısı x en uzun etiket) üst sınırı
+        max_batch_size: Bir batch'teki en fazla örnek sayısı
+        bucket_window: Sıralamanın yapıldığı pencerenin batch cinsinden büyüklüğü
+        seed: Karıştırma tohumu; epoch numarasıyla birleştirilir
+        epochs: Sabit uzunluğun hesaplandığı epoch sayısı (eğitimdeki epoch sayısı)
+        drop_last: True ise her pencerenin bütçeyi doldurmayan son batch'i atlanır
+        """
+        self.durations = np.asarray(durations)
+        self.label_lengths = np.asarray(label_lengths)
+        self.max_tokens = max_tokens
+        self.max_batch_size = max_batch_size
+        self.bucket_window = bucket_window
+        self.seed = seed
+        self.epochs = epochs
+        self.drop_last = drop_last
+        self.epoch = 0
+        self._batches = None
+        self._num_batches = None
+        self.epoch_stats = []
+
+    def set_epoch(self, epoch):
+        """Karıştırma düzenini verilen epoch için yeniden oluşturur"""
+        if epoch != self.epoch or self._batches is None:
+            self.epoch = epoch
+            self._batches = None
+
+    def _build_batches(self, epoch):
+        rng = np.random.default_rng((self.seed, epoch))
+        order = rng.permutation(len(self.label_lengths))
+        window = self.max_batch_size * self.bucket_window
+        batches = []
+        for start in range(0, len(order), window):
+            chunk = order[start:start + window]
+            chunk = chunk[np.lexsort((self.durations[chunk], self.label_lengths[chunk]))]
+            batch, longest = [], 0
+            for idx in chunk:
+                length = max(longest, int(self.label_lengths[idx]))
+                if batch and (length * (len(batch) + 1) > self.max_tokens or len(batch) >= self.max_batch_size):
+                    batches.append(batch)
+                    batch, length = [], int(self.label_lengths[idx])
+                batch.append(int(idx))
+                longest = length
+            underfilled = len(batch) < self.max_batch_size and longest * (len(batch) + 1) <= self.max_tokens
+            if batch and not (self.drop_last and underfilled):
+                batches.append(batch)
+        return [batches[position] for position in rng.permutation(len(batches))]
+
+    def _fixed_length(self, batches):
+        """Batch listesini en büyük batch'leri bölerek (veya fazlasını atlayarak) sabit uzunluğa getirir"""
+        batches = list(batches)
+        while len(batches) < len(self):
+            position = max(range(len(batches)), key=lambda index: len(batches[index]))
+            if len(batches[position]) < 2:
+                break
+            batch = batches[position]
+            batches[position:position + 1] = [batch[:len(batch) // 2], batch[len(batch) // 2:]]
+        if len(batches) > len(self):
+            print(f"Uyarı: epoch {self.epoch} {len(batches) - len(self)} batch fazla üretti; fazlası atlanıyor.")
+        return batches[:len(self)]
+
+    def batches(self):
+        """Mevcut epoch'un batch listesini döndürür"""
+        if self._batches is None:
+            self._batches = self._fixed_length(self._build_batches(self.epoch))
+        return self._batches
+
+    def __len__(self):
+        if self._num_batches is None:
+            self._num_batches = max(len(self._build_batches(epoch)) for epoch in range(max(1, self.epochs)))
+        return self._num_batches
+
+    def __iter__(self):
+        batches = self.batches()
+        stats = padding_stats(batches, self.label_lengths)
+        stats['epoch'] = self.epoch
+        self.epoch_stats.append(stats)
+        yield from batches
+        # Sonraki iterasyon, set_epoch çağrılmasa da yeni bir karıştırma kullanır
+        self.set_epoch(self.epoch + 1)
+
+    def fixed_size_padding_stats(self, batch_size):
+        """Karşılaştırma için: aynı veriyle sabit boyutlu rastgele batch'lerin dolgu istatistikleri"""
+        order = np.random.default_rng((self.seed, self.epoch)).permutation(len(self.label_lengths))
+        batches = [order[start:start + batch_size] for start in range(0, len(order), batch_size)]
+        return padding_stats(batches, self.label_lengths)
+
+
+class PaddingReportCallback(TrainerCallback):
+    """Her epoch sonunda örnekleyicinin etiket dolgu oranını yazdıran callback"""
+    def __init__(self, batch_sampler, baseline_batch_size=16):
+        self.batch_sampler = batch_sampler
+        self.baseline_batch_size = baseline_batch_size
+
+    def on_epoch_end(self, args, state, control, **kwargs):
+        if not self.batch_sampler.epoch_stats:
+            return
+        stats = self.batch_sampler.epoch_stats[-1]
+        baseline = self.batch_sampler.fixed_size_padding_stats(self.baseline_batch_size)
+        print(
+            f"Epoch {stats['epoch']}: {stats['batch_sayisi']} batch, ortalama batch boyutu "
+            f"{stats['ortalama_batch_boyutu']:.1f}, etiket dolgu oranı %{stats['dolgu_orani'] * 100:.1f} "
+            f"(sabit {self.baseline_batch_size}'lık batch'lerle %{baseline['dolgu_orani'] * 100:.1f})"
+        )
+        state.log_history.append({
+            'epoch': state.epoch, 'step': state.global_step,
+            'dolgu_orani': stats['dolgu_orani'], 'sabit_batch_dolgu_orani': baseline['dolgu_orani'],
+        })
+
+
+class LengthBucketedSeq2SeqTrainer(Seq2SeqTrainer):
+    """
+    Eğitim DataLoader'ını verilen batch örnekleyiciyle kuran Seq2SeqTrainer.
+
+    `dataloader_*` eğitim argümanları DataLoader'a aktarılır; batch
+    örnekleyiciyle birlikte verilemeyen `dataloader_drop_last` örnekleyiciye
+    iletilir.
+    """
+    def __init__(self, *args, train_batch_sampler=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.train_batch_sampler = train_batch_sampler
+        if train_batch_sampler is not None:
+            train_batch_sampler.drop_last = self.args.dataloader_drop_last
+
+    def get_train_dataloader(self):
+        if self.train_batch_sampler is None:
+            return super().get_train_dataloader()
+        data_collator = self._get_collator_with_removed_columns(self.data_collator, description='training')
+        options = {}
+        if self.args.dataloader_num_workers > 0:
+            # Bu ayarlar yalnızca işçi süreçlerle geçerlidir
+            options = dict(
+                persistent_workers=self.args.dataloader_persistent_workers,
+                prefetch_factor=self.args.dataloader_prefetch_factor,
+                multiprocessing_context=self.args.dataloader_multiprocessing_context,
+                worker_init_fn=partial(
+                    seed_worker, num_workers=self.args.dataloader_num_workers, rank=self.args.process_index
+                ),
+            )
+        dataloader = torch.utils.data.DataLoader(
+            self.train_dataset,
+            batch_sampler=self.train_batch_sampler,
+            collate_fn=data_collator,
+            num_workers=self.args.dataloader_num_workers,
+            pin_memory=self.args.dataloader_pin_memory,
+            **options
+        )
+        return self.accelerator.prepare(dataloader)
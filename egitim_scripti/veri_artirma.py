@@ -0,0 +1,185 @@
+# Toplu Ses Verisi Artırma
+# Bu modül, eğitim sırasında kullanılan ses artırma zincirini içerir: artırma seviyesine göre
+# önbelleğe alınan audiomentations zinciri ve aynı dönüşümleri tüm batch'e tek seferde uygulayan,
+# GPU gerektirmeyen vektörleştirilmiş sürüm
+
+from fractions import Fraction
+from functools import lru_cache
+import numpy as np
+from scipy.signal import resample_poly
+
+
+def augmentation_parameters(augmentation_level):
+    """Artırma seviyesinden dönüşümlerin şiddet değerlerini hesaplar"""
+    noise_severity = augmentation_level * 0.05
+    return {
+        'noise_severity': noise_severity,
+        'min_noise_amplitude': max(0.001, noise_severity / 10),
+        'pitch_severity': augmentation_level * 2,
+        'time_stretch_severity': 1.0 + (augmentation_level * 0.2),
+        'shift_severity': augmentation_level * 0.1,
+        'gain_severity': augmentation_level * 10,
+    }
+
+
+def augmentation_level_for_epoch(epoch, initial_level, final_level, epochs):
+    """Başlangıç seviyesinden son seviyeye üstel olarak azalan epoch artırma seviyesini döndürür"""
+    decay_rate = (final_level / initial_level) ** (1 / max(1, epochs - 1))
+    return initial_level * (decay_rate ** epoch)
+
+
+@lru_cache(maxsize=32)
+def build_augmentation(augmentation_level):
+    """Verilen seviye için audiomentations zincirini bir kez kurar ve önbellekte tutar"""
+    from audiomentations import Compose, AddGaussianNoise, TimeStretch, PitchShift, Shift, Gain, ClippingDistortion, Trim
+
+    params = augmentation_parameters(augmentation_level)
+    return Compose([
+        AddGaussianNoise(min_amplitude=params['min_noise_amplitude'], max_amplitude=params['noise_severity'], p=0.5),
+        TimeStretch(min_rate=1.0, max_rate=params['time_stretch_severity'], p=0.5),
+        PitchShift(min_semitones=-params['pitch_severity'], max_semitones=params['pitch_severity'], p=0.5),
+        Shift(min_shift=-params['shift_severity'], max_shift=params['shift_severity'], p=0.5),
+        Gain(min_gain_db=-params['gain_severity'], max_gain_db=params['gain_severity'], p=0.5),
+        ClippingDistortion(p=0.3),
+        Trim(top_db=30, p=0.3)
+    ])
+
+
+def augment_audio_with_clipping(audio, sampling_rate, augmentation_level):
+    """Ses verisi artırma fonksiyonu (tek örnek, audiomentations zinciri)"""
+    augment = build_augmentation(augmentation_level)
+    return augment(samples=audio, sample_rate=sampling_rate)
+
+
+def _pad_batch(audio_arrays):
+    """Farklı uzunluktaki sesleri sıfırla doldurulmuş (batch, en uzun) matrise yerleştirir"""
+    lengths = np.array([len(audio) for audio in audio_arrays])
+    padded = np.zeros((len(audio_arrays), max(lengths.max(), 1)), dtype=np.float32)
+    for row, audio in enumerate(audio_arrays):
+        padded[row, :len(audio)] = audio
+    return padded, lengths
+
+
+def speed_factor_range(augmentation_level):
+    """Verilen seviyede hız pertürbasyonunun alabileceği (en küçük, en büyük) hız çarpanı"""
+    params = augmentation_parameters(augmentation_level)
+    pitch = 2.0 ** (params['pitch_severity'] / 12)
+    return 1.0 / pitch, params['time_stretch_severity'] * pitch
+
+
+def speed_perturb(audio, factor):
+    """
+    Sesi `factor` kat hızlandırır (perde ve tempo birlikte değişir).
+
+    Çıktının uzunluğu ceil(len(audio) / factor) olur; 1'den küçük
+    çarpanlarda ses uzar ve sonu kesilmez, böylece etiketteki metnin
+    tamamı seste kalır.
+    """
+    ratio = Fraction(float(factor)).limit_denominator(100)
+    return resample_poly(audio, ratio.denominator, ratio.numerator).astype(np.float32)
+
+
+def _trim_bounds(padded, lengths, top_db=30, frame_length=2048, hop_length=512):
+    """Her satırda, en yüksek enerjiye göre `top_db` altında kalan baş ve son sessizliğin sınırlarını bulur"""
+    batch_size, width = padded.shape
+    centered = np.pad(padded, ((0, 0), (frame_length // 2, frame_length // 2)))
+    frame_count = 1 + width // hop_length
+    frames = np.lib.stride_tricks.sliding_window_view(centered, frame_length, axis=1)[:, ::hop_length][:, :frame_count]
+    power = np.mean(frames ** 2, axis=2)
+
+    valid = np.arange(frame_count)[None, :] * hop_length < lengths[:, None]
+    power = np.where(valid, power, 0.0)
+    reference = power.max(axis=1, keepdims=True)
+    loud = (power > reference * 10 ** (-top_db / 10)) & (reference > 0)
+
+    starts = np.where(loud.any(axis=1), loud.argmax(axis=1) * hop_length, 0)
+    last = frame_count - 1 - loud[:, ::-1].argmax(axis=1)
+    ends = np.where(loud.any(axis=1), np.minimum(lengths, (last + 1) * hop_length), lengths)
+    return starts, ends
+
+
+class BatchAugmenter:
+    """
+    `build_augmentation` zincirindeki dönüşümleri tüm batch'e birlikte uygulayan artırıcı.
+
+    Gürültü, kazanç, kaydırma, kırpma (clipping) ve sessizlik kırpma dönüşümleri
+    doldurulmuş batch matrisi üzerinde vektörleştirilmiştir. TimeStretch ve
+    PitchShift yerine, aynı aralıklardan seçilen hız çarpanlarıyla tek bir
+    yeniden örnekleme (hız pertürbasyonu) yapılır; faz vocoder'ın maliyeti
+    ortadan kalkar ama perde ve tempo birlikte değişir. Yavaşlatılan (perdesi
+    düşürülen) sesler uzar ve batch en uzun sese göre yeniden doldurulur;
+    içerik hiçbir zaman kesilmez.
+    Dönüşümlerin sırası ve uygulanma olasılıkları zincirle aynıdır.
+    """
+    def __init__(self, augmentation_level):
+        self.augmentation_level = augmentation_level
+        self.params = augmentation_parameters(augmentation_level)
+
+    def __call__(self, audio_arrays, sampling_rate, rng):
+        """
+        Parametreler:
+        audio_arrays: Ses dizilerinin listesi
+        sampling_rate: Seslerin örnekleme hızı
+        rng: numpy.random.Generator
+
+        Döndürür: Artırılmış float32 ses dizilerinin listesi
+        """
+        params = self.params
+        batch_size = len(audio_arrays)
+        padded, lengths = _pad_batch([np.asarray(audio, dtype=np.float32) for audio in audio_arrays])
+        mask = np.arange(padded.shape[1])[None, :] < lengths[:, None]
+
+        # Gauss gürültüsü
+        apply = rng.random(batch_size) < 0.5
+        if apply.any():
+            amplitude = rng.uniform(params['min_noise_amplitude'], params['noise_severity'], batch_size) * apply
+            padded += (rng.standard_normal(padded.shape, dtype=np.float32) * amplitude[:, None].astype(np.float32)) * mask
+
+        # Zaman esnetme ve perde kaydırma: tek yeniden örnekleme ile hız pertürbasyonu
+        stretch = np.where(rng.random(batch_size) < 0.5,
+                           rng.uniform(1.0, params['time_stretch_severity'], batch_size), 1.0)
+        semitones = np.where(rng.random(batch_size) < 0.5,
+                             rng.uniform(-params['pitch_severity'], params['pitch_severity'], batch_size), 0.0)
+        factors = stretch * 2.0 ** (semitones / 12)
+        perturbed = np.abs(factors - 1.0) > 1e-3
+        if perturbed.any():
+            padded, lengths = _pad_batch([
+                speed_perturb(padded[row, :lengths[row]], factors[row]) if perturbed[row] else padded[row, :lengths[row]]
+                for row in range(batch_size)
+            ])
+            mask = np.arange(padded.shape[1])[None, :] < lengths[:, None]
+
+        # Döngüsel kaydırma (her satır kendi uzunluğu içinde)
+        apply = rng.random(batch_size) < 0.5
+        if apply.any():
+            shifts = np.round(rng.uniform(-params['shift_severity'], params['shift_severity'], batch_size) * lengths)
+            shifts = (shifts * apply).astype(np.int64)
+            source = (np.arange(padded.shape[1])[None, :] - shifts[:, None]) % np.maximum(lengths, 1)[:, None]
+            padded = np.where(mask, np.take_along_axis(padded, source, axis=1), 0.0).astype(np.float32)
+
+        # Kazanç
+        apply = rng.random(batch_size) < 0.5
+        if apply.any():
+            gain_db = rng.uniform(-params['gain_severity'], params['gain_severity'], batch_size) * apply
+            padded *= (10 ** (gain_db / 20)).astype(np.float32)[:, None]
+
+        # Kırpma bozulması: örneklerin en uç yüzdelik dilimleri kesilir
+        for row in np.flatnonzero(rng.random(batch_size) < 0.3):
+            lower_percentile = rng.integers(0, 41) // 2
+            lower, upper = np.percentile(padded[row, :lengths[row]], [lower_percentile, 100 - lower_percentile])
+            padded[row, :lengths[row]] = np.clip(padded[row, :lengths[row]], lower, upper)
+
+        # Baş ve sondaki sessizliği kırp
+        starts, ends = np.zeros(batch_size, dtype=np.int64), lengths
+        apply = rng.random(batch_size) < 0.3
+        if apply.any():
+            trim_starts, trim_ends = _trim_bounds(padded, lengths)
+            starts, ends = np.where(apply, trim_starts, starts), np.where(apply, trim_ends, ends)
+
+        return [padded[row, starts[row]:ends[row]].copy() for row in range(batch_size)]
+
+
+@lru_cache(maxsize=32)
+def get_batch_augmenter(augmentation_level):
+    """Verilen seviye için `BatchAugmenter` örneğini bir kez kurar ve önbellekte tutar"""
+    return BatchAugmenter(augmentation_level)
@@ -0,0 +1,106 @@
+# Veri Artırma Hız Testi
+# Bu script, eğitimdeki veri artırma + özellik çıkarma adımının saniyede işlediği örnek sayısını
+# üç yol için ölçer: her örnekte yeniden kurulan audiomentations zinciri (ilk sürüm), seviye başına
+# önbelleğe alınan zincir ve tüm batch'e tek seferde uygulanan vektörleştirilmiş artırıcı
+# Kullanım: python veri_artirma_hiz_testi.py [--seviye 0.5] [--batch-boyutu 16] [--tekrar 3]
+
+import argparse
+import os
+import sys
+import time
+import numpy as np
+from transformers import WhisperFeatureExtractor
+from veri_artirma import (
+    augment_audio_with_clipping, build_augmentation, get_batch_augmenter, speed_factor_range, speed_perturb
+)
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "degerlendirme_scriptleri"))
+from yerel_ornekler import load_local_samples
+
+VARSAYILAN_ORNEK_DIZINI = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "kaldirilan_ornekler")
+
+
+def legacy_path(audio_arrays, sampling_rate, level, feature_extractor, rng):
+    """İlk sürüm: her örnek için zincir yeniden kurulur, özellikler tek tek çıkarılır"""
+    for audio in audio_arrays:
+        augmented = build_augmentation.__wrapped__(level)(samples=audio, sample_rate=sampling_rate)
+        feature_extractor(augmented, sampling_rate=sampling_rate).input_features[0]
+
+
+def cached_chain_path(audio_arrays, sampling_rate, level, feature_extractor, rng):
+    """Seviye başına önbelleğe alınan zincir, örnek örnek uygulanır"""
+    augmented = [augment_audio_with_clipping(audio, sampling_rate, level) for audio in audio_arrays]
+    feature_extractor(augmented, sampling_rate=sampling_rate).input_features
+
+
+def batch_path(audio_arrays, sampling_rate, level, feature_extractor, rng):
+    """Vektörleştirilmiş artırıcı ve toplu özellik çıkarma"""
+    augmented = get_batch_augmenter(level)(audio_arrays, sampling_rate, rng)
+    feature_extractor(augmented, sampling_rate=sampling_rate).input_features
+
+
+def lost_speech_ratio(audio_arrays, level):
+    """
+    Hız pertürbasyonunun en uç çarpanlarında kaybolan konuşma enerjisinin en büyük oranı.
+
+    Yeniden örnekleme enerjiyi 1 / çarpan oranında ölçekler; düzeltilmiş
+    enerjinin girdiden belirgin biçimde az olması sesin (ve etiketteki
+    metnin) bir kısmının kesildiğini gösterir.
+    """
+    worst = 0.0
+    for factor in speed_factor_range(level):
+        for audio in audio_arrays:
+            audio = np.asarray(audio, dtype=np.float32)
+            energy = float(np.sum(audio.astype(np.float64) ** 2))
+            if energy == 0:
+                continue
+            perturbed = speed_perturb(audio, factor)
+            worst = max(worst, 1.0 - float(np.sum(perturbed.astype(np.float64) ** 2)) * factor / energy)
+    return worst
+
+
+def measure(function, batches, sampling_rate, level, feature_extractor, repeat):
+    """Fonksiyonun saniyede işlediği örnek sayısını döndürür"""
+    rng = np.random.default_rng(42)
+    count = sum(len(batch) for batch in batches) * repeat
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for batch in batches:
+            function(batch, sampling_rate, level, feature_extractor, rng)
+    return count / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Veri artırma hız testi")
+    parser.add_argument("--ornek-dizini", default=VARSAYILAN_ORNEK_DIZINI, help="Yerel örnek klasörü")
+    parser.add_argument("--seviye", type=float, default=0.5, help="Artırma seviyesi")
+    parser.add_argument("--batch-boyutu", type=int, default=16, help="Batch boyutu")
+    parser.add_argument("--tekrar", type=int, default=3, help="Ölçüm için tekrar sayısı")
+    args = parser.parse_args()
+
+    samples = load_local_samples(args.ornek_dizini)
+    sampling_rate = samples[0]["audio"]["sampling_rate"]
+    audio_arrays = [sample["audio"]["array"] for sample in samples]
+    batches = [audio_arrays[start:start + args.batch_boyutu] for start in range(0, len(audio_arrays), args.batch_boyutu)]
+    feature_extractor = WhisperFeatureExtractor(sampling_rate=sampling_rate)
+
+    # Artırılmış seslerin geçerli olduğunu doğrula
+    augmented = get_batch_augmenter(args.seviye)(audio_arrays, sampling_rate, np.random.default_rng(0))
+    invalid = sum(1 for audio in augmented if len(audio) == 0 or not np.all(np.isfinite(audio)))
+    print(f"{len(audio_arrays)} örnek artırıldı, {invalid} geçersiz çıktı bulundu.")
+    lost = lost_speech_ratio(audio_arrays, args.seviye)
+    print(f"Hız pertürbasyonunda kaybolan en büyük konuşma enerjisi oranı: %{100 * lost:.2f}")
+    if lost > 0.01:
+        raise SystemExit("Hız pertürbasyonu konuşmanın bir kısmını kesiyor.")
+
+    results = [
+        ("Her örnekte yeni zincir (ilk sürüm)", measure(legacy_path, batches, sampling_rate, args.seviye,
+                                                        feature_extractor, args.tekrar)),
+        ("Önbellekli zincir", measure(cached_chain_path, batches, sampling_rate, args.seviye,
+                                      feature_extractor, args.tekrar)),
+        ("Toplu artırıcı", measure(batch_path, batches, sampling_rate, args.seviye,
+                                   feature_extractor, args.tekrar)),
+    ]
+    legacy_speed = results[0][1]
+    for name, speed in results:
+        print(f"{name}: {speed:,.1f} örnek/sn ({speed / legacy_speed:.1f}x)")
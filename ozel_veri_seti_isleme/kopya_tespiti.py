@@ -0,0 +1,285 @@
+# Ses Parmak İzi ile Yakın Kopya Tespiti
+# Bu modül, her klip için kısa bir spektral parmak izi çıkarır, MinHash imzalarına dönüştürür ve LSH
+# bantlamasıyla yakın kopyaları tüm çiftleri karşılaştırmadan (yaklaşık doğrusal sürede) bulur.
+# Birleştirilen ATC veri setlerinde eğitim ve test bölümleri arasındaki sızıntıyı raporlamak ve
+# kopyaları ayıklanmış bir bölünme üretmek için veri_seti_olustur_ve_yukle.py tarafından kullanılır
+# Kullanım: python kopya_tespiti.py --ornek-dizini ../kaldirilan_ornekler [--rapor kopya_raporu.json]
+#
+# Dayanıklılık sınırları (kaldirilan_ornekler'deki 83 klipte, varsayılan 0.2 eşiğiyle ölçüldü):
+# birebir kopyalar, kazanç değişiklikleri ve baştan/sondan kırpılmış kopyalar bulunur. Eklenen gürültü
+# ise 16 bitlik kodları bozar: %10 kırpma + 0.5 kazanç üzerine beyaz gürültü eklenmiş kopyaların
+# bulunma oranı 25 dB SNR ve üzerinde %100, 20 dB'de ~%88, 15 dB'de ~%48, 8 dB'de ~%7'dir (8 dB'de
+# tahmini Jaccard genellikle 0.05-0.26). Bu nedenle araç yeniden kodlanmış veya kırpılmış kopyaları
+# ayıklar; farklı bir frekans kaydından alınmış ya da yüksek gürültüyle bozulmuş kopyaları kaçırabilir.
+# Eşiği düşürmek bunu düzeltmez: ilgisiz klipler arasındaki benzerlik zaten 0.05'e kadar çıkar
+
+import argparse
+import json
+import os
+import numpy as np
+
+ORNEKLEME_HIZI = 16000
+# Parmak izi ayarları: 370 ms pencere, 11.6 ms adım, telsiz bandında (300-3400 Hz) 17 logaritmik bant.
+# Pencerelerin büyük ölçüde örtüşmesi, farklı noktalardan kesilmiş kliplerde kodların aynı kalmasını sağlar
+PENCERE = 5920
+ADIM = 185
+BANT_SINIRLARI = np.geomspace(300, 3400, 18)
+
+# MinHash ayarları: 150 permütasyon, her biri 3 satırlık 50 bant; Jaccard ~0.27 civarındaki
+# çiftler %50 olasılıkla, 0.5 üzerindekiler neredeyse kesin olarak aday olur
+PERMUTASYON_SAYISI = 150
+BANT_SAYISI = 50
+# Bir kovadaki her klibin karşılaştırılacağı önceki üye sayısı
+KOVA_KARSILASTIRMA = 8
+_ASAL = (1 << 31) - 1
+_BOS_IMZA = np.iinfo(np.uint32).max
+
+
+def spectral_fingerprint(audio_array, sampling_rate=ORNEKLEME_HIZI):
+    """
+    Klibin kare başına 16 bitlik alt parmak izlerini döndürür.
+
+    Her bit, komşu iki bandın enerji farkının önceki kareye göre artıp
+    azaldığını gösterir (Haitsma-Kalker yöntemi); bu nedenle kazanç
+    değişikliklerine karşı dayanıklıdır. Gürültü bit hatalarına yol açar
+    (bkz. modül başındaki dayanıklılık sınırları). Örnekleme hızı
+    farklı kliplerde bant sınırları frekans cinsinden aynı kalır.
+
+    Döndürür: uint16 dizisi (klip bir pencereden kısaysa boş)
+    """
+    audio = np.asarray(audio_array, dtype=np.float32)
+    window = int(PENCERE * sampling_rate / ORNEKLEME_HIZI)
+    hop = int(ADIM * sampling_rate / ORNEKLEME_HIZI)
+    if len(audio) < window + hop:
+        return np.zeros(0, dtype=np.uint16)
+
+    frames = np.lib.stride_tricks.sliding_window_view(audio, window)[::hop] * np.hanning(window).astype(np.float32)
+    power = np.abs(np.fft.rfft(frames, axis=1)) ** 2
+    bins = np.searchsorted(np.fft.rfftfreq(window, 1 / sampling_rate), BANT_SINIRLARI)
+    energy = np.add.reduceat(power, bins[:-1], axis=1)[:, :len(bins) - 1]
+    energy = np.log(energy + 1e-10)
+
+    band_difference = energy[:, :-1] - energy[:, 1:]
+    bits = (band_difference[1:] - band_difference[:-1]) > 0
+    return np.packbits(bits, axis=1, bitorder='little').view('<u2').ravel()
+
+
+def shingles(fingerprint):
+    """
+    Alt parmak izlerinin kümesi.
+
+    Gürültülü kopyalarda bit hata oranı birkaç yüzdeyi bulduğundan ardışık
+    kodlar birleştirilmez; tek bir 16 bitlik kodun aynı kalma olasılığı
+    daha yüksektir ve ilgisiz klipler arasındaki Jaccard benzerliği yine
+    de birkaç yüzdenin altında kalır.
+    """
+    return np.unique(fingerprint.astype(np.uint64))
+
+
+def permutations(num_perm=PERMUTASYON_SAYISI, seed=42):
+    """MinHash için (a * x + b) mod (2^31 - 1) evrensel özet katsayıları; ara çarpım uint64'e sığar"""
+    generator = np.random.default_rng(seed)
+    a = generator.integers(1, _ASAL, size=num_perm, dtype=np.uint64)
+    b = generator.integers(0, _ASAL, size=num_perm, dtype=np.uint64)
+    return a, b
+
+
+def minhash(values, coefficients):
+    """Değer kümesinin MinHash imzası; boş kümede tüm elemanlar en büyük değerdir"""
+    a, b = coefficients
+    if len(values) == 0:
+        return np.full(len(a), _BOS_IMZA, dtype=np.uint32)
+    hashed = (values[:, None] * a[None, :] + b[None, :]) % np.uint64(_ASAL)
+    return hashed.min(axis=0).astype(np.uint32)
+
+
+def signatures_for_arrays(audio_arrays, sampling_rates, coefficients):
+    """Ses dizilerinin MinHash imzalarını (satır başına bir imza) döndürür"""
+    return np.stack([
+        minhash(shingles(spectral_fingerprint(audio, sampling_rate)), coefficients)
+        for audio, sampling_rate in zip(audio_arrays, sampling_rates)
+    ]) if len(audio_arrays) else np.zeros((0, len(coefficients[0])), dtype=np.uint32)
+
+
+def _signature_batch(batch, coefficients):
+    signatures = signatures_for_arrays(
+        [audio['array'] for audio in batch['audio']], [audio['sampling_rate'] for audio in batch['audio']], coefficients
+    )
+    return {'imza': [signature.tolist() for signature in signatures]}
+
+
+def dataset_signatures(dataset, cache_dir=None, num_proc=None, num_perm=PERMUTASYON_SAYISI):
+    """
+    Veri setindeki tüm kliplerin MinHash imzalarını hesaplar.
+
+    İmzalar `num_proc` süreçle hesaplanır ve `cache_dir` verilirse veri setinin
+    parmak izine göre .npy dosyasında saklanır; kaynak değişmedikçe yeniden
+    hesaplanmaz. Bellek kullanımı klip başına `num_perm * 4` bayttır.
+
+    Döndürür: (satır sayısı, num_perm) boyutlu uint32 dizisi
+    """
+    cache_path = None
+    if cache_dir:
+        cache_path = os.path.join(cache_dir, f'imzalar_{dataset._fingerprint}_{num_perm}.npy')
+        if os.path.exists(cache_path):
+            return np.load(cache_path, mmap_mode='r')
+
+    coefficients = permutations(num_perm)
+    signed = dataset.select_columns(['audio']).map(
+        _signature_batch, batched=True, batch_size=64, num_proc=num_proc,
+        fn_kwargs={'coefficients': coefficients}, remove_columns=['audio'],
+    )
+    signatures = np.asarray(signed['imza'], dtype=np.uint32).reshape(len(dataset), num_perm)
+
+    if cache_path:
+        os.makedirs(cache_dir, exist_ok=True)
+        temporary_path = cache_path + '.tmp.npy'
+        np.save(temporary_path, signatures)
+        os.replace(temporary_path, cache_path)
+    return signatures
+
+
+def _find(parents, item):
+    while parents[item] != item:
+        parents[item] = parents[parents[item]]
+        item = parents[item]
+    return item
+
+
+def near_duplicate_clusters(signatures, candidates=None, bands=BANT_SAYISI, threshold=0.2):
+    """
+    LSH bantlamasıyla yakın kopya kümelerini bulur.
+
+    İmza `bands` banda bölünür; en az bir bandı aynı olan klipler aday olur.
+    Her kovadaki klip yalnızca kovadaki son `KOVA_KARSILASTIRMA` üyeyle
+    karşılaştırılır ve tahmini Jaccard benzerliği `threshold` değerini
+    geçenler birleşim-bul (union-find) ile aynı kümeye alınır; böylece
+    büyük kovalarda bile iş klip sayısıyla doğrusal kalır.
+
+    Parametreler:
+    signatures: (satır sayısı, permütasyon sayısı) boyutlu imza dizisi
+    candidates: Karşılaştırılacak satır indeksleri (varsayılan: tümü); boş klipler atlanır
+    bands: Bant sayısı; permütasyon sayısını tam bölmelidir
+    threshold: Kopya sayılmak için gereken tahmini Jaccard benzerliği
+
+    Döndürür: En az iki elemanlı kümelerin listesi ([(satır, ilk satıra benzerlik), ...])
+    """
+    signatures = np.asarray(signatures)
+    rows_per_band = signatures.shape[1] // bands
+    if rows_per_band * bands != signatures.shape[1]:
+        raise ValueError(f"Permütasyon sayısı ({signatures.shape[1]}) bant sayısına ({bands}) tam bölünmelidir.")
+    rows = np.arange(len(signatures)) if candidates is None else np.asarray(candidates)
+    rows = [int(row) for row in rows if signatures[row, 0] != _BOS_IMZA]
+
+    parents = {row: row for row in rows}
+    for band in range(bands):
+        columns = slice(band * rows_per_band, (band + 1) * rows_per_band)
+        buckets = {}
+        for row in rows:
+            buckets.setdefault(signatures[row, columns].tobytes(), []).append(row)
+        for members in buckets.values():
+            for position, row in enumerate(members[1:], start=1):
+                for other in members[max(0, position - KOVA_KARSILASTIRMA):position]:
+                    if _find(parents, row) == _find(parents, other):
+                        continue
+                    similarity = float(np.mean(signatures[row] == signatures[other]))
+                    if similarity >= threshold:
+                        parents[_find(parents, row)] = _find(parents, other)
+
+    clusters = {}
+    for row in rows:
+        clusters.setdefault(_find(parents, row), []).append(row)
+    result = []
+    for members in clusters.values():
+        if len(members) > 1:
+            members = sorted(members)
+            result.append([
+                (row, round(float(np.mean(signatures[row] == signatures[members[0]])), 3)) for row in members
+            ])
+    return result
+
+
+def deduplicate_split(clusters, split_of, texts=None):
+    """
+    Kümelerden sızıntı raporu ve çıkarılacak satırları üretir.
+
+    Test bölümünün değerlendirme açısından tutarlı kalması için test
+    üyesi olan kümelerde ilk test satırı, diğerlerinde ilk satır tutulur;
+    kümenin geri kalanı (eğitimdeki sızan kopyalar dahil) çıkarılır.
+
+    Parametreler:
+    clusters: near_duplicate_clusters çıktısı
+    split_of: Satır indeksinden bölüm adına ('train' / 'test') eşleme
+    texts: Rapora eklenecek metinler (satır indeksinden metne eşleme, isteğe bağlı)
+
+    Döndürür: (çıkarılacak satırlar kümesi, rapor sözlüğü)
+    """
+    removed = set()
+    report_clusters = []
+    leaking_test_rows = 0
+    for members in clusters:
+        rows = [row for row, _ in members]
+        test_rows = [row for row in rows if split_of[row] == 'test']
+        kept = test_rows[0] if test_rows else rows[0]
+        removed.update(row for row in rows if row != kept)
+        splits = {split_of[row] for row in rows}
+        if len(splits) > 1:
+            leaking_test_rows += len(test_rows)
+        report_clusters.append({
+            'tutulan': kept,
+            'sizinti': len(splits) > 1,
+            'uyeler': [
+                {'satir': row, 'bolum': split_of[row], 'benzerlik': similarity,
+                 **({'metin': texts[row]} if texts is not None else {})}
+                for row, similarity in members
+            ],
+        })
+
+    report_clusters.sort(key=lambda cluster: (not cluster['sizinti'], -len(cluster['uyeler'])))
+    report = {
+        'kume_sayisi': len(clusters),
+        'sizan_kume_sayisi': sum(cluster['sizinti'] for cluster in report_clusters),
+        'egitimde_kopyasi_olan_test_satiri': leaking_test_rows,
+        'cikarilan_satir_sayisi': {
+            split: sum(split_of[row] == split for row in removed) for split in sorted(set(split_of.values()))
+        },
+        'kumeler': report_clusters,
+    }
+    return removed, report
+
+
+def write_report(report, path):
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+
+
+def print_summary(report):
+    removed = ', '.join(f"{split}: {count}" for split, count in report['cikarilan_satir_sayisi'].items())
+    print(f"Yakın kopya kümesi: {report['kume_sayisi']} | Bölümler arası sızan küme: {report['sizan_kume_sayisi']} | "
+          f"Eğitimde kopyası olan test örneği: {report['egitimde_kopyasi_olan_test_satiri']} | "
+          f"Çıkarılan: {removed or '-'}")
+
+
+if __name__ == '__main__':
+    import sys
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'degerlendirme_scriptleri'))
+    from yerel_ornekler import load_local_samples
+
+    parser = argparse.ArgumentParser(description="Yerel örnek klasöründeki yakın kopya ses kliplerini bulur")
+    parser.add_argument('--ornek-dizini', required=True, help="WAV + metin çiftlerinin bulunduğu klasör")
+    parser.add_argument('--benzerlik-esigi', type=float, default=0.2, help="Kopya sayılmak için tahmini Jaccard eşiği")
+    parser.add_argument('--rapor', default='kopya_raporu.json', help="Raporun yazılacağı JSON dosyası")
+    args = parser.parse_args()
+
+    samples = load_local_samples(args.ornek_dizini)
+    signatures = signatures_for_arrays(
+        [sample['audio']['array'] for sample in samples], [sample['audio']['sampling_rate'] for sample in samples],
+        permutations(),
+    )
+    clusters = near_duplicate_clusters(signatures, threshold=args.benzerlik_esigi)
+    # Tek klasörde bölünme olmadığından tüm örnekler aynı bölümde sayılır
+    _, report = deduplicate_split(
+        clusters, {row: 'train' for row in range(len(samples))}, {row: sample['id'] for row, sample in enumerate(samples)}
+    )
+    print_summary(report)
+    write_report(report, args.rapor)
@@ -1,28 +1,29 @@
 # ATC Veri Setlerini Birleştirme ve Yükleme Scripti
-# Bu script, ATCO2 ve UWB-ATCC veri setlerini birleştirir, temizler ve Hugging Face'e yükler
+# Bu script, ATCO2 ve UWB-ATCC veri setlerini birleştirir, temizler, yerel Parquet parçalarına yazar ve
+# isteğe bağlı olarak Hugging Face'e yükler. Parçalar bir manifest ile izlenir; kaldırılacak metin listesi
+# veya bir kaynak veri seti değiştiğinde yalnızca etkilenen parçalar yeniden yazılır; `--kopya-ayikla` ile
+# bölümler arası yakın kopyalar (sızıntı) ses parmak izleriyle ayıklanır
+# Kullanım: python veri_seti_olustur_ve_yukle.py [--cikti-dizini atc_veri_seti] [--yayinla mehmedadymn/air-traffic-dataset]
 
-from datasets import load_dataset, concatenate_datasets, DatasetDict
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import numpy as np
+from datasets import load_dataset, concatenate_datasets, Dataset, DatasetDict, Audio
+from datasets.table import embed_table_storage
+import kopya_tespiti
 
-# Veri setlerini yükle
-dataset1 = load_dataset('Jzuluaga/atco2_corpus_1h', split='test')  # ATCO2 veri seti
-dataset2_train = load_dataset('Jzuluaga/uwb_atcc', split='train')  # UWB-ATCC eğitim seti
-dataset2_test = load_dataset('Jzuluaga/uwb_atcc', split='test')    # UWB-ATCC test seti
-
-# Tüm veri setlerini birleştir
-combined_dataset = concatenate_datasets([dataset1, dataset2_train, dataset2_test])
-
-# Veriyi karıştır
-shuffled_dataset = combined_dataset.shuffle(seed=42)
-
-# Eğitim ve test setlerine ayır (%80 eğitim, %20 test)
-train_test_split = shuffled_dataset.train_test_split(test_size=0.2, seed=42)
-train_dataset = train_test_split['train']
-test_dataset = train_test_split['test']
+# Kaynak veri setleri: (Hugging Face kimliği veya yerel WAV + metin klasörü, bölüm)
+sources = [
+    ('Jzuluaga/atco2_corpus_1h', 'test'),  # ATCO2 veri seti
+    ('Jzuluaga/uwb_atcc', 'train'),        # UWB-ATCC eğitim seti
+    ('Jzuluaga/uwb_atcc', 'test'),         # UWB-ATCC test seti
+]
 
-# Gereksiz sütunları kaldır
+# Gereksiz sütunlar
 columns_to_remove = ['id', 'segment_start_time', 'segment_end_time', 'duration']
-train_dataset = train_dataset.remove_columns(columns_to_remove)
-test_dataset = test_dataset.remove_columns(columns_to_remove)
 
 # Kaldırılacak problemli metin örnekleri
 texts_to_remove = [
@@ -38,19 +39,246 @@ texts_to_remove = [
     "number one golf bravo", "but"
 ]
 
-# Örnekleri filtreleme fonksiyonu
-def filter_samples(sample):
-    return sample['text'] not in texts_to_remove
+# Manifest biçimi değişirse tüm parçaların yeniden yazılması için artırılır
+MANIFEST_SURUMU = 1
+_SATIR = '_satir'
+
+
+def load_source(name, split):
+    """Kaynak veri setini yükler; yerel klasörler `kaldirilan_ornekler` düzeninde okunur"""
+    if os.path.isdir(name):
+        import sys
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "degerlendirme_scriptleri"))
+        from yerel_ornekler import find_sample_pairs
+        pairs = find_sample_pairs(name)
+        texts = []
+        for _, _, text_path in pairs:
+            with open(text_path, encoding='utf-8') as file:
+                texts.append(file.read().strip())
+        return Dataset.from_dict({
+            'id': [sample_id for sample_id, _, _ in pairs],
+            'audio': [audio_path for _, audio_path, _ in pairs],
+            'text': texts,
+        }).cast_column('audio', Audio(sampling_rate=16000))
+    return load_dataset(name, split=split)
+
+
+def load_sources(source_list):
+    """
+    Kaynakları yükleyip birleştirir.
+
+    Her satıra birleşik veri setindeki sırasını tutan geçici bir `_satir` sütunu
+    eklenir; karıştırma ve bölme yalnızca satır sayısına ve tohuma bağlı
+    olduğundan bu sütun sonuçtaki bölünmeyi değiştirmez.
+
+    Döndürür: (birleşik veri seti, kaynak bilgileri, kaynak veri setleri)
+    """
+    datasets, source_info, offset = [], [], 0
+    for name, split in source_list:
+        dataset = load_source(name, split)
+        # Gereksiz sütunları kaldır (yalnızca meta veri işlemidir, ses çözülmez)
+        dataset = dataset.remove_columns([column for column in columns_to_remove if column in dataset.column_names])
+        source_info.append({
+            'ad': name, 'bolum': split, 'parmak_izi': dataset._fingerprint,
+            'baslangic': offset, 'bitis': offset + len(dataset),
+        })
+        offset += len(dataset)
+        datasets.append(dataset)
+    combined_dataset = concatenate_datasets(datasets)
+    return combined_dataset.add_column(_SATIR, list(range(len(combined_dataset)))), source_info, datasets
+
+
+def split_dataset(combined_dataset):
+    """Veriyi karıştırır ve %80 eğitim, %20 test olarak ayırır (ilk sürümle aynı bölünme)"""
+    shuffled_dataset = combined_dataset.shuffle(seed=42)
+    train_test_split = shuffled_dataset.train_test_split(test_size=0.2, seed=42)
+    return {'train': train_test_split['train'], 'test': train_test_split['test']}
+
+
+def shard_key(split_name, rows, texts, source_info, features):
+    """
+    Parçanın içeriğini tanımlayan anahtar.
+
+    Parçada kalan satırların kimlikleri ve metinleri ile bu satırların geldiği
+    kaynakların parmak izlerinden oluşur; kaldırma listesi yalnızca metni
+    listede olan satırların parçasını, bir kaynağın değişmesi yalnızca o
+    kaynaktan satır içeren parçaları etkiler.
+    """
+    used_sources = sorted({
+        info['parmak_izi'] for info in source_info for row in rows if info['baslangic'] <= row < info['bitis']
+    })
+    digest = hashlib.sha256()
+    digest.update(json.dumps([MANIFEST_SURUMU, split_name, used_sources, rows, texts, features], ensure_ascii=False).encode())
+    return digest.hexdigest()
+
+
+def _write_shard(task):
+    split, positions, path = task
+    shard = split.select(positions).remove_columns([_SATIR])
+    # Yerel dosyalardaki sesler Parquet içine gömülür; parça kaynak dosyalardan bağımsız olur
+    shard = shard.with_format('arrow').map(embed_table_storage, batched=True, batch_size=1000, keep_in_memory=True)
+    temporary_path = path + '.tmp'
+    shard.with_format(None).to_parquet(temporary_path)
+    os.replace(temporary_path, path)
+    return path
+
+
+def near_duplicate_rows(source_datasets, split_of, texts, output_dir, threshold=0.2, num_proc=None):
+    """
+    Bölümlerde kalan satırlar arasındaki yakın kopyaları bulur ve sızıntı raporunu yazar.
+
+    İmzalar kaynak başına `parmak_izleri/` altında önbelleğe alınır; yalnızca
+    değişen kaynağın klipleri yeniden çözülür.
+
+    Döndürür: Çıkarılacak `_satir` değerlerinin kümesi
+    """
+    cache_dir = os.path.join(output_dir, 'parmak_izleri')
+    signatures = np.concatenate([
+        kopya_tespiti.dataset_signatures(dataset, cache_dir=cache_dir, num_proc=num_proc) for dataset in source_datasets
+    ])
+    clusters = kopya_tespiti.near_duplicate_clusters(signatures, candidates=sorted(split_of), threshold=threshold)
+    removed, report = kopya_tespiti.deduplicate_split(clusters, split_of, texts)
+    kopya_tespiti.write_report(report, os.path.join(output_dir, 'kopya_raporu.json'))
+    kopya_tespiti.print_summary(report)
+    return removed
+
+
+def build(output_dir, source_list=None, removal_list=None, shard_size=1000, num_proc=None,
+          deduplicate=False, similarity_threshold=0.2):
+    """
+    Veri setini oluşturup `output_dir` altına Parquet parçaları ve manifest olarak yazar.
+
+    Parçalar, filtrelemeden önceki bölüm sırasına göre sabit `shard_size` satırlık
+    bloklardır; böylece kaldırma listesine eklenen bir metin yalnızca o metni içeren
+    bloğun parçasını değiştirir. Anahtarı manifestteki ile aynı olan parçalar atlanır.
+
+    Parametreler:
+    output_dir: Parçaların ve manifest.json dosyasının yazılacağı klasör
+    source_list: (kaynak, bölüm) çiftleri (varsayılan: `sources`)
+    removal_list: Kaldırılacak metinler (varsayılan: `texts_to_remove`)
+    shard_size: Filtrelemeden önceki parça başına satır sayısı
+    num_proc: Parçaları yazan ve parmak izlerini hesaplayan süreç sayısı (varsayılan: çekirdek sayısı)
+    deduplicate: True ise yakın kopyalar ayıklanır ve `kopya_raporu.json` yazılır (bkz. kopya_tespiti.py)
+    similarity_threshold: Kopya sayılmak için gereken tahmini Jaccard benzerliği
+
+    Döndürür: (manifest, yeniden yazılan parça sayısı, atlanan parça sayısı)
+    """
+    removal_set = frozenset(texts_to_remove if removal_list is None else removal_list)
+    combined_dataset, source_info, source_datasets = load_sources(sources if source_list is None else source_list)
+    splits = split_dataset(combined_dataset)
+
+    # Yalnızca metin ve satır sütunları okunur; sesler çözülmez
+    columns = {split_name: split.select_columns(['text', _SATIR]) for split_name, split in splits.items()}
+    columns = {split_name: (column['text'], column[_SATIR]) for split_name, column in columns.items()}
+
+    duplicates = set()
+    if deduplicate:
+        split_of, row_texts = {}, {}
+        for split_name, (all_texts, all_rows) in columns.items():
+            for text, row in zip(all_texts, all_rows):
+                if text not in removal_set:
+                    split_of[row] = split_name
+                    row_texts[row] = text
+        os.makedirs(output_dir, exist_ok=True)
+        duplicates = near_duplicate_rows(source_datasets, split_of, row_texts, output_dir, similarity_threshold, num_proc)
+
+    manifest_path = os.path.join(output_dir, 'manifest.json')
+    previous = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding='utf-8') as file:
+            for split_name, shards in json.load(file).get('bolumler', {}).items():
+                for shard in shards:
+                    previous[shard['dosya']] = shard['anahtar']
+
+    manifest = {
+        'surum': MANIFEST_SURUMU, 'kaynaklar': source_info, 'parca_boyutu': shard_size,
+        'kopya_esigi': similarity_threshold if deduplicate else None, 'bolumler': {},
+    }
+    tasks, skipped = [], 0
+    for split_name, split in splits.items():
+        os.makedirs(os.path.join(output_dir, split_name), exist_ok=True)
+        features = {name: str(feature) for name, feature in split.features.items() if name != _SATIR}
+        all_texts, all_rows = columns[split_name]
+        manifest['bolumler'][split_name] = []
+        for shard_index, start in enumerate(range(0, len(split), shard_size)):
+            # Problemli metinleri ve yakın kopyaları küme araması ile filtrele
+            positions = [
+                position for position in range(start, min(start + shard_size, len(split)))
+                if all_texts[position] not in removal_set and all_rows[position] not in duplicates
+            ]
+            rows = [all_rows[position] for position in positions]
+            texts = [all_texts[position] for position in positions]
+            relative_path = os.path.join(split_name, f'parca-{shard_index:05d}.parquet')
+            key = shard_key(split_name, rows, texts, source_info, features)
+            manifest['bolumler'][split_name].append({
+                'dosya': relative_path, 'anahtar': key, 'satir_sayisi': len(positions),
+                'baslangic': start, 'bitis': min(start + shard_size, len(split)),
+            })
+            path = os.path.join(output_dir, relative_path)
+            if not positions:
+                # Tüm satırları kaldırılan parça için dosya yazılmaz
+                if os.path.exists(path):
+                    os.remove(path)
+            elif previous.get(relative_path) == key and os.path.exists(path):
+                skipped += 1
+            else:
+                tasks.append((split, positions, path))
+
+    if tasks:
+        print(f"{len(tasks)} parça yazılıyor ({skipped} parça değişmedi)")
+        with multiprocessing.Pool(min(len(tasks), num_proc or os.cpu_count() or 1)) as pool:
+            for path in pool.imap_unordered(_write_shard, tasks):
+                print(f"Yazıldı: {path}")
+
+    # Artık manifestte olmayan eski parçaları sil
+    current = {shard['dosya'] for shards in manifest['bolumler'].values() for shard in shards}
+    for relative_path in set(previous) - current:
+        path = os.path.join(output_dir, relative_path)
+        if os.path.exists(path):
+            os.remove(path)
+
+    temporary_path = manifest_path + '.tmp'
+    with open(temporary_path, 'w', encoding='utf-8') as file:
+        json.dump(manifest, file, ensure_ascii=False, indent=2)
+    os.replace(temporary_path, manifest_path)
+    return manifest, len(tasks), skipped
+
+
+def load_built_dataset(output_dir):
+    """Manifestteki Parquet parçalarından DatasetDict oluşturur"""
+    with open(os.path.join(output_dir, 'manifest.json'), encoding='utf-8') as file:
+        manifest = json.load(file)
+    data_files = {
+        split_name: [os.path.join(output_dir, shard['dosya']) for shard in shards if shard['satir_sayisi']]
+        for split_name, shards in manifest['bolumler'].items()
+    }
+    return load_dataset('parquet', data_files=data_files)
+
 
-# Eğitim ve test setlerini filtrele
-train_dataset = train_dataset.filter(filter_samples)
-test_dataset = test_dataset.filter(filter_samples)
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="ATC veri setlerini birleştirir, temizler ve yerel parçalara yazar")
+    parser.add_argument('--cikti-dizini', default='atc_veri_seti', help="Parquet parçalarının ve manifestin klasörü")
+    parser.add_argument('--kaynak', nargs=2, action='append', metavar=('KAYNAK', 'BOLUM'), default=None,
+                        help="Varsayılan kaynakların yerine kullanılacak kaynak (hub kimliği veya yerel klasör) "
+                             "ve bölüm; birden fazla kez verilebilir")
+    parser.add_argument('--parca-boyutu', type=int, default=1000, help="Filtrelemeden önceki parça başına satır sayısı")
+    parser.add_argument('--surec-sayisi', type=int, default=None, help="Parçaları yazan süreç sayısı")
+    parser.add_argument('--kopya-ayikla', action='store_true',
+                        help="Ses parmak izleriyle yakın kopyaları ayıklar ve kopya_raporu.json yazar")
+    parser.add_argument('--benzerlik-esigi', type=float, default=0.2,
+                        help="Kopya sayılmak için gereken tahmini Jaccard benzerliği")
+    parser.add_argument('--yayinla', default=None, help="Verilirse oluşturulan veri seti bu hub deposuna yüklenir")
+    args = parser.parse_args()
 
-# Son veri setini oluştur
-final_dataset = DatasetDict({
-    'train': train_dataset,
-    'test': test_dataset
-})
+    manifest, written, skipped = build(
+        args.cikti_dizini, source_list=args.kaynak, shard_size=args.parca_boyutu, num_proc=args.surec_sayisi,
+        deduplicate=args.kopya_ayikla, similarity_threshold=args.benzerlik_esigi,
+    )
+    for split_name, shards in manifest['bolumler'].items():
+        print(f"{split_name}: {sum(shard['satir_sayisi'] for shard in shards)} örnek, {len(shards)} parça")
+    print(f"Yeniden yazılan: {written}, değişmeyen: {skipped}")
 
-# Veri setini Hugging Face'e yükle
-final_dataset.push_to_hub("mehmedadymn/air-traffic-dataset") 
\ No newline at end of file
+    # Veri setini Hugging Face'e yükle (isteğe bağlı son adım)
+    if args.yayinla:
+        final_dataset = load_built_dataset(args.cikti_dizini)
+        DatasetDict(final_dataset).push_to_hub(args.yayinla)